@@ -26,9 +26,19 @@ except ImportError as err:
             to compile the cython code.
             """
         )
-from discretize import tests
+
 
 __version__ = "0.6.2"
 __author__ = "SimPEG Team"
 __license__ = "MIT"
 __copyright__ = "2013, SimPEG Developers, http://simpeg.xyz"
+
+
+def __getattr__(name):
+    # the testing utilities import unittest and matplotlib, only load them
+    # when they are used
+    if name == "tests":
+        import importlib
+
+        return importlib.import_module("discretize.tests")
+    raise AttributeError("module 'discretize' has no attribute {!r}".format(name))
@@ -2,6 +2,7 @@
 import numpy as np
 import cython
 cimport numpy as np
+from libc.math cimport fabs
 import scipy.sparse as sp
 
 def _interp_point_1D(np.ndarray[np.float64_t, ndim=1] x, float xr_i):
@@ -24,7 +25,7 @@ cdef struct IIFF:
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.nonecheck(False)
-cdef np.int64_t _bisect_left(np.float64_t[:] a, np.float64_t x) nogil:
+cdef np.int64_t _bisect_left(const np.float64_t[:] a, np.float64_t x) nogil:
     cdef np.int64_t lo, hi, mid
     lo = 0
     hi = a.shape[0]
@@ -37,7 +38,7 @@ cdef np.int64_t _bisect_left(np.float64_t[:] a, np.float64_t x) nogil:
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.nonecheck(False)
-cdef np.int64_t _bisect_right(np.float64_t[:] a, np.float64_t x) nogil:
+cdef np.int64_t _bisect_right(const np.float64_t[:] a, np.float64_t x) nogil:
     cdef np.int64_t lo, hi, mid
     lo = 0
     hi = a.shape[0]
@@ -51,7 +52,7 @@ cdef np.int64_t _bisect_right(np.float64_t[:] a, np.float64_t x) nogil:
 @cython.wraparound(False)
 @cython.nonecheck(False)
 @cython.cdivision(True)
-cdef void _get_inds_ws(np.float64_t[:] x, np.float64_t xp, IIFF* out) nogil:
+cdef void _get_inds_ws(const np.float64_t[:] x, np.float64_t xp, IIFF* out) nogil:
     cdef np.int64_t ind = _bisect_right(x,xp)
     cdef np.int64_t nx = x.shape[0]
     out.i2 = ind
@@ -64,120 +65,301 @@ cdef void _get_inds_ws(np.float64_t[:] x, np.float64_t xp, IIFF* out) nogil:
         out.w1 = (x[out.i2]-xp)/(x[out.i2]-x[out.i1])
     out.w2 = 1-out.w1
 
+ctypedef fused index_t:
+    np.int32_t
+    np.int64_t
+
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.nonecheck(False)
-def _interpmat1D(np.ndarray[np.float64_t, ndim=1] locs,
-                   np.ndarray[np.float64_t, ndim=1] x):
-    cdef int nx = x.size
+cdef void _get_sorted_inds_ws(const np.float64_t[:] x, np.float64_t xp,
+                              np.int64_t* inds, np.float64_t* ws) nogil:
+    # like _get_inds_ws, but a point clamped to an end of x gets its whole
+    # weight on the end and a zero weight on its neighbour, so that the two
+    # indices are distinct (when x has more than one entry) and sorted
     cdef IIFF xs
-    cdef int npts = locs.shape[0]
-    cdef int i
-
-    cdef np.ndarray[np.int64_t,ndim=1] inds = np.empty(npts*2,dtype=np.int64)
-    cdef np.ndarray[np.float64_t,ndim=1] vals = np.empty(npts*2,dtype=np.float64)
-    for i in range(npts):
-        _get_inds_ws(x,locs[i],&xs)
-
-        inds[2*i  ] = xs.i1
-        inds[2*i+1] = xs.i2
-        vals[2*i  ] = xs.w1
-        vals[2*i+1] = xs.w2
-
-    return inds,vals
+    _get_inds_ws(x, xp, &xs)
+    inds[0], inds[1] = xs.i1, xs.i2
+    ws[0], ws[1] = xs.w1, xs.w2
+    if xs.i1 == xs.i2:
+        if xs.i2 + 1 < x.shape[0]:
+            inds[1] = xs.i2 + 1
+            ws[0], ws[1] = 1.0, 0.0
+        elif xs.i1 > 0:
+            inds[0] = xs.i1 - 1
+            ws[0], ws[1] = 0.0, 1.0
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.nonecheck(False)
-def _interpmat2D(np.ndarray[np.float64_t, ndim=2] locs,
-                   np.ndarray[np.float64_t, ndim=1] x,
-                   np.ndarray[np.float64_t, ndim=1] y):
-    cdef int nx,ny
-    nx,ny = len(x),len(y)
-    cdef int npts = locs.shape[0]
-    cdef int i
-    cdef IIFF xs,ys
-
-    cdef np.ndarray[np.int64_t,ndim=2] inds = np.empty((npts*4,2),dtype=np.int64)
-    cdef np.ndarray[np.float64_t,ndim=1] vals = np.empty(npts*4,dtype=np.float64)
-    for i in range(npts):
-        _get_inds_ws(x,locs[i,0],&xs)
-        _get_inds_ws(y,locs[i,1],&ys)
-
-        inds[4*i  ,0] = xs.i1
-        inds[4*i+1,0] = xs.i1
-        inds[4*i+2,0] = xs.i2
-        inds[4*i+3,0] = xs.i2
-        inds[4*i  ,1] = ys.i1
-        inds[4*i+1,1] = ys.i2
-        inds[4*i+2,1] = ys.i1
-        inds[4*i+3,1] = ys.i2
-
-        vals[4*i  ] = xs.w1*ys.w1
-        vals[4*i+1] = xs.w1*ys.w2
-        vals[4*i+2] = xs.w2*ys.w1
-        vals[4*i+3] = xs.w2*ys.w2
-
-    return inds,vals
+def _interpolation_csr(const np.float64_t[:, :] locs,
+                       const np.float64_t[:] x,
+                       const np.float64_t[:] y,
+                       const np.float64_t[:] z,
+                       index_t[:] indices,
+                       np.float64_t[:] data,
+                       Py_ssize_t start, Py_ssize_t stop):
+    """
+        Write the 2**dim column indices and weights of the linear
+        interpolation to the points start to stop of locs into the CSR
+        arrays indices and data, sorted by column within each row. The
+        unused y (and z) tensors of 1D (and 2D) grids are ignored.
+    """
+    cdef int dim = locs.shape[1]
+    cdef np.int64_t nx = x.shape[0]
+    cdef np.int64_t ny = y.shape[0] if dim > 1 else 1
+    cdef int nb = 2 if dim > 1 else 1
+    cdef int nc = 2 if dim > 2 else 1
+    cdef np.int64_t ix[2]
+    cdef np.int64_t iy[2]
+    cdef np.int64_t iz[2]
+    cdef np.float64_t wx[2]
+    cdef np.float64_t wy[2]
+    cdef np.float64_t wz[2]
+    cdef Py_ssize_t i, p
+    cdef int a, b, c
+    iy[0] = iz[0] = 0
+    wy[0] = wz[0] = 1.0
+    with nogil:
+        for i in range(start, stop):
+            _get_sorted_inds_ws(x, locs[i, 0], ix, wx)
+            if dim > 1:
+                _get_sorted_inds_ws(y, locs[i, 1], iy, wy)
+            if dim > 2:
+                _get_sorted_inds_ws(z, locs[i, 2], iz, wz)
+            p = i << dim
+            for c in range(nc):
+                for b in range(nb):
+                    for a in range(2):
+                        indices[p] = <index_t>(ix[a] + nx * (iy[b] + ny * iz[c]))
+                        data[p] = wx[a] * wy[b] * wz[c]
+                        p += 1
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.nonecheck(False)
-def _interpmat3D(np.ndarray[np.float64_t, ndim=2] locs,
-                 np.ndarray[np.float64_t, ndim=1] x,
-                 np.ndarray[np.float64_t, ndim=1] y,
-                 np.ndarray[np.float64_t, ndim=1] z):
-
-    cdef int nx,ny,nz
-    nx,ny,nz = len(x),len(y),len(z)
-    cdef IIFF xs,ys,zs
-    cdef int npts = locs.shape[0]
-    cdef int i
-
-    cdef np.ndarray[np.int64_t,ndim=2] inds = np.empty((npts*8,3),dtype=np.int64)
-    cdef np.ndarray[np.float64_t,ndim=1] vals = np.empty(npts*8,dtype=np.float64)
-    for i in range(npts):
-        _get_inds_ws(x,locs[i,0],&xs)
-        _get_inds_ws(y,locs[i,1],&ys)
-        _get_inds_ws(z,locs[i,2],&zs)
-
-        inds[8*i  ,0] = xs.i1
-        inds[8*i+1,0] = xs.i1
-        inds[8*i+2,0] = xs.i2
-        inds[8*i+3,0] = xs.i2
-        inds[8*i+4,0] = xs.i1
-        inds[8*i+5,0] = xs.i1
-        inds[8*i+6,0] = xs.i2
-        inds[8*i+7,0] = xs.i2
-
-        inds[8*i  ,1] = ys.i1
-        inds[8*i+1,1] = ys.i2
-        inds[8*i+2,1] = ys.i1
-        inds[8*i+3,1] = ys.i2
-        inds[8*i+4,1] = ys.i1
-        inds[8*i+5,1] = ys.i2
-        inds[8*i+6,1] = ys.i1
-        inds[8*i+7,1] = ys.i2
-
-        inds[8*i  ,2] = zs.i1
-        inds[8*i+1,2] = zs.i1
-        inds[8*i+2,2] = zs.i1
-        inds[8*i+3,2] = zs.i1
-        inds[8*i+4,2] = zs.i2
-        inds[8*i+5,2] = zs.i2
-        inds[8*i+6,2] = zs.i2
-        inds[8*i+7,2] = zs.i2
+def _interpolate_values(const np.float64_t[:, :] locs,
+                        const np.float64_t[:] x,
+                        const np.float64_t[:] y,
+                        const np.float64_t[:] z,
+                        const np.float64_t[:, :] values,
+                        np.float64_t[:, :] out,
+                        Py_ssize_t start, Py_ssize_t stop):
+    """
+        Linearly interpolate the columns of values, defined on the grid of
+        the tensors (x fastest), to the points start to stop of locs into
+        the rows of out. The unused y (and z) tensors of 1D (and 2D) grids
+        are ignored.
+    """
+    cdef int dim = locs.shape[1]
+    cdef np.int64_t nx = x.shape[0]
+    cdef np.int64_t ny = y.shape[0] if dim > 1 else 1
+    cdef Py_ssize_t n_values = values.shape[1]
+    cdef IIFF xs, ys, zs
+    cdef np.int64_t ix[2]
+    cdef np.int64_t iy[2]
+    cdef np.int64_t iz[2]
+    cdef np.float64_t wx[2]
+    cdef np.float64_t wy[2]
+    cdef np.float64_t wz[2]
+    cdef int nb = 2 if dim > 1 else 1
+    cdef int nc = 2 if dim > 2 else 1
+    cdef Py_ssize_t i, k, row
+    cdef int a, b, c
+    cdef np.float64_t w
+    iy[0] = iz[0] = 0
+    wy[0] = wz[0] = 1.0
+    with nogil:
+        for i in range(start, stop):
+            _get_inds_ws(x, locs[i, 0], &xs)
+            ix[0], ix[1], wx[0], wx[1] = xs.i1, xs.i2, xs.w1, xs.w2
+            if dim > 1:
+                _get_inds_ws(y, locs[i, 1], &ys)
+                iy[0], iy[1], wy[0], wy[1] = ys.i1, ys.i2, ys.w1, ys.w2
+            if dim > 2:
+                _get_inds_ws(z, locs[i, 2], &zs)
+                iz[0], iz[1], wz[0], wz[1] = zs.i1, zs.i2, zs.w1, zs.w2
+            for k in range(n_values):
+                out[i, k] = 0.0
+            for c in range(nc):
+                for b in range(nb):
+                    for a in range(2):
+                        w = wx[a] * wy[b] * wz[c]
+                        if w != 0.0:
+                            row = ix[a] + nx * (iy[b] + ny * iz[c])
+                            for k in range(n_values):
+                                out[i, k] += w * values[row, k]
 
-        vals[8*i  ] = xs.w1*ys.w1*zs.w1
-        vals[8*i+1] = xs.w1*ys.w2*zs.w1
-        vals[8*i+2] = xs.w2*ys.w1*zs.w1
-        vals[8*i+3] = xs.w2*ys.w2*zs.w1
-        vals[8*i+4] = xs.w1*ys.w1*zs.w2
-        vals[8*i+5] = xs.w1*ys.w2*zs.w2
-        vals[8*i+6] = xs.w2*ys.w1*zs.w2
-        vals[8*i+7] = xs.w2*ys.w2*zs.w2
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+cdef bint _invert_multilinear(const np.float64_t* p, np.float64_t xc[8][3],
+                              int dim, np.float64_t* u) nogil:
+    # Newton iterations for the reference coordinates u of the point p in
+    # the (bi/tri)linear cell with corners xc (x fastest), starting from the
+    # cell center. Returns whether they converged.
+    cdef int n_corners = 1 << dim
+    cdef int it, c, d, e
+    cdef np.float64_t N, det, step
+    cdef np.float64_t dN[3]
+    cdef np.float64_t r[3]
+    cdef np.float64_t du[3]
+    cdef np.float64_t J[3][3]
+    for d in range(dim):
+        u[d] = 0.5
+    for it in range(20):
+        for d in range(dim):
+            r[d] = -p[d]
+            for e in range(dim):
+                J[d][e] = 0.0
+        for c in range(n_corners):
+            N = 1.0
+            for d in range(dim):
+                dN[d] = 1.0
+            for d in range(dim):
+                if (c >> d) & 1:
+                    N *= u[d]
+                    for e in range(dim):
+                        dN[e] *= 1.0 if e == d else u[d]
+                else:
+                    N *= 1.0 - u[d]
+                    for e in range(dim):
+                        dN[e] *= -1.0 if e == d else 1.0 - u[d]
+            for d in range(dim):
+                r[d] += N * xc[c][d]
+                for e in range(dim):
+                    J[d][e] += dN[e] * xc[c][d]
+        # solve J du = -r by Cramer's rule
+        if dim == 2:
+            det = J[0][0] * J[1][1] - J[0][1] * J[1][0]
+            if det == 0.0:
+                return False
+            du[0] = (-r[0] * J[1][1] + r[1] * J[0][1]) / det
+            du[1] = (-r[1] * J[0][0] + r[0] * J[1][0]) / det
+        else:
+            det = (
+                J[0][0] * (J[1][1] * J[2][2] - J[1][2] * J[2][1])
+                - J[0][1] * (J[1][0] * J[2][2] - J[1][2] * J[2][0])
+                + J[0][2] * (J[1][0] * J[2][1] - J[1][1] * J[2][0])
+            )
+            if det == 0.0:
+                return False
+            du[0] = -(
+                r[0] * (J[1][1] * J[2][2] - J[1][2] * J[2][1])
+                - J[0][1] * (r[1] * J[2][2] - J[1][2] * r[2])
+                + J[0][2] * (r[1] * J[2][1] - J[1][1] * r[2])
+            ) / det
+            du[1] = -(
+                J[0][0] * (r[1] * J[2][2] - J[1][2] * r[2])
+                - r[0] * (J[1][0] * J[2][2] - J[1][2] * J[2][0])
+                + J[0][2] * (J[1][0] * r[2] - r[1] * J[2][0])
+            ) / det
+            du[2] = -(
+                J[0][0] * (J[1][1] * r[2] - r[1] * J[2][1])
+                - J[0][1] * (J[1][0] * r[2] - r[1] * J[2][0])
+                + r[0] * (J[1][0] * J[2][1] - J[1][1] * J[2][0])
+            ) / det
+        step = 0.0
+        for d in range(dim):
+            u[d] += du[d]
+            step = max(step, fabs(du[d]))
+        if step < 1E-12:
+            return True
+    return False
 
-    return inds,vals
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+def _locate_in_cells(const np.float64_t[:, :] locs,
+                     const np.float64_t[:, :] nodes,
+                     const np.int64_t[:] shape,
+                     const np.float64_t[:] lower,
+                     const np.float64_t[:] width,
+                     index_t[:] bucket_ptr,
+                     index_t[:] bucket_cells,
+                     np.int64_t[:] cells,
+                     np.float64_t[:, :] ref,
+                     Py_ssize_t start, Py_ssize_t stop):
+    """
+        Find the cells of a structured grid of (bi/tri)linear cells, with
+        shape cells along each axis and nodes ordered x fastest, containing
+        the points start to stop of locs. The candidate cells of each point
+        are those of its bucket, the buckets form a regular grid of shape
+        buckets of the given lower corner and width, and list their cells
+        in CSR format. The cell of each point (-1 when outside of the grid)
+        is written to cells and its reference coordinates, in [0, 1], to the
+        rows of ref.
+    """
+    cdef int dim = locs.shape[1]
+    cdef int n_corners = 1 << dim
+    cdef np.int64_t nx = shape[0], ny = shape[1]
+    cdef np.int64_t nz = shape[2] if dim > 2 else 1
+    cdef np.int64_t bucket, cell, node, stride
+    cdef np.int64_t ind[3]
+    cdef np.float64_t p[3]
+    cdef np.float64_t u[3]
+    cdef np.float64_t xc[8][3]
+    cdef np.float64_t lo, hi, t, tol
+    cdef Py_ssize_t i, j
+    cdef int c, d
+    cdef bint inside
+    with nogil:
+        for i in range(start, stop):
+            cells[i] = -1
+            bucket = 0
+            stride = 1
+            inside = True
+            for d in range(dim):
+                p[d] = locs[i, d]
+                t = (p[d] - lower[d]) / width[d]
+                # range check before the cast, this also rejects NaN
+                if not (t >= -1E-8 and t <= shape[d] + 1E-8):
+                    inside = False
+                    break
+                if t < 0.0:
+                    t = 0.0
+                ind[d] = <np.int64_t> t
+                if ind[d] >= shape[d]:
+                    ind[d] = shape[d] - 1
+                bucket += ind[d] * stride
+                stride *= shape[d]
+            if not inside:
+                continue
+            for j in range(bucket_ptr[bucket], bucket_ptr[bucket + 1]):
+                cell = bucket_cells[j]
+                ind[0] = cell % nx
+                ind[1] = (cell // nx) % ny
+                ind[2] = cell // (nx * ny)
+                for c in range(n_corners):
+                    node = (
+                        ind[0] + (c & 1)
+                        + (nx + 1) * (ind[1] + ((c >> 1) & 1)
+                        + (ny + 1) * (ind[2] + ((c >> 2) & 1)))
+                    )
+                    for d in range(dim):
+                        xc[c][d] = nodes[node, d]
+                # skip the cells whose bounding box misses the point
+                for d in range(dim):
+                    lo = hi = xc[0][d]
+                    for c in range(1, n_corners):
+                        lo = min(lo, xc[c][d])
+                        hi = max(hi, xc[c][d])
+                    tol = 1E-10 * (hi - lo)
+                    if p[d] < lo - tol or p[d] > hi + tol:
+                        break
+                else:
+                    if not _invert_multilinear(p, xc, dim, u):
+                        continue
+                    for d in range(dim):
+                        if u[d] < -1E-8 or u[d] > 1 + 1E-8:
+                            break
+                    else:
+                        cells[i] = cell
+                        for d in range(dim):
+                            ref[i, d] = min(max(u[d], 0.0), 1.0)
+                        break
 
 @cython.boundscheck(False)
 @cython.cdivision(True)
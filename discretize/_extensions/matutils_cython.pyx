@@ -0,0 +1,84 @@
+# cython: embedsignature=True, language_level=3, cdivision=True
+import cython
+cimport numpy as np
+
+ctypedef fused index_t:
+    np.int32_t
+    np.int64_t
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _inverse_symmetric_2x2(const double[:, :] A, double[:, :] B, Py_ssize_t start, Py_ssize_t stop):
+    """
+        Invert the packed symmetric 2x2 tensors [a11, a22, a12] in rows
+        start to stop of A into B (which may be A).
+    """
+    cdef Py_ssize_t i
+    cdef double a11, a22, a12, det
+    with nogil:
+        for i in range(start, stop):
+            a11 = A[i, 0]
+            a22 = A[i, 1]
+            a12 = A[i, 2]
+            det = a11 * a22 - a12 * a12
+            B[i, 0] = a22 / det
+            B[i, 1] = a11 / det
+            B[i, 2] = -a12 / det
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _inverse_symmetric_3x3(const double[:, :] A, double[:, :] B, Py_ssize_t start, Py_ssize_t stop):
+    """
+        Invert the packed symmetric 3x3 tensors [a11, a22, a33, a12, a13, a23]
+        in rows start to stop of A into B (which may be A).
+    """
+    cdef Py_ssize_t i
+    cdef double a11, a22, a33, a12, a13, a23
+    cdef double c11, c22, c33, c12, c13, c23, det
+    with nogil:
+        for i in range(start, stop):
+            a11 = A[i, 0]
+            a22 = A[i, 1]
+            a33 = A[i, 2]
+            a12 = A[i, 3]
+            a13 = A[i, 4]
+            a23 = A[i, 5]
+            # cofactors, the inverse is their (symmetric) matrix over det
+            c11 = a22 * a33 - a23 * a23
+            c22 = a11 * a33 - a13 * a13
+            c33 = a11 * a22 - a12 * a12
+            c12 = a13 * a23 - a12 * a33
+            c13 = a12 * a23 - a13 * a22
+            c23 = a12 * a13 - a11 * a23
+            det = a11 * c11 + a12 * c12 + a13 * c13
+            B[i, 0] = c11 / det
+            B[i, 1] = c22 / det
+            B[i, 2] = c33 / det
+            B[i, 3] = c12 / det
+            B[i, 4] = c13 / det
+            B[i, 5] = c23 / det
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _csr_matmat(index_t[:] indptr, index_t[:] indices, const double[:] data,
+                const double[:, :] x, double[:, :] out,
+                Py_ssize_t start, Py_ssize_t stop):
+    """
+        Write rows start to stop of the product of the CSR matrix (indptr,
+        indices, data) with the columns of x into out.
+    """
+    cdef Py_ssize_t i, j, k, col
+    cdef Py_ssize_t n_columns = x.shape[1]
+    cdef double w
+    with nogil:
+        for i in range(start, stop):
+            for k in range(n_columns):
+                out[i, k] = 0.0
+            for j in range(indptr[i], indptr[i + 1]):
+                col = indices[j]
+                w = data[j]
+                for k in range(n_columns):
+                    out[i, k] += w * x[col, k]
@@ -7,6 +7,7 @@ from libcpp.vector cimport vector
 from numpy.math cimport INFINITY
 
 from tree cimport int_t, Tree as c_Tree, PyWrapper, Node, Edge, Face, Cell as c_Cell
+from tree cimport edge_map_t
 
 import scipy.sparse as sp
 import numpy as np
@@ -233,19 +234,8 @@ cdef class _TreeMesh:
     cdef double[:] _xs, _ys, _zs
     cdef double[:] _origin
 
-    cdef object _cell_centers, _nodes, _hanging_nodes
-    cdef object _edges_x, _edges_y, _edges_z, _hanging_edges_x, _hanging_edges_y, _hanging_edges_z
-    cdef object _faces_x, _faces_y, _faces_z, _hanging_faces_x, _hanging_faces_y, _hanging_faces_z
-
-    cdef object _h_gridded
-    cdef object _cell_volumes, _face_areas, _edge_lengths
-    cdef object _average_face_x_to_cell, _average_face_y_to_cell, _average_face_z_to_cell, _average_face_to_cell, _average_face_to_cell_vector,
-    cdef object _average_node_to_cell, _average_node_to_edge, _average_node_to_edge_x, _average_node_to_edge_y, _average_node_to_edge_z
-    cdef object _average_node_to_face, _average_node_to_face_x, _average_node_to_face_y, _average_node_to_face_z
-    cdef object _average_edge_x_to_cell, _average_edge_y_to_cell, _average_edge_z_to_cell, _average_edge_to_cell, _average_edge_to_cell_vector
-    cdef object _average_cell_to_face, _average_cell_vector_to_face, _average_cell_to_face_x, _average_cell_to_face_y, _average_cell_to_face_z
-    cdef object _face_divergence
-    cdef object _edge_curl, _nodal_gradient
+    # The cached geometry and operators (_cell_centers, _face_divergence, ...)
+    # are plain Python attributes, held in the mesh's operator cache.
 
     cdef object __ubc_order, __ubc_indArr
 
@@ -315,6 +305,7 @@ cdef class _TreeMesh:
         self._edge_lengths = None
 
         self._average_cell_to_face = None
+        self._average_cell_vector_to_face = None
         self._average_cell_to_face_x = None
         self._average_cell_to_face_y = None
         self._average_cell_to_face_z = None
@@ -345,6 +336,14 @@ cdef class _TreeMesh:
         self._nodal_gradient = None
         self._edge_curl = None
 
+        self._boundary_offsets = None
+        self._cell_boundary_ind = None
+        self._face_boundary_ind = None
+        self._boundary_face_indices = None
+        self._boundary_face_outward_normals = None
+        self._boundary_edge_indices = None
+        self._boundary_node_indices = None
+
         self.__ubc_order = None
         self.__ubc_indArr = None
 
@@ -443,6 +442,12 @@ cdef class _TreeMesh:
             self.tree.finalize_lists()
             self.tree.number()
             self._finalized=True
+            self._clear_cache()
+
+    @property
+    def finalized(self):
+        """Whether the TreeMesh has been finalized."""
+        return bool(self._finalized)
 
     def number(self):
         """Number the cells, nodes, faces, and edges of the TreeMesh"""
@@ -714,12 +719,13 @@ cdef class _TreeMesh:
         cdef np.int64_t ii, ind, dim
         if self._cell_centers is None:
             dim = self._dim
-            self._cell_centers = np.empty((self.n_cells, self._dim), dtype=np.float64)
-            gridCC = self._cell_centers
+            values = np.empty((self.n_cells, self._dim), dtype=np.float64)
+            gridCC = values
             for cell in self.tree.cells:
                 ind = cell.index
                 for ii in range(dim):
                     gridCC[ind, ii] = cell.location[ii]
+            self._cell_centers = values
         return self._cell_centers
 
     @property
@@ -733,14 +739,15 @@ cdef class _TreeMesh:
         cdef np.int64_t ii, ind, dim
         if self._nodes is None:
             dim = self._dim
-            self._nodes = np.empty((self.n_nodes, dim) ,dtype=np.float64)
-            gridN = self._nodes
+            values = np.empty((self.n_nodes, dim) ,dtype=np.float64)
+            gridN = values
             for it in self.tree.nodes:
                 node = it.second
                 if not node.hanging:
                     ind = node.index
                     for ii in range(dim):
                         gridN[ind, ii] = node.location[ii]
+            self._nodes = values
         return self._nodes
 
     @property
@@ -754,12 +761,13 @@ cdef class _TreeMesh:
         cdef np.int64_t ii, ind, dim
         if self._hanging_nodes is None:
             dim = self._dim
-            self._hanging_nodes = np.empty((self.n_hanging_nodes, dim), dtype=np.float64)
-            gridhN = self._hanging_nodes
+            values = np.empty((self.n_hanging_nodes, dim), dtype=np.float64)
+            gridhN = values
             for node in self.tree.hanging_nodes:
                 ind = node.index-self.n_nodes
                 for ii in range(dim):
                     gridhN[ind, ii] = node.location[ii]
+            self._hanging_nodes = values
         return self._hanging_nodes
 
     @property
@@ -774,13 +782,14 @@ cdef class _TreeMesh:
         cdef np.float64_t len
         cdef int epc = 4 if self._dim==3 else 2
         dim = self._dim
-        self._h_gridded = np.empty((self.n_cells, dim), dtype=np.float64)
-        gridCH = self._h_gridded
+        values = np.empty((self.n_cells, dim), dtype=np.float64)
+        gridCH = values
         for cell in self.tree.cells:
             ind = cell.index
             for ii in range(dim):
                 gridCH[ind, ii] = cell.edges[ii*epc].length
 
+        self._h_gridded = values
         return self._h_gridded
 
     @property
@@ -794,14 +803,15 @@ cdef class _TreeMesh:
         cdef np.int64_t ii, ind, dim
         if self._edges_x is None:
             dim = self._dim
-            self._edges_x = np.empty((self.n_edges_x, dim), dtype=np.float64)
-            gridEx = self._edges_x
+            values = np.empty((self.n_edges_x, dim), dtype=np.float64)
+            gridEx = values
             for it in self.tree.edges_x:
                 edge = it.second
                 if not edge.hanging:
                     ind = edge.index
                     for ii in range(dim):
                         gridEx[ind, ii] = edge.location[ii]
+            self._edges_x = values
         return self._edges_x
 
     @property
@@ -815,12 +825,13 @@ cdef class _TreeMesh:
         cdef np.int64_t ii, ind, dim
         if self._hanging_edges_x is None:
             dim = self._dim
-            self._hanging_edges_x = np.empty((self.n_hanging_edges_x, dim), dtype=np.float64)
-            gridhEx = self._hanging_edges_x
+            values = np.empty((self.n_hanging_edges_x, dim), dtype=np.float64)
+            gridhEx = values
             for edge in self.tree.hanging_edges_x:
                 ind = edge.index-self.n_edges_x
                 for ii in range(dim):
                     gridhEx[ind, ii] = edge.location[ii]
+            self._hanging_edges_x = values
         return self._hanging_edges_x
 
     @property
@@ -834,14 +845,15 @@ cdef class _TreeMesh:
         cdef np.int64_t ii, ind, dim
         if self._edges_y is None:
             dim = self._dim
-            self._edges_y = np.empty((self.n_edges_y, dim), dtype=np.float64)
-            gridEy = self._edges_y
+            values = np.empty((self.n_edges_y, dim), dtype=np.float64)
+            gridEy = values
             for it in self.tree.edges_y:
                 edge = it.second
                 if not edge.hanging:
                     ind = edge.index
                     for ii in range(dim):
                         gridEy[ind, ii] = edge.location[ii]
+            self._edges_y = values
         return self._edges_y
 
     @property
@@ -855,12 +867,13 @@ cdef class _TreeMesh:
         cdef np.int64_t ii, ind, dim
         if self._hanging_edges_y is None:
             dim = self._dim
-            self._hanging_edges_y = np.empty((self.n_hanging_edges_y, dim), dtype=np.float64)
-            gridhEy = self._hanging_edges_y
+            values = np.empty((self.n_hanging_edges_y, dim), dtype=np.float64)
+            gridhEy = values
             for edge in self.tree.hanging_edges_y:
                 ind = edge.index-self.n_edges_y
                 for ii in range(dim):
                     gridhEy[ind, ii] = edge.location[ii]
+            self._hanging_edges_y = values
         return self._hanging_edges_y
 
     @property
@@ -874,14 +887,15 @@ cdef class _TreeMesh:
         cdef np.int64_t ii, ind, dim
         if self._edges_z is None:
             dim = self._dim
-            self._edges_z = np.empty((self.n_edges_z, dim), dtype=np.float64)
-            gridEz = self._edges_z
+            values = np.empty((self.n_edges_z, dim), dtype=np.float64)
+            gridEz = values
             for it in self.tree.edges_z:
                 edge = it.second
                 if not edge.hanging:
                     ind = edge.index
                     for ii in range(dim):
                         gridEz[ind, ii] = edge.location[ii]
+            self._edges_z = values
         return self._edges_z
 
     @property
@@ -895,12 +909,13 @@ cdef class _TreeMesh:
         cdef np.int64_t ii, ind, dim
         if self._hanging_edges_z is None:
             dim = self._dim
-            self._hanging_edges_z = np.empty((self.n_hanging_edges_z, dim), dtype=np.float64)
-            gridhEz = self._hanging_edges_z
+            values = np.empty((self.n_hanging_edges_z, dim), dtype=np.float64)
+            gridhEz = values
             for edge in self.tree.hanging_edges_z:
                 ind = edge.index-self.n_edges_z
                 for ii in range(dim):
                     gridhEz[ind, ii] = edge.location[ii]
+            self._hanging_edges_z = values
         return self._hanging_edges_z
 
     @property
@@ -916,14 +931,15 @@ cdef class _TreeMesh:
         cdef np.int64_t ii, ind, dim
         if self._faces_x is None:
             dim = self._dim
-            self._faces_x = np.empty((self.n_faces_x, dim), dtype=np.float64)
-            gridFx = self._faces_x
+            values = np.empty((self.n_faces_x, dim), dtype=np.float64)
+            gridFx = values
             for it in self.tree.faces_x:
                 face = it.second
                 if not face.hanging:
                     ind = face.index
                     for ii in range(dim):
                         gridFx[ind, ii] = face.location[ii]
+            self._faces_x = values
         return self._faces_x
 
     @property
@@ -938,14 +954,15 @@ cdef class _TreeMesh:
         cdef np.int64_t ii, ind, dim
         if self._faces_y is None:
             dim = self._dim
-            self._faces_y = np.empty((self.n_faces_y, dim), dtype=np.float64)
-            gridFy = self._faces_y
+            values = np.empty((self.n_faces_y, dim), dtype=np.float64)
+            gridFy = values
             for it in self.tree.faces_y:
                 face = it.second
                 if not face.hanging:
                     ind = face.index
                     for ii in range(dim):
                         gridFy[ind, ii] = face.location[ii]
+            self._faces_y = values
         return self._faces_y
 
     @property
@@ -961,14 +978,15 @@ cdef class _TreeMesh:
         cdef np.int64_t ii, ind, dim
         if self._faces_z is None:
             dim = self._dim
-            self._faces_z = np.empty((self.n_faces_z, dim), dtype=np.float64)
-            gridFz = self._faces_z
+            values = np.empty((self.n_faces_z, dim), dtype=np.float64)
+            gridFz = values
             for it in self.tree.faces_z:
                 face = it.second
                 if not face.hanging:
                     ind = face.index
                     for ii in range(dim):
                         gridFz[ind, ii] = face.location[ii]
+            self._faces_z = values
         return self._faces_z
 
     @property
@@ -984,12 +1002,13 @@ cdef class _TreeMesh:
         cdef np.int64_t ii, ind, dim
         if self._hanging_faces_x is None:
             dim = self._dim
-            self._hanging_faces_x = np.empty((self.n_hanging_faces_x, dim), dtype=np.float64)
-            gridhFx = self._hanging_faces_x
+            values = np.empty((self.n_hanging_faces_x, dim), dtype=np.float64)
+            gridhFx = values
             for face in self.tree.hanging_faces_x:
                 ind = face.index-self.n_faces_x
                 for ii in range(dim):
                     gridhFx[ind, ii] = face.location[ii]
+            self._hanging_faces_x = values
         return self._hanging_faces_x
 
     @property
@@ -1005,12 +1024,13 @@ cdef class _TreeMesh:
         cdef np.int64_t ii, ind, dim
         if self._hanging_faces_y is None:
             dim = self._dim
-            self._hanging_faces_y = np.empty((self.n_hanging_faces_y, dim), dtype=np.float64)
-            gridhFy = self._hanging_faces_y
+            values = np.empty((self.n_hanging_faces_y, dim), dtype=np.float64)
+            gridhFy = values
             for face in self.tree.hanging_faces_y:
                 ind = face.index-self.n_faces_y
                 for ii in range(dim):
                     gridhFy[ind, ii] = face.location[ii]
+            self._hanging_faces_y = values
         return self._hanging_faces_y
 
     @property
@@ -1026,12 +1046,13 @@ cdef class _TreeMesh:
         cdef np.int64_t ii, ind, dim
         if self._hanging_faces_z is None:
             dim = self._dim
-            self._hanging_faces_z = np.empty((self.n_hanging_faces_z, dim), dtype=np.float64)
-            gridhFz = self._hanging_faces_z
+            values = np.empty((self.n_hanging_faces_z, dim), dtype=np.float64)
+            gridhFz = values
             for face in self.tree.hanging_faces_z:
                 ind = face.index-self.n_faces_z
                 for ii in range(dim):
                     gridhFz[ind, ii] = face.location[ii]
+            self._hanging_faces_z = values
         return self._hanging_faces_z
 
     @property
@@ -1042,10 +1063,11 @@ cdef class _TreeMesh:
         """
         cdef np.float64_t[:] vol
         if self._cell_volumes is None:
-            self._cell_volumes = np.empty(self.n_cells, dtype=np.float64)
-            vol = self._cell_volumes
+            values = np.empty(self.n_cells, dtype=np.float64)
+            vol = values
             for cell in self.tree.cells:
                 vol[cell.index] = cell.volume
+            self._cell_volumes = values
         return self._cell_volumes
 
     @property
@@ -1060,8 +1082,8 @@ cdef class _TreeMesh:
         cdef int_t ind, offset = 0
         cdef Face *face
         if self._face_areas is None:
-            self._face_areas = np.empty(self.n_faces, dtype=np.float64)
-            area = self._face_areas
+            values = np.empty(self.n_faces, dtype=np.float64)
+            area = values
 
             for it in self.tree.faces_x:
                 face = it.second
@@ -1079,6 +1101,7 @@ cdef class _TreeMesh:
                 face = it.second
                 if face.hanging: continue
                 area[face.index + offset] = face.area
+            self._face_areas = values
         return self._face_areas
 
     @property
@@ -1091,8 +1114,8 @@ cdef class _TreeMesh:
         cdef Edge *edge
         cdef int_t ind, offset
         if self._edge_lengths is None:
-            self._edge_lengths = np.empty(self.n_edges, dtype=np.float64)
-            edge_l = self._edge_lengths
+            values = np.empty(self.n_edges, dtype=np.float64)
+            edge_l = values
 
             for it in self.tree.edges_x:
                 edge = it.second
@@ -1111,111 +1134,146 @@ cdef class _TreeMesh:
                     edge = it.second
                     if edge.hanging: continue
                     edge_l[edge.index + offset] = edge.length
+            self._edge_lengths = values
         return self._edge_lengths
 
+    def _set_boundary_indices(self):
+        """Find the boundary cells, and their faces on the boundary, in each
+        direction xdown, xup, ydown, yup, zdown, zup in one pass over the cells.
+
+        Returns the offsets of the directions and the cell and face indices,
+        the cached copies may already be evicted.
+        """
+        cdef int_t n_dir = 2*self._dim
+        cdef np.int64_t[:, :] cells = np.empty((n_dir, self.n_cells), dtype=np.int64)
+        cdef np.int64_t[:, :] faces = np.empty((n_dir, self.n_cells), dtype=np.int64)
+        cdef np.int64_t[:] counts = np.zeros(n_dir, dtype=np.int64)
+        cdef c_Cell *cell
+        cdef int_t d
+        for cell in self.tree.cells:
+            for d in range(n_dir):
+                if cell.neighbors[d] == NULL:
+                    cells[d, counts[d]] = cell.index
+                    if self._dim == 3:
+                        faces[d, counts[d]] = cell.faces[d].index
+                    else:
+                        # x-faces are the y-edges in 2D (and vice versa)
+                        faces[d, counts[d]] = cell.edges[(d + 2) % 4].index
+                    counts[d] += 1
+        cells_arr = np.asarray(cells)
+        faces_arr = np.asarray(faces)
+        offsets = np.r_[0, np.cumsum(counts)]
+        cell_ind = np.concatenate([cells_arr[d, :counts[d]] for d in range(n_dir)])
+        face_ind = np.concatenate([faces_arr[d, :counts[d]] for d in range(n_dir)])
+        self._boundary_offsets = offsets
+        self._cell_boundary_ind = cell_ind
+        self._face_boundary_ind = face_ind
+        return offsets, cell_ind, face_ind
+
+    def _boundary_split(self, name):
+        offsets = self._boundary_offsets
+        values = getattr(self, name)
+        if offsets is None or values is None:
+            offsets, cell_ind, face_ind = self._set_boundary_indices()
+            values = cell_ind if name == "_cell_boundary_ind" else face_ind
+        return tuple(np.split(values, offsets[1:-1]))
+
     @property
     def cell_boundary_indices(self):
         """Returns a tuple of arrays of indexes for boundary cells in each direction
         xdown, xup, ydown, yup, zdown, zup
         """
-        cdef np.int64_t[:] indxu, indxd, indyu, indyd, indzu, indzd
-        indxu = np.empty(self.n_cells, dtype=np.int64)
-        indxd = np.empty(self.n_cells, dtype=np.int64)
-        indyu = np.empty(self.n_cells, dtype=np.int64)
-        indyd = np.empty(self.n_cells, dtype=np.int64)
-        if self._dim == 3:
-            indzu = np.empty(self.n_cells, dtype=np.int64)
-            indzd = np.empty(self.n_cells, dtype=np.int64)
-        cdef int_t nxu, nxd, nyu, nyd, nzu, nzd
-        nxu = 0
-        nxd = 0
-        nyu = 0
-        nyd = 0
-        nzu = 0
-        nzd = 0
-        for cell in self.tree.cells:
-            if cell.neighbors[0] == NULL:
-                indxd[nxd] = cell.index
-                nxd += 1
-            if cell.neighbors[1] == NULL:
-                indxu[nxu] = cell.index
-                nxu += 1
-            if cell.neighbors[2] == NULL:
-                indyd[nyd] = cell.index
-                nyd += 1
-            if cell.neighbors[3] == NULL:
-                indyu[nyu] = cell.index
-                nyu += 1
-            if self._dim == 3:
-                if cell.neighbors[4] == NULL:
-                    indzd[nzd] = cell.index
-                    nzd += 1
-                if cell.neighbors[5] == NULL:
-                    indzu[nzu] = cell.index
-                    nzu += 1
-        ixd = np.array(indxd)[:nxd]
-        ixu = np.array(indxu)[:nxu]
-        iyd = np.array(indyd)[:nyd]
-        iyu = np.array(indyu)[:nyu]
-        if self._dim == 3:
-            izd = np.array(indzd)[:nzd]
-            izu = np.array(indzu)[:nzu]
-            return ixd, ixu, iyd, iyu, izd, izu
-        else:
-            return ixd, ixu, iyd, iyu
+        return self._boundary_split("_cell_boundary_ind")
 
     @property
     def face_boundary_indices(self):
         """Returns a tuple of arrays of indexes for boundary faces in each direction
         xdown, xup, ydown, yup, zdown, zup
         """
-        cell_boundary_inds = self.cell_boundary_indices
-        cdef np.int64_t[:] c_indxu, c_indxd, c_indyu, c_indyd, c_indzu, c_indzd
-        cdef np.int64_t[:] f_indxu, f_indxd, f_indyu, f_indyd, f_indzu, f_indzd
-        if self._dim == 2:
-            c_indxd, c_indxu, c_indyd, c_indyu = cell_boundary_inds
-        else:
-            c_indxd, c_indxu, c_indyd, c_indyu, c_indzd, c_indzu = cell_boundary_inds
+        return self._boundary_split("_face_boundary_ind")
 
-        f_indxd = np.empty(c_indxd.shape[0], dtype=np.int64)
-        f_indxu = np.empty(c_indxu.shape[0], dtype=np.int64)
-        f_indyd = np.empty(c_indyd.shape[0], dtype=np.int64)
-        f_indyu = np.empty(c_indyu.shape[0], dtype=np.int64)
-        if self._dim == 2:
-            for i in range(f_indxd.shape[0]):
-                f_indxd[i] = self.tree.cells[c_indxd[i]].edges[2].index
-            for i in range(f_indxu.shape[0]):
-                f_indxu[i] = self.tree.cells[c_indxu[i]].edges[3].index
-            for i in range(f_indyd.shape[0]):
-                f_indyd[i] = self.tree.cells[c_indyd[i]].edges[0].index
-            for i in range(f_indyu.shape[0]):
-                f_indyu[i] = self.tree.cells[c_indyu[i]].edges[1].index
-        if self._dim == 3:
-            f_indzd = np.empty(c_indzd.shape[0], dtype=np.int64)
-            f_indzu = np.empty(c_indzu.shape[0], dtype=np.int64)
-
-            for i in range(f_indxd.shape[0]):
-                f_indxd[i] = self.tree.cells[c_indxd[i]].faces[0].index
-            for i in range(f_indxu.shape[0]):
-                f_indxu[i] = self.tree.cells[c_indxu[i]].faces[1].index
-            for i in range(f_indyd.shape[0]):
-                f_indyd[i] = self.tree.cells[c_indyd[i]].faces[2].index
-            for i in range(f_indyu.shape[0]):
-                f_indyu[i] = self.tree.cells[c_indyu[i]].faces[3].index
-            for i in range(f_indzd.shape[0]):
-                f_indzd[i] = self.tree.cells[c_indzd[i]].faces[4].index
-            for i in range(f_indzu.shape[0]):
-                f_indzu[i] = self.tree.cells[c_indzu[i]].faces[5].index
-        ixd = np.array(f_indxd)
-        ixu = np.array(f_indxu)
-        iyd = np.array(f_indyd)
-        iyu = np.array(f_indyu)
-        if self._dim == 3:
-            izd = np.array(f_indzd)
-            izu = np.array(f_indzu)
-            return ixd, ixu, iyd, iyu, izd, izu
-        else:
-            return ixd, ixu, iyd, iyu
+    @property
+    def boundary_face_indices(self):
+        """Returns an array of the indexes of all of the faces on the boundary,
+        the faces of face_boundary_indices ordered by direction
+        xdown, xup, ydown, yup, zdown, zup
+        """
+        if self._boundary_face_indices is None:
+            face_shift = np.r_[0, np.cumsum(self.vnF)]
+            self._boundary_face_indices = np.concatenate([
+                inds + face_shift[d//2]
+                for d, inds in enumerate(self.face_boundary_indices)
+            ])
+        return self._boundary_face_indices
+
+    @property
+    def boundary_face_outward_normals(self):
+        """Returns a numpy array of shape (n_boundary_faces, dim) with the
+        outward unit normals of the faces in boundary_face_indices
+        """
+        if self._boundary_face_outward_normals is None:
+            n_dir = 2*self._dim
+            normals = np.zeros((n_dir, self._dim))
+            normals[np.arange(n_dir), np.arange(n_dir)//2] = np.tile([-1.0, 1.0], self._dim)
+            counts = [len(inds) for inds in self.face_boundary_indices]
+            self._boundary_face_outward_normals = np.repeat(normals, counts, axis=0)
+        return self._boundary_face_outward_normals
+
+    @property
+    def boundary_edge_indices(self):
+        """Returns an array of the indexes of the (non-hanging) edges on the
+        boundary, in order
+        """
+        cdef np.int8_t[:] is_bound
+        cdef Edge *edge
+        cdef int_t[3] last
+        cdef int_t d, ind_d, n_dir, offset
+        cdef edge_map_t *edges[3]
+        if self._boundary_edge_indices is None:
+            last[:] = [self._xs.shape[0] - 1, self._ys.shape[0] - 1, self._zs.shape[0] - 1]
+            values = np.zeros(self.n_edges, dtype=np.int8)
+            is_bound = values
+            edges[0] = &self.tree.edges_x
+            edges[1] = &self.tree.edges_y
+            edges[2] = &self.tree.edges_z
+            offset = 0
+            for n_dir in range(self._dim):
+                for it in edges[n_dir][0]:
+                    edge = it.second
+                    if edge.hanging: continue
+                    # on the boundary across any direction it does not run along
+                    for d in range(self._dim):
+                        ind_d = edge.location_ind[d]
+                        if d != n_dir and (ind_d == 0 or ind_d == last[d]):
+                            is_bound[edge.index + offset] = 1
+                            break
+                offset += self.vnE[n_dir]
+            self._boundary_edge_indices = np.nonzero(values)[0]
+        return self._boundary_edge_indices
+
+    @property
+    def boundary_node_indices(self):
+        """Returns an array of the indexes of the (non-hanging) nodes on the
+        boundary, in order
+        """
+        cdef np.int8_t[:] is_bound
+        cdef Node *node
+        cdef int_t[3] last
+        cdef int_t d, ind_d
+        if self._boundary_node_indices is None:
+            last[:] = [self._xs.shape[0] - 1, self._ys.shape[0] - 1, self._zs.shape[0] - 1]
+            values = np.zeros(self.n_nodes, dtype=np.int8)
+            is_bound = values
+            for it in self.tree.nodes:
+                node = it.second
+                if node.hanging: continue
+                for d in range(self._dim):
+                    ind_d = node.location_ind[d]
+                    if ind_d == 0 or ind_d == last[d]:
+                        is_bound[node.index] = 1
+                        break
+            self._boundary_node_indices = np.nonzero(values)[0]
+        return self._boundary_node_indices
 
     def get_boundary_cells(self, active_ind=None, direction='zu'):
         """Returns the indices of boundary cells in a given direction given an active index array.
@@ -1248,6 +1306,7 @@ cdef class _TreeMesh:
 
         cdef c_Cell *cell
         cdef c_Cell *neighbor
+        cdef int is_bound
 
         for cell in self.tree.cells:
             if not act[cell.index]:
@@ -3082,235 +3141,138 @@ cdef class _TreeMesh:
             return self._getEdgeP(xEdge, yEdge, zEdge)
         return Pxxx
 
-    def _getEdgeIntMat(self, locs, zerosOutside, direction):
-        cdef:
-            double[:, :] locations = locs
-            int_t dir, dir1, dir2
-            int_t dim = self._dim
-            int_t n_loc = locs.shape[0]
-            int_t n_edges = 2 if self._dim == 2 else 4
-            np.int64_t[:] I = np.empty(n_loc*n_edges, dtype=np.int64)
-            np.int64_t[:] J = np.empty(n_loc*n_edges, dtype=np.int64)
-            np.float64_t[:] V = np.empty(n_loc*n_edges, dtype=np.float64)
-
-            int_t ii, i, j, offset
-            c_Cell *cell
-            double x, y, z
-            double w1, w2
-            double eps = 100*np.finfo(float).eps
-            int zeros_out = zerosOutside
-
-        if direction == 'x':
-            dir, dir1, dir2 = 0, 1, 2
-            offset = 0
-        elif direction == 'y':
-            dir, dir1, dir2 = 1, 0, 2
-            offset = self.n_total_edges_x
-        elif direction == 'z':
-            dir, dir1, dir2 = 2, 0, 1
-            offset = self.n_total_edges_x + self.n_total_edges_y
-        else:
-            raise ValueError('Invalid direction, must be x, y, or z')
-
-        for i in range(n_loc):
-            x = locations[i, 0]
-            y = locations[i, 1]
-            z = locations[i, 2] if dim==3 else 0.0
-            #get containing (or closest) cell
-            cell = self.tree.containing_cell(x, y, z)
-            for j in range(n_edges):
-                I[n_edges*i+j] = i
-                J[n_edges*i+j] = cell.edges[n_edges*dir+j].index + offset
-
-            w1 = ((cell.edges[n_edges*dir+1].location[dir1] - locations[i, dir1])/
-                  (cell.edges[n_edges*dir+1].location[dir1] - cell.edges[n_edges*dir].location[dir1]))
-            if dim == 3:
-                w2 = ((cell.edges[n_edges*dir+3].location[dir2] - locations[i, dir2])/
-                      (cell.edges[n_edges*dir+3].location[dir2] - cell.edges[n_edges*dir].location[dir2]))
+    def _interpolation_parameters(self, location_type):
+        # kind, directions and column offset of the interpolation weights,
+        # with the number of weights per point, the number of (hanging
+        # included) columns and the deflation matrix of the location type
+        cdef int_t dim = self._dim
+        if location_type == 'CC':
+            return 0, 0, 0, 0, 0, 1, self.n_cells, None
+        if location_type == 'N':
+            return 1, 0, 0, 0, 0, 1<<dim, self.n_total_nodes, self._deflate_nodes()
+        direction = location_type[1]
+        if location_type[0] == 'E':
+            if direction == 'x':
+                dirs = 0, 1, 2, 0
+            elif direction == 'y':
+                dirs = 1, 0, 2, self.n_total_edges_x
+            elif direction == 'z':
+                dirs = 2, 0, 1, self.n_total_edges_x + self.n_total_edges_y
             else:
-                w2 = 1.0
-            if zeros_out:
-                if (w1 < -eps or w1 > 1 + eps or w2 < -eps or w2 > eps):
-                    for j in range(n_edges):
-                        V[n_edges*i + j] = 0.0
-                    continue
-            w1 = _clip01(w1)
-            w2 = _clip01(w2)
-
-            V[n_edges*i  ] = w1*w2
-            V[n_edges*i+1] = (1.0-w1)*w2
-            if dim == 3:
-                V[n_edges*i+2] = w1*(1.0-w2)
-                V[n_edges*i+3] = (1.0-w1)*(1.0-w2)
-
-        Re = self._deflate_edges()
-        A = sp.csr_matrix((V, (I, J)), shape=(locs.shape[0], self.n_total_edges))
-        return A*Re
-
-    def _getFaceIntMat(self, locs, zerosOutside, direction):
-        cdef:
-            double[:, :] locations = locs
-            int_t dir, dir2d
-            int_t dim = self._dim
-            int_t n_loc = locs.shape[0]
-            int_t n_faces = 2
-            np.int64_t[:] I = np.empty(n_loc*n_faces, dtype=np.int64)
-            np.int64_t[:] J = np.empty(n_loc*n_faces, dtype=np.int64)
-            np.float64_t[:] V = np.empty(n_loc*n_faces, dtype=np.float64)
-
-            int_t ii, i, offset
-            c_Cell *cell
-            double x, y, z
-            double w
-            double eps = 100*np.finfo(float).eps
-            int zeros_out = zerosOutside
-
+                raise ValueError('Invalid direction, must be x, y, or z')
+            n_edges = 2 if dim == 2 else 4
+            return (2, ) + dirs + (n_edges, self.n_total_edges, self._deflate_edges())
         if direction == 'x':
-            dir = 0
-            dir2d = 1
-            offset = 0
+            dirs = 0, 1, 0, 0
         elif direction == 'y':
-            dir = 1
-            dir2d = 0
-            offset = self.n_total_faces_x
+            dirs = 1, 0, 0, self.n_total_faces_x
         elif direction == 'z':
-            dir = 2
-            offset = self.n_total_faces_x + self.n_total_faces_y
+            dirs = 2, 0, 0, self.n_total_faces_x + self.n_total_faces_y
         else:
             raise ValueError('Invalid direction, must be x, y, or z')
+        return (3, ) + dirs + (2, self.n_total_faces, self._deflate_faces())
+
+    cdef int_t _interpolation_weights(
+        self, int_t kind, int_t dir, int_t dir1, int_t dir2, int_t offset,
+        double *loc, int zeros_out, np.int64_t *J, double *V
+    ):
+        # write the columns and weights of the interpolation to loc from its
+        # containing (or closest) cell into J and V, returns their number
+        cdef c_Cell *cell = self.tree.containing_cell(loc[0], loc[1], loc[2])
+        if kind == 0:
+            return _cell_weights(cell, loc, self._dim, zeros_out, J, V)
+        if kind == 1:
+            return _node_weights(cell, loc, self._dim, zeros_out, J, V)
+        if kind == 2:
+            return _edge_weights(
+                cell, loc, self._dim, dir, dir1, dir2, offset, zeros_out, J, V
+            )
+        return _face_weights(cell, loc, self._dim, dir, dir1, offset, zeros_out, J, V)
 
-        for i in range(n_loc):
-            x = locations[i, 0]
-            y = locations[i, 1]
-            z = locations[i, 2] if dim==3 else 0.0
-            #get containing (or closest) cell
-            cell = self.tree.containing_cell(x, y, z)
-            I[n_faces*i  ] = i
-            I[n_faces*i+1] = i
-            if self._dim == 3:
-                J[n_faces*i  ] = cell.faces[dir*2  ].index + offset
-                J[n_faces*i+1] = cell.faces[dir*2+1].index + offset
-                w = ((cell.faces[dir*2+1].location[dir] - locations[i, dir])/
-                      (cell.faces[dir*2+1].location[dir] - cell.faces[dir*2].location[dir]))
-            else:
-                J[n_faces*i  ] = cell.edges[dir2d*2  ].index + offset
-                J[n_faces*i+1] = cell.edges[dir2d*2+1].index + offset
-                w = ((cell.edges[dir2d*2+1].location[dir] - locations[i, dir])/
-                      (cell.edges[dir2d*2+1].location[dir] - cell.edges[dir2d*2].location[dir]))
-            if zeros_out:
-                if (w < -eps or w > 1 + eps):
-                    V[n_faces*i  ] = 0.0
-                    V[n_faces*i+1] = 0.0
-                    continue
-            w = _clip01(w)
-            V[n_faces*i  ] = w
-            V[n_faces*i+1] = 1.0-w
-
-        Rf = self._deflate_faces()
-        return sp.csr_matrix((V, (I, J)), shape=(locs.shape[0], self.n_total_faces))*Rf
-
-    def _getNodeIntMat(self, locs, zerosOutside):
+    def _getIntMat(self, locs, zerosOutside, location_type):
         cdef:
             double[:, :] locations = locs
+            int_t kind, dir, dir1, dir2, offset, n_per
             int_t dim = self._dim
             int_t n_loc = locs.shape[0]
-            int_t n_nodes = 1<<dim
-            np.int64_t[:] I = np.empty(n_loc*n_nodes, dtype=np.int64)
-            np.int64_t[:] J = np.empty(n_loc*n_nodes, dtype=np.int64)
-            np.float64_t[:] V = np.empty(n_loc*n_nodes, dtype=np.float64)
-
-            int_t ii, i
-            c_Cell *cell
-            double x, y, z
-            double wx, wy, wz
-            double eps = 100*np.finfo(float).eps
+            int_t i, j
+            double loc[3]
             int zeros_out = zerosOutside
+            np.int64_t[:] J
+            np.float64_t[:] V
+        kind, dir, dir1, dir2, offset, n_per, n_columns, R = (
+            self._interpolation_parameters(location_type)
+        )
+        I = np.repeat(np.arange(n_loc, dtype=np.int64), n_per)
+        J = np.empty(n_loc*n_per, dtype=np.int64)
+        V = np.empty(n_loc*n_per, dtype=np.float64)
 
+        loc[2] = 0.0
         for i in range(n_loc):
-            x = locations[i, 0]
-            y = locations[i, 1]
-            z = locations[i, 2] if dim==3 else 0.0
-            #get containing (or closest) cell
-            cell = self.tree.containing_cell(x, y, z)
-            #calculate weights
-            wx = ((cell.points[3].location[0] - x)/
-                  (cell.points[3].location[0] - cell.points[0].location[0]))
-            wy = ((cell.points[3].location[1] - y)/
-                  (cell.points[3].location[1] - cell.points[0].location[1]))
-            if dim == 3:
-                wz = ((cell.points[7].location[2] - z)/
-                      (cell.points[7].location[2] - cell.points[0].location[2]))
-            else:
-                wz = 1.0
-
+            for j in range(dim):
+                loc[j] = locations[i, j]
+            self._interpolation_weights(
+                kind, dir, dir1, dir2, offset, loc, zeros_out, &J[n_per*i], &V[n_per*i]
+            )
 
-            I[n_nodes*i:n_nodes*i + n_nodes] = i
+        A = sp.csr_matrix((V, (I, J)), shape=(n_loc, n_columns))
+        if R is not None:
+            A = A*R
+        return A
 
+    def _getEdgeIntMat(self, locs, zerosOutside, direction):
+        return self._getIntMat(locs, zerosOutside, 'E' + direction)
 
-            if zeros_out:
-                if (wx < -eps or wy < -eps or wz < -eps or
-                    wx>1 + eps or wy > 1 + eps or wz > 1 + eps):
-                    for ii in range(n_nodes):
-                        J[n_nodes*i + ii] = 0
-                        V[n_nodes*i + ii] = 0.0
-                    continue
+    def _getFaceIntMat(self, locs, zerosOutside, direction):
+        return self._getIntMat(locs, zerosOutside, 'F' + direction)
 
-            wx = _clip01(wx)
-            wy = _clip01(wy)
-            wz = _clip01(wz)
-            for ii in range(n_nodes):
-                J[n_nodes*i + ii] = cell.points[ii].index
+    def _getNodeIntMat(self, locs, zerosOutside):
+        return self._getIntMat(locs, zerosOutside, 'N')
 
-            V[n_nodes*i    ] = wx*wy*wz
-            V[n_nodes*i + 1] = (1 - wx)*wy*wz
-            V[n_nodes*i + 2] = wx*(1 - wy)*wz
-            V[n_nodes*i + 3] = (1 - wx)*(1 - wy)*wz
-            if dim==3:
-                V[n_nodes*i + 4] = wx*wy*(1 - wz)
-                V[n_nodes*i + 5] = (1 - wx)*wy*(1 - wz)
-                V[n_nodes*i + 6] = wx*(1 - wy)*(1 - wz)
-                V[n_nodes*i + 7] = (1 - wx)*(1 - wy)*(1 - wz)
+    def _getCellIntMat(self, locs, zerosOutside):
+        return self._getIntMat(locs, zerosOutside, 'CC')
 
-        Rn = self._deflate_nodes()
-        return sp.csr_matrix((V, (I, J)), shape=(locs.shape[0],self.n_total_nodes))*Rn
+    def _evaluate(self, locs, values, zerosOutside, location_type):
+        """Interpolate the columns of values to locs, one point at a time.
 
-    def _getCellIntMat(self, locs, zerosOutside):
+        values holds the columns of the (deflated) values of location_type,
+        the result has one row per location.
+        """
         cdef:
             double[:, :] locations = locs
+            double[:, :] vals
+            double[:, :] result
+            int_t kind, dir, dir1, dir2, offset, n_per
             int_t dim = self._dim
-            int_t n_loc = locations.shape[0]
-            np.int64_t[:] I = np.arange(n_loc, dtype=np.int64)
-            np.int64_t[:] J = np.empty(n_loc, dtype=np.int64)
-            np.float64_t[:] V = np.ones(n_loc, dtype=np.float64)
-
-            int_t ii, i
-            c_Cell *cell
-            double x, y, z
-            double eps = 100*np.finfo(float).eps
+            int_t n_loc = locs.shape[0]
+            int_t i, j, k, n, n_values
+            double loc[3]
+            np.int64_t J[8]
+            double V[8]
             int zeros_out = zerosOutside
-
+        kind, dir, dir1, dir2, offset, n_per, n_columns, R = (
+            self._interpolation_parameters(location_type)
+        )
+        if R is not None:
+            # the values at the hanging locations
+            values = R*values
+        vals = np.require(values, dtype=np.float64, requirements="C")
+        n_values = vals.shape[1]
+        out = np.zeros((n_loc, n_values), dtype=np.float64)
+        result = out
+
+        loc[2] = 0.0
         for i in range(n_loc):
-            x = locations[i, 0]
-            y = locations[i, 1]
-            z = locations[i, 2] if dim==3 else 0.0
-            # get containing (or closest) cell
-            cell = self.tree.containing_cell(x, y, z)
-            J[i] = cell.index
-            if zeros_out:
-                if x < cell.points[0].location[0]-eps:
-                    V[i] = 0.0
-                elif x > cell.points[3].location[0]+eps:
-                    V[i] = 0.0
-                elif y < cell.points[0].location[1]-eps:
-                    V[i] = 0.0
-                elif y > cell.points[3].location[1]+eps:
-                    V[i] = 0.0
-                elif dim == 3 and z < cell.points[0].location[2]-eps:
-                    V[i] = 0.0
-                elif dim == 3 and z > cell.points[7].location[2]+eps:
-                    V[i] = 0.0
-
-        return sp.csr_matrix((V, (I, J)), shape=(locs.shape[0],self.n_cells))
+            for j in range(dim):
+                loc[j] = locations[i, j]
+            n = self._interpolation_weights(
+                kind, dir, dir1, dir2, offset, loc, zeros_out, J, V
+            )
+            for j in range(n):
+                if V[j] != 0.0:
+                    for k in range(n_values):
+                        result[i, k] += V[j]*vals[J[j], k]
+        return out
 
     @property
     def cell_nodes(self):
@@ -3381,8 +3343,8 @@ cdef class _TreeMesh:
 
     def __getstate__(self):
         cdef int id, dim = self._dim
-        indArr = np.empty((self.n_cells, dim), dtype=np.int)
-        levels = np.empty((self.n_cells), dtype=np.int)
+        indArr = np.empty((self.n_cells, dim), dtype=np.int_)
+        levels = np.empty((self.n_cells), dtype=np.int_)
         cdef np.int_t[:, :] _indArr = indArr
         cdef np.int_t[:] _levels = levels
         for cell in self.tree.cells:
@@ -3978,3 +3940,123 @@ cdef class _TreeMesh:
 
 cdef inline double _clip01(double x) nogil:
     return min(1, max(x, 0))
+
+
+cdef double _EPS = 100*np.finfo(float).eps
+
+
+cdef int_t _cell_weights(
+    c_Cell *cell, double *loc, int_t dim, int zeros_out, np.int64_t *J, double *V
+):
+    J[0] = cell.index
+    V[0] = 1.0
+    if zeros_out:
+        if (
+            loc[0] < cell.points[0].location[0] - _EPS
+            or loc[0] > cell.points[3].location[0] + _EPS
+            or loc[1] < cell.points[0].location[1] - _EPS
+            or loc[1] > cell.points[3].location[1] + _EPS
+            or (dim == 3 and loc[2] < cell.points[0].location[2] - _EPS)
+            or (dim == 3 and loc[2] > cell.points[7].location[2] + _EPS)
+        ):
+            V[0] = 0.0
+    return 1
+
+
+cdef int_t _node_weights(
+    c_Cell *cell, double *loc, int_t dim, int zeros_out, np.int64_t *J, double *V
+):
+    cdef int_t ii, n_nodes = 1<<dim
+    cdef double wx, wy, wz
+    wx = ((cell.points[3].location[0] - loc[0])/
+          (cell.points[3].location[0] - cell.points[0].location[0]))
+    wy = ((cell.points[3].location[1] - loc[1])/
+          (cell.points[3].location[1] - cell.points[0].location[1]))
+    if dim == 3:
+        wz = ((cell.points[7].location[2] - loc[2])/
+              (cell.points[7].location[2] - cell.points[0].location[2]))
+    else:
+        wz = 1.0
+
+    if zeros_out:
+        if (wx < -_EPS or wy < -_EPS or wz < -_EPS or
+            wx > 1 + _EPS or wy > 1 + _EPS or wz > 1 + _EPS):
+            for ii in range(n_nodes):
+                J[ii] = 0
+                V[ii] = 0.0
+            return n_nodes
+
+    wx = _clip01(wx)
+    wy = _clip01(wy)
+    wz = _clip01(wz)
+    for ii in range(n_nodes):
+        J[ii] = cell.points[ii].index
+
+    V[0] = wx*wy*wz
+    V[1] = (1 - wx)*wy*wz
+    V[2] = wx*(1 - wy)*wz
+    V[3] = (1 - wx)*(1 - wy)*wz
+    if dim == 3:
+        V[4] = wx*wy*(1 - wz)
+        V[5] = (1 - wx)*wy*(1 - wz)
+        V[6] = wx*(1 - wy)*(1 - wz)
+        V[7] = (1 - wx)*(1 - wy)*(1 - wz)
+    return n_nodes
+
+
+cdef int_t _edge_weights(
+    c_Cell *cell, double *loc, int_t dim, int_t dir, int_t dir1, int_t dir2,
+    int_t offset, int zeros_out, np.int64_t *J, double *V
+):
+    cdef int_t j, n_edges = 2 if dim == 2 else 4
+    cdef double w1, w2
+    for j in range(n_edges):
+        J[j] = cell.edges[n_edges*dir+j].index + offset
+
+    w1 = ((cell.edges[n_edges*dir+1].location[dir1] - loc[dir1])/
+          (cell.edges[n_edges*dir+1].location[dir1] - cell.edges[n_edges*dir].location[dir1]))
+    if dim == 3:
+        w2 = ((cell.edges[n_edges*dir+3].location[dir2] - loc[dir2])/
+              (cell.edges[n_edges*dir+3].location[dir2] - cell.edges[n_edges*dir].location[dir2]))
+    else:
+        w2 = 1.0
+    if zeros_out:
+        if (w1 < -_EPS or w1 > 1 + _EPS or w2 < -_EPS or w2 > 1 + _EPS):
+            for j in range(n_edges):
+                V[j] = 0.0
+            return n_edges
+    w1 = _clip01(w1)
+    w2 = _clip01(w2)
+
+    V[0] = w1*w2
+    V[1] = (1.0-w1)*w2
+    if dim == 3:
+        V[2] = w1*(1.0-w2)
+        V[3] = (1.0-w1)*(1.0-w2)
+    return n_edges
+
+
+cdef int_t _face_weights(
+    c_Cell *cell, double *loc, int_t dim, int_t dir, int_t dir2d,
+    int_t offset, int zeros_out, np.int64_t *J, double *V
+):
+    cdef double w
+    if dim == 3:
+        J[0] = cell.faces[dir*2  ].index + offset
+        J[1] = cell.faces[dir*2+1].index + offset
+        w = ((cell.faces[dir*2+1].location[dir] - loc[dir])/
+              (cell.faces[dir*2+1].location[dir] - cell.faces[dir*2].location[dir]))
+    else:
+        J[0] = cell.edges[dir2d*2  ].index + offset
+        J[1] = cell.edges[dir2d*2+1].index + offset
+        w = ((cell.edges[dir2d*2+1].location[dir] - loc[dir])/
+              (cell.edges[dir2d*2+1].location[dir] - cell.edges[dir2d*2].location[dir]))
+    if zeros_out:
+        if (w < -_EPS or w > 1 + _EPS):
+            V[0] = 0.0
+            V[1] = 0.0
+            return 2
+    w = _clip01(w)
+    V[0] = w
+    V[1] = 1.0-w
+    return 2
@@ -7,11 +7,45 @@ import properties
 import os
 import json
 
-from discretize.utils import mkvc
+from discretize.utils import mkvc, cast_to_precision
+from discretize.utils.shared_memory_utils import SharedMesh
+from discretize.utils.cache_utils import (
+    OperatorCache,
+    is_cacheable,
+    name_matcher,
+    fingerprint,
+    get_cache_directory,
+)
 from discretize.utils.code_utils import deprecate_property, deprecate_method
 from discretize.mixins import InterfaceMixins
 import warnings
 
+# registers the observers of a HasProperties instance, a private helper of
+# properties, only used by the fast path of BaseMesh._from_trusted
+_set_listener = getattr(properties.handlers, "_set_listener", None)
+
+
+def _rebuild_mesh(func, args, state, cached):
+    """Unpickle a mesh along with its cached geometry and operators."""
+    mesh = func(*args)
+    if state is not None:
+        if hasattr(mesh, "__setstate__"):
+            mesh.__setstate__(state)
+        else:
+            mesh.__dict__.update(state)
+    for name, value in cached:
+        setattr(mesh, name, value)
+    return mesh
+
+
+def _copy_arrays(value):
+    """Copy the arrays of a property value, also inside lists and tuples."""
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    if isinstance(value, (list, tuple)):
+        return type(value)(_copy_arrays(v) for v in value)
+    return value
+
 
 class BaseMesh(properties.HasProperties, InterfaceMixins):
     """
@@ -54,6 +88,22 @@ class BaseMesh(properties.HasProperties, InterfaceMixins):
         required=True,
     )
 
+    _precision = "double"
+    # glob patterns of the private attributes holding cached geometry and
+    # operators, every mesh lists those it builds
+    _cached_names = ()
+    # cached operators that only depend on the mesh fingerprint
+    _persistent_cache_names = (
+        "_face_divergence",
+        "_face_[xyz]_divergence",
+        "_edge_curl",
+        "_nodal_gradient",
+        "_average_*",
+        "_interpolation_*",
+    )
+    _cache_directory = None
+    _cache_interpolation = False
+
     # Instantiate the class
     def __init__(self, n=None, origin=None, **kwargs):
         if n is not None:
@@ -65,15 +115,286 @@ class BaseMesh(properties.HasProperties, InterfaceMixins):
             self.origin = np.zeros(len(self._n))
         else:
             self.origin = origin
+        precision = kwargs.pop("precision", "double")
 
         super(BaseMesh, self).__init__(**kwargs)
+        self.precision = precision
 
     def __getattr__(self, name):
-        if name == "_aliases":
+        if name == "_aliases" or name == "_operator_cache":
             raise AttributeError  # http://nedbatchelder.com/blog/201010/surprising_getattr_recursion.html
+        if name[0] == "_":
+            cache = self.__dict__.get("_operator_cache")
+            if cache is not None and name in cache:
+                return cache.get(name)
         name = self._aliases.get(name, name)
         return object.__getattribute__(self, name)
 
+    def __setattr__(self, name, value):
+        # cached geometry and operators are cast as they are stored, so only
+        # one copy is held, and kept in the operator cache so they can be
+        # bounded and evicted.
+        if (
+            name[0] == "_"
+            and (value is None or is_cacheable(value))
+            and self._is_cached_name(name)
+        ):
+            if self._precision != "double":
+                value = cast_to_precision(value, self._precision)
+            self.__dict__.pop(name, None)
+            self._get_operator_cache().set(name, value)
+            return
+        super().__setattr__(name, value)
+
+    @classmethod
+    def _is_cached_name(cls, name):
+        """Whether a private attribute holds cached geometry or an operator."""
+        match = cls.__dict__.get("_cached_name_match")
+        if match is None:
+            match = name_matcher(cls._cached_names)
+            cls._cached_name_match = match
+        return match(name) is not None
+
+    def __delattr__(self, name):
+        cache = self.__dict__.get("_operator_cache")
+        if name not in self.__dict__ and cache is not None and name in cache:
+            cache.set(name, None)
+        else:
+            super().__delattr__(name)
+
+    def _get_operator_cache(self):
+        cache = self.__dict__.get("_operator_cache")
+        if cache is None:
+            cache = OperatorCache(owner=self, persistent=self._persistent_cache_names)
+            self.__dict__["_operator_cache"] = cache
+        return cache
+
+    def __getstate__(self):
+        # the operator cache holds a weak reference to the mesh and is rebuilt
+        state = self.__dict__.copy()
+        state.pop("_operator_cache", None)
+        return state
+
+    def __reduce_ex__(self, protocol):
+        reduced = super().__reduce_ex__(protocol)
+        cache = self.__dict__.get("_operator_cache")
+        if protocol < 5 or cache is None or len(cache) == 0:
+            return reduced
+        # With pickle protocol 5 the cached geometry and operators are sent
+        # along, so their arrays can travel out-of-band as PickleBuffers
+        # (e.g. in shared memory) instead of being rebuilt by the receiver.
+        return _rebuild_mesh, (reduced[0], reduced[1], reduced[2], cache.items())
+
+    def to_shared_memory(self, names=None):
+        """Publish the mesh and its cached operators in shared memory.
+
+        Parameters
+        ----------
+        names : list of str, optional
+            Geometry and operator properties to build (if needed) before
+            publishing, e.g. ``["face_divergence", "cell_volumes"]``.
+            Everything cached on the mesh is published.
+
+        Returns
+        -------
+        discretize.utils.SharedMesh
+            Picklable handle, call its ``attach`` method in the worker
+            processes to get the mesh back without copying the arrays.
+        """
+        return SharedMesh(self, names=names)
+
+    @property
+    def cache_directory(self):
+        """Directory of the persistent operator cache.
+
+        When set, sparse operators that only depend on the mesh (divergence,
+        curl, nodal gradient and averaging matrices) are saved under
+        ``cache_directory/<fingerprint>/`` as they are built, and are memory
+        mapped (copy on write) from there instead of being rebuilt by any
+        mesh with the same fingerprint, e.g. in a later job. Interpolation
+        matrices are only saved when :attr:`cache_interpolation` is set.
+        Defaults to :func:`discretize.utils.get_cache_directory`.
+
+        Returns
+        -------
+        str or None
+        """
+        if self._cache_directory is None:
+            return get_cache_directory()
+        return self._cache_directory
+
+    @cache_directory.setter
+    def cache_directory(self, value):
+        self._cache_directory = None if value is None else os.fspath(value)
+        self._get_operator_cache().reset_directory()
+
+    @property
+    def cache_interpolation(self):
+        """Whether interpolation matrices are saved in the persistent cache.
+
+        Every new set of locations adds a matrix to the
+        :attr:`cache_directory`, which is never pruned, so this is only
+        worth it for locations that are interpolated to again by later
+        jobs, e.g. fixed receivers.
+
+        Returns
+        -------
+        bool
+            ``False`` by default.
+        """
+        return self._cache_interpolation
+
+    @cache_interpolation.setter
+    def cache_interpolation(self, value):
+        self._cache_interpolation = bool(value)
+
+    @property
+    def fingerprint(self):
+        """Stable digest identifying the mesh in the persistent operator cache.
+
+        Returns
+        -------
+        str
+            Digest of the mesh type, precision and geometry.
+        """
+        arrays = self._fingerprint_arrays()
+        if arrays is None:
+            return None
+        return fingerprint(type(self).__name__, self._precision, *arrays)
+
+    def _fingerprint_arrays(self):
+        """Arrays that fully determine the mesh geometry."""
+        return [self.origin] + list(getattr(self, "h", []))
+
+    def _persistent_cache_directory(self):
+        root = self.cache_directory
+        if root is None:
+            return None
+        key = self.fingerprint
+        if key is None:
+            return None
+        return os.path.join(root, key)
+
+    def _persistent(self, key, build):
+        """Load an interpolation matrix from the persistent cache, or build and
+        save it when :attr:`cache_interpolation` is set.
+
+        Parameters
+        ----------
+        key : tuple
+            Arrays and strings identifying the operator on this mesh
+        build : callable
+            Builds the operator
+        """
+        if not self._cache_interpolation:
+            return build()
+        cache = self._get_operator_cache()
+        if cache.directory is None:
+            return build()
+        name = "_interpolation_" + fingerprint(*key)
+        value = cache.load(name)
+        if value is None:
+            value = build()
+            cache.save(name, value)
+        return value
+
+    @property
+    def cache_limit(self):
+        """Byte limit of the mesh's cached geometry and operators.
+
+        Cached arrays and sparse operators are kept in a least recently used
+        store. When their total size exceeds this limit, the least recently
+        used entries are evicted and rebuilt on their next use. A limit
+        shared by all meshes can be set with
+        :func:`discretize.utils.set_cache_limit`.
+
+        Returns
+        -------
+        int or None
+            Limit in bytes, ``None`` (default) for no limit.
+        """
+        return self._get_operator_cache().limit
+
+    @cache_limit.setter
+    def cache_limit(self, value):
+        if value is not None and value < 0:
+            raise ValueError(
+                "cache_limit must be positive or None, not {}".format(value)
+            )
+        cache = self._get_operator_cache()
+        cache.limit = value
+        if value is not None:
+            cache._evict(value)
+
+    def cache_info(self):
+        """Statistics of the mesh's cached geometry and operators.
+
+        Returns
+        -------
+        discretize.utils.CacheInfo
+            Named tuple of ``hits``, ``misses``, ``evictions``, ``limit``,
+            ``size`` (bytes) and ``entries``, a dictionary of the size in bytes
+            of each cached value, from least to most recently used.
+
+        Examples
+        --------
+        >>> import discretize
+        >>> mesh = discretize.TensorMesh([8, 8])
+        >>> D = mesh.face_divergence
+        >>> list(mesh.cache_info().entries)
+        ['face_divergence']
+        """
+        return self._get_operator_cache().info()
+
+    def clear_cache(self, pattern=None):
+        """Remove cached geometry and operators from the mesh.
+
+        They are rebuilt on their next use.
+
+        Parameters
+        ----------
+        pattern : str, optional
+            Glob pattern of the names to remove, as listed by
+            :meth:`cache_info`, e.g. ``"average_*"``. By default everything
+            is removed.
+        """
+        self._get_operator_cache().clear(pattern)
+
+    @property
+    def precision(self):
+        """Floating point precision of the cached geometry and operators.
+
+        With ``'single'``, geometry arrays (``cell_centers``, ``faces_x``,
+        ``face_areas``, ``cell_volumes``, ...) and sparse operators
+        (``face_divergence``, averaging operators, ...) are stored as
+        float32, and sparse operators use int32 indices when their size
+        allows it. This roughly halves the memory held by the mesh.
+        Operators are still assembled in double precision and cast once
+        they are built. Changing the precision clears the cached values.
+
+        Returns
+        -------
+        str
+            ``'double'`` (default) or ``'single'``
+        """
+        return self._precision
+
+    @precision.setter
+    def precision(self, value):
+        if value not in ["double", "single"]:
+            raise ValueError(
+                "precision must be 'double' or 'single', not {}".format(value)
+            )
+        if value != self._precision:
+            self._precision = value
+            self._clear_cache()
+
+    def _clear_cache(self):
+        """Remove the cached geometry and operators stored on the mesh."""
+        cache = self._get_operator_cache()
+        cache.clear()
+        cache.reset_directory()
+
     @property
     def x0(self):
         return self.origin
@@ -117,6 +438,12 @@ class BaseMesh(properties.HasProperties, InterfaceMixins):
                             )
                         )
 
+    @properties.observer("origin")
+    def _reset_persistent_cache(self, change):
+        cache = self.__dict__.get("_operator_cache")
+        if cache is not None:
+            cache.reset_directory()
+
     @properties.validator("origin")
     def _check_origin(self, change):
         if not (
@@ -520,11 +847,55 @@ class BaseMesh(properties.HasProperties, InterfaceMixins):
 
         return f
 
-    def copy(self):
+    @classmethod
+    def _from_trusted(cls, backend, state, fallback):
+        """Create a mesh from already validated property values.
+
+        Skips ``__init__`` and the validation of the properties, ``backend``
+        holds the values of every property and ``state`` the other instance
+        attributes. Registering the observers relies on a private helper of
+        ``properties``, when it is not available the mesh is built by
+        ``fallback`` (through the public, validating, constructors) instead.
         """
-        Make a copy of the current mesh
+        if _set_listener is None:
+            return fallback()
+        mesh = cls.__new__(cls)
+        object.__setattr__(mesh, "_backend", backend)
+        object.__setattr__(mesh, "_listeners", {})
+        for observer in mesh._prop_observers.values():
+            _set_listener(mesh, observer)
+        mesh.__dict__.update(state)
+        return mesh
+
+    def _share_cache(self, other):
+        """Start with the cached geometry and operators of an identical mesh."""
+        cache = other.__dict__.get("_operator_cache")
+        if cache is not None:
+            own = self._get_operator_cache()
+            own.limit = cache.limit
+            own.update(cache.items())
+
+    def copy(self):
+        """Make a copy of the current mesh.
+
+        The copy is made without validating (or serializing) the mesh again.
+        It gets its own copies of the geometry arrays (e.g. ``h`` and
+        ``origin``) and starts with the cached operators of this mesh, the
+        two caches are independent afterwards.
+
+        Returns
+        -------
+        discretize.base.BaseMesh
         """
-        return properties.copy(self)
+        state = {
+            key: _copy_arrays(value)
+            for key, value in self.__dict__.items()
+            if key not in ("_backend", "_listeners", "_operator_cache")
+        }
+        backend = {key: _copy_arrays(value) for key, value in self._backend.items()}
+        mesh = self._from_trusted(backend, state, lambda: properties.copy(self))
+        mesh._share_cache(self)
+        return mesh
 
     axis_u = properties.Vector3(
         "Vector orientation of u-direction. For more details see the docs for the :attr:`~discretize.base.BaseMesh.rotation_matrix` property.",
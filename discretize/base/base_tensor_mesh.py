@@ -13,12 +13,15 @@ from discretize.utils import (
     unpack_widths,
     mkvc,
     ndgrid,
-    spzeros,
     sdiag,
     sdinv,
-    TensorType,
     interpolation_matrix,
+    interpolate_values,
+    DiagonalOperator,
+    ComposedOperator,
 )
+from discretize.utils.matrix_utils import _as_property_model
+from discretize.operators.inner_products import InnerProductDeriv
 from discretize.utils.code_utils import deprecate_method, deprecate_property
 import warnings
 
@@ -51,6 +54,7 @@ class BaseTensorMesh(BaseMesh):
             "gridEz": "edges_z",
         },
     }
+    _cached_names = ("_cell_centers", "_nodes", "_faces_[xyz]", "_edges_[xyz]")
 
     _unitDimensions = [1, 1, 1]
 
@@ -337,7 +341,14 @@ class BaseTensorMesh(BaseMesh):
             )
         return inside
 
-    def _getInterpolationMat(self, loc, location_type="cell_centers", zeros_outside=False):
+    def _getInterpolationMat(
+        self,
+        loc,
+        location_type="cell_centers",
+        zeros_outside=False,
+        n_threads=1,
+        chunk_size=1048576,
+    ):
         """Produces interpolation matrix
 
         Parameters
@@ -362,6 +373,12 @@ class BaseTensorMesh(BaseMesh):
                 'CCVy', 'cell_centers_y'  -> y-component of vector field defined on cell centers
                 'CCVz', 'cell_centers_z'  -> z-component of vector field defined on cell centers
 
+        n_threads : int, optional
+            Number of threads computing chunks of locations.
+
+        chunk_size : int, optional
+            Number of locations per chunk.
+
         Returns
         -------
         scipy.sparse.csr_matrix
@@ -376,8 +393,35 @@ class BaseTensorMesh(BaseMesh):
                 raise ValueError("Points outside of mesh")
         else:
             indZeros = np.logical_not(self.is_inside(loc))
+            # do not move the caller's locations
+            loc = loc.copy()
             loc[indZeros, :] = np.array([v.mean() for v in self.get_tensor("CC")])
 
+        tensor_type, offset, n_columns = self._interpolation_component(location_type)
+        Q = interpolation_matrix(
+            loc, *self.get_tensor(tensor_type), n_threads=n_threads, chunk_size=chunk_size
+        )
+        if n_columns is not None:
+            # shift the columns into place among those of all of the components
+            Q = sp.csr_matrix(
+                (Q.data, Q.indices + offset, Q.indptr), shape=(Q.shape[0], n_columns)
+            )
+
+        if zeros_outside:
+            Q[indZeros, :] = 0
+
+        return Q.tocsr()
+
+    def _interpolation_component(self, location_type):
+        """The grid interpolated from for a location type.
+
+        Returns
+        -------
+        tuple
+            The location type of the tensor grid, the offset of its values in
+            the values of the location type and the number of those values
+            (``None`` when these are only the values of the grid).
+        """
         location_type = self._parse_location_type(location_type)
 
         if location_type in ["faces_x", "faces_y", "faces_z", "edges_x", "edges_y", "edges_z"]:
@@ -388,40 +432,103 @@ class BaseTensorMesh(BaseMesh):
                 items = (self.nFx, self.nFy, self.nFz)[: self.dim]
             else:
                 items = (self.nEx, self.nEy, self.nEz)[: self.dim]
-            components = [spzeros(loc.shape[0], n) for n in items]
-            components[ind] = interpolation_matrix(loc, *self.get_tensor(location_type))
-            # remove any zero blocks (hstack complains)
-            components = [comp for comp in components if comp.shape[1] > 0]
-            Q = sp.hstack(components)
+            return location_type, sum(items[:ind]), sum(items)
 
         elif location_type in ["cell_centers", "nodes"]:
-            Q = interpolation_matrix(loc, *self.get_tensor(location_type))
+            return location_type, 0, None
 
         elif location_type in ["cell_centers_x", "cell_centers_y", "cell_centers_z"]:
-            Q = interpolation_matrix(loc, *self.get_tensor("CC"))
-            Z = spzeros(loc.shape[0], self.nC)
-            if location_type[-1] == "x":
-                Q = sp.hstack([Q, Z, Z])
-            elif location_type[-1] == "y":
-                Q = sp.hstack([Z, Q, Z])
-            elif location_type[-1] == "z":
-                Q = sp.hstack([Z, Z, Q])
+            ind = {"x": 0, "y": 1, "z": 2}[location_type[-1]]
+            return "cell_centers", ind * self.nC, 3 * self.nC
 
-        else:
-            raise NotImplementedError(
-                "getInterpolationMat: location_type=="
-                + location_type
-                + " and mesh.dim=="
-                + str(self.dim)
-            )
+        raise NotImplementedError(
+            "getInterpolationMat: location_type=="
+            + location_type
+            + " and mesh.dim=="
+            + str(self.dim)
+        )
 
-        if zeros_outside:
-            Q[indZeros, :] = 0
+    def evaluate(
+        self,
+        values,
+        loc,
+        location_type="cell_centers",
+        zeros_outside=False,
+        n_threads=1,
+        chunk_size=1048576,
+    ):
+        """Linearly interpolate values on the mesh to locations.
 
-        return Q.tocsr()
+        Gives the same result as ``get_interpolation_matrix(loc,
+        location_type) @ values``, but without building the interpolation
+        matrix: a compiled loop computes the interpolation weights of each
+        location and applies them right away. This is cheaper for one-off
+        evaluations, e.g. plotting or exporting profiles.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Values of the location type, (n,) or (n, n_values) to evaluate
+            several columns at once.
+        loc : numpy.ndarray
+            Locations to evaluate at, (n_loc, dim).
+        location_type : str, optional
+            Where `values` are defined, see :meth:`get_interpolation_matrix`.
+        zeros_outside : bool, optional
+            Whether locations outside of the mesh evaluate to zero, instead
+            of raising an error.
+        n_threads : int, optional
+            Number of threads evaluating chunks of locations.
+        chunk_size : int, optional
+            Number of locations per chunk.
+
+        Returns
+        -------
+        numpy.ndarray
+            The values at the locations, (n_loc,) or (n_loc, n_values).
+
+        Examples
+        --------
+        >>> import discretize
+        >>> import numpy as np
+        >>> mesh = discretize.TensorMesh([4, 4])
+        >>> values = mesh.cell_centers[:, 0] + 2 * mesh.cell_centers[:, 1]
+        >>> mesh.evaluate(values, np.array([[0.3, 0.6]]))
+        array([1.5])
+        """
+        loc = as_array_n_by_dim(loc, self.dim)
+        inside = self.is_inside(loc)
+        if not zeros_outside and not np.all(inside):
+            raise ValueError("Points outside of mesh")
+
+        tensor_type, offset, n_columns = self._interpolation_component(location_type)
+        tensors = self.get_tensor(tensor_type)
+        n_grid = int(np.prod([t.size for t in tensors]))
+        if n_columns is None:
+            n_columns = n_grid
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape[0] != n_columns:
+            raise ValueError(
+                "values must have {} rows for {}, not {}".format(
+                    n_columns, location_type, values.shape[0]
+                )
+            )
+        component = values[offset : offset + n_grid]
+        out = interpolate_values(
+            component, loc, *tensors, n_threads=n_threads, chunk_size=chunk_size
+        )
+        if zeros_outside:
+            out[~inside] = 0.0
+        return out
 
     def get_interpolation_matrix(
-        self, loc, location_type="cell_centers", zeros_outside=False, **kwargs
+        self,
+        loc,
+        location_type="cell_centers",
+        zeros_outside=False,
+        n_threads=1,
+        chunk_size=1048576,
+        **kwargs
     ):
         """Produces linear interpolation matrix
 
@@ -447,6 +554,18 @@ class BaseTensorMesh(BaseMesh):
                 'CCVy', 'cell_centers_y'  -> y-component of vector field defined on cell centers
                 'CCVz', 'cell_centers_z'  -> z-component of vector field defined on cell centers
 
+        zeros_outside : bool, optional
+            Whether locations outside of the mesh get zero rows, instead of
+            raising an error.
+
+        n_threads : int, optional
+            Number of threads computing chunks of locations. The rows are
+            written directly into the arrays of the CSR matrix, so large
+            numbers of locations only need memory for the final matrix.
+
+        chunk_size : int, optional
+            Number of locations per chunk.
+
         Returns
         -------
 
@@ -468,7 +587,12 @@ class BaseTensorMesh(BaseMesh):
                 DeprecationWarning,
             )
             zeros_outside = kwargs["zerosOutside"]
-        return self._getInterpolationMat(loc, location_type, zeros_outside)
+        return self._persistent(
+            (np.asarray(loc, dtype=float), location_type, bool(zeros_outside)),
+            lambda: self._getInterpolationMat(
+                loc, location_type, zeros_outside, n_threads, chunk_size
+            ),
+        )
 
     def _fastInnerProduct(self, projection_type, model=None, invert_model=False, invert_matrix=False):
         """Fast version of getFaceInnerProduct.
@@ -502,12 +626,14 @@ class BaseTensorMesh(BaseMesh):
         if projection_type not in ["F", "E"]:
             raise ValueError("projection_type must be 'F' for faces or 'E' for edges")
 
+        model = _as_property_model(self, model)
+        if invert_model:
+            model = model.inverse
+        model = model.values
+
         if model is None:
             model = np.ones(self.nC)
 
-        if invert_model:
-            model = 1.0 / model
-
         if is_scalar(model):
             model = model * np.ones(self.nC)
 
@@ -532,10 +658,11 @@ class BaseTensorMesh(BaseMesh):
             # if cyl, then only certain components are relevant due to symmetry
             # for faces, x, z matters, for edges, y (which is theta) matters
             if self._meshType == "CYL":
+                packed = model.reshape((self.nC, -1), order="F")
                 if projection_type == "E":
-                    model = model[:, 1]  # this is the action of a projection mat
+                    model = packed[:, 1]  # this is the action of a projection mat
                 elif projection_type == "F":
-                    model = model[:, [0, 2]]
+                    model = packed[:, [0, 2]]
 
             V = sp.kron(sp.identity(n_elements), sdiag(self.cell_volumes))
             M = sdiag(Av.T * V * mkvc(model))
@@ -568,7 +695,7 @@ class BaseTensorMesh(BaseMesh):
 
         Returns
         -------
-        function
+        InnerProductDeriv
             dMdmu, the derivative of the inner product matrix
 
         """
@@ -577,7 +704,8 @@ class BaseTensorMesh(BaseMesh):
         if projection_type not in ["F", "E"]:
             raise ValueError("projection_type must be 'F' for faces or 'E' for edges")
 
-        tensorType = TensorType(self, model)
+        model = _as_property_model(self, model)
+        tensorType = model.tensor_type
 
         dMdprop = None
 
@@ -585,6 +713,7 @@ class BaseTensorMesh(BaseMesh):
             MI = self._fastInnerProduct(
                 projection_type, model, invert_model=invert_model, invert_matrix=invert_matrix
             )
+        model = model.values
 
         # number of elements we are averaging (equals dim for regular
         # meshes, but for cyl, where we use symmetry, it is 1 for edge
@@ -595,41 +724,52 @@ class BaseTensorMesh(BaseMesh):
         else:
             n_elements = self.dim
 
+        # the derivatives are lazy products of the averaging matrix and
+        # diagonal scalings, applied without forming the matrix products.
+        # Products start from a lazy operator, sparse matrices on the left
+        # of one only defer to it on recent scipy versions.
         if tensorType == 0:  # isotropic, constant
             Av = getattr(self, "ave" + projection_type + "2CC")
-            V = sdiag(self.cell_volumes)
+            V = DiagonalOperator(n_elements * self.cell_volumes)
+            AvTV = ComposedOperator(Av.T, V)
             ones = sp.csr_matrix(
                 (np.ones(self.nC), (range(self.nC), np.zeros(self.nC))),
                 shape=(self.nC, 1),
             )
             if not invert_matrix and not invert_model:
-                dMdprop = n_elements * Av.T * V * ones
+                dMdprop = AvTV * ones
             elif invert_matrix and invert_model:
-                dMdprop = n_elements * (
-                    sdiag(MI.diagonal() ** 2) * Av.T * V * ones * sdiag(1.0 / model ** 2)
+                dMdprop = (
+                    DiagonalOperator(MI.diagonal() ** 2)
+                    * AvTV
+                    * ones
+                    * DiagonalOperator(1.0 / model ** 2)
                 )
             elif invert_model:
-                dMdprop = n_elements * Av.T * V * sdiag(-1.0 / model ** 2)
+                dMdprop = AvTV * DiagonalOperator(-1.0 / model ** 2)
             elif invert_matrix:
-                dMdprop = n_elements * (sdiag(-MI.diagonal() ** 2) * Av.T * V)
+                dMdprop = DiagonalOperator(-MI.diagonal() ** 2) * AvTV
 
         elif tensorType == 1:  # isotropic, variable in space
             Av = getattr(self, "ave" + projection_type + "2CC")
-            V = sdiag(self.cell_volumes)
+            V = DiagonalOperator(n_elements * self.cell_volumes)
+            AvTV = ComposedOperator(Av.T, V)
             if not invert_matrix and not invert_model:
-                dMdprop = n_elements * Av.T * V
+                dMdprop = AvTV
             elif invert_matrix and invert_model:
-                dMdprop = n_elements * (
-                    sdiag(MI.diagonal() ** 2) * Av.T * V * sdiag(1.0 / model ** 2)
+                dMdprop = (
+                    DiagonalOperator(MI.diagonal() ** 2)
+                    * AvTV
+                    * DiagonalOperator(1.0 / model ** 2)
                 )
             elif invert_model:
-                dMdprop = n_elements * Av.T * V * sdiag(-1.0 / model ** 2)
+                dMdprop = AvTV * DiagonalOperator(-1.0 / model ** 2)
             elif invert_matrix:
-                dMdprop = n_elements * (sdiag(-MI.diagonal() ** 2) * Av.T * V)
+                dMdprop = DiagonalOperator(-MI.diagonal() ** 2) * AvTV
 
         elif tensorType == 2:  # anisotropic
             Av = getattr(self, "ave" + projection_type + "2CCV")
-            V = sp.kron(sp.identity(self.dim), sdiag(self.cell_volumes))
+            V = DiagonalOperator(np.tile(self.cell_volumes, self.dim))
 
             if self._meshType == "CYL":
                 Zero = sp.csr_matrix((self.nC, self.nC))
@@ -642,23 +782,31 @@ class BaseTensorMesh(BaseMesh):
                         [sp.hstack([Eye, Zero, Zero]), sp.hstack([Zero, Zero, Eye])]
                     )
                     # print(P.todense())
+                AvT = Av.T * P
             else:
-                P = sp.eye(self.nC * self.dim)
+                AvT = Av.T
+            AvTV = ComposedOperator(AvT, V)
 
             if not invert_matrix and not invert_model:
-                dMdprop = Av.T * P * V
+                dMdprop = AvTV
             elif invert_matrix and invert_model:
                 dMdprop = (
-                    sdiag(MI.diagonal() ** 2) * Av.T * P * V * sdiag(1.0 / model ** 2)
+                    DiagonalOperator(MI.diagonal() ** 2)
+                    * AvTV
+                    * DiagonalOperator(1.0 / model ** 2)
                 )
             elif invert_model:
-                dMdprop = Av.T * P * V * sdiag(-1.0 / model ** 2)
+                dMdprop = AvTV * DiagonalOperator(-1.0 / model ** 2)
             elif invert_matrix:
-                dMdprop = sdiag(-MI.diagonal() ** 2) * Av.T * P * V
+                dMdprop = DiagonalOperator(-MI.diagonal() ** 2) * AvTV
 
         if dMdprop is not None:
+            dMdprop_matrix = None
 
             def innerProductDeriv(v=None):
+                nonlocal dMdprop_matrix
+                if dMdprop_matrix is None:
+                    dMdprop_matrix = dMdprop.tocsr()
                 if v is None:
                     warnings.warn(
                         "Depreciation Warning: TensorMesh.innerProductDeriv."
@@ -666,10 +814,18 @@ class BaseTensorMesh(BaseMesh):
                         "Use: sdiag(u)*dMdprop",
                         DeprecationWarning,
                     )
-                    return dMdprop
-                return sdiag(v) * dMdprop
+                    return dMdprop_matrix
+                return sdiag(v) * dMdprop_matrix
+
+            # the derivative is diag(v) * dMdprop, so apply it with a
+            # broadcast instead of forming the scaled matrix
+            def matvec(V, X):
+                return V * (dMdprop * X)
+
+            def rmatvec(V, Y):
+                return dMdprop.T * (V * Y)
 
-            return innerProductDeriv
+            return InnerProductDeriv(innerProductDeriv, matvec, rmatvec)
         else:
             return None
 
@@ -7,10 +7,7 @@ from discretize.base.base_mesh import BaseMesh
 from discretize.utils.code_utils import deprecate_method
 import warnings
 
-try:
-    from ..mixins import InterfaceTensorread_vtk
-except ImportError:
-    InterfaceTensorread_vtk = object
+from ..mixins import lazy_mixin
 
 
 def load_mesh(file_name):
@@ -29,7 +26,7 @@ def load_mesh(file_name):
     return data
 
 
-class TensorMeshIO(InterfaceTensorread_vtk):
+class TensorMeshIO(lazy_mixin("InterfaceTensorread_vtk")):
     @classmethod
     def _readUBC_3DMesh(TensorMesh, file_name):
         """Read UBC GIF 3D tensor mesh and generate same dimension TensorMesh.
@@ -1,11 +1,29 @@
+import itertools
+import warnings
+
 import numpy as np
 import properties
-
-from discretize.utils import mkvc, index_cube, face_info, volume_tetrahedron
+import scipy.sparse as sp
+
+from discretize.utils import (
+    mkvc,
+    index_cube,
+    face_info,
+    volume_tetrahedron,
+    cast_to_precision,
+)
+from discretize.utils.matrix_utils import _map_chunks
 from discretize.base import BaseRectangularMesh
 from discretize.operators import DiffOperators, InnerProducts
 from discretize.utils.code_utils import deprecate_property
 
+try:
+    from discretize._extensions.interputils_cython import _locate_in_cells
+except ImportError:
+    # the missing extension is reported by discretize.utils.interpolation_utils,
+    # only the interpolation of curvilinear meshes needs it
+    _locate_in_cells = None
+
 
 # Some helper functions.
 def _length2D(x):
@@ -24,6 +42,78 @@ def _normalize3D(x):
     return x / np.kron(np.ones((1, 3)), mkvc(_length3D(x), 2))
 
 
+def _corners(first, ref):
+    """Corners of cells of a structured grid with their (bi/tri)linear weights.
+
+    Yields the grid indices, (n, dim), of each corner (x fastest) of the
+    cells starting at the indices `first` with the weights of the corner at
+    the reference coordinates `ref` in these cells.
+    """
+    for bits in itertools.product(*[(0, 1)] * first.shape[1]):
+        bits = np.array(bits[::-1])
+        yield first + bits, np.prod(np.where(bits, ref, 1 - ref), axis=1)
+
+
+def _corner_nodes(shape, cells):
+    """Node indices of the corners of cells of a structured grid, x fastest.
+
+    `shape` is the number of cells along each axis.
+    """
+    shape = np.asarray(shape)
+    first = np.column_stack(np.unravel_index(cells, shape, order="F"))
+    return np.column_stack(
+        [
+            np.ravel_multi_index(ind.T, shape + 1, order="F")
+            for ind, _ in _corners(first, np.zeros(first.shape))
+        ]
+    )
+
+
+def _bucket_index(nodes, shape):
+    """Regular grid of buckets over the cells of a structured grid.
+
+    Each bucket lists the cells whose bounding box overlaps it, the buckets
+    are as many as the cells.
+
+    Returns
+    -------
+    buckets : scipy.sparse.csr_matrix
+        Bucket by cell matrix, its rows are the cells of each bucket.
+    bounds : numpy.ndarray
+        Lower corner and width of the buckets, (2, dim).
+    """
+    shape = np.asarray(shape)
+    n_cells = int(np.prod(shape))
+    corners = _corner_nodes(shape, np.arange(n_cells))
+    lo = nodes[corners[:, 0]]
+    hi = lo.copy()
+    for corner in corners.T[1:]:
+        np.minimum(lo, nodes[corner], out=lo)
+        np.maximum(hi, nodes[corner], out=hi)
+
+    lower = nodes.min(axis=0)
+    width = (nodes.max(axis=0) - lower) / shape
+    width[width <= 0] = 1.0
+    first = np.floor((lo - lower) / width - 1e-8).astype(np.int64)
+    last = np.floor((hi - lower) / width + 1e-8).astype(np.int64)
+    first = np.clip(first, 0, shape - 1)
+    last = np.clip(last, 0, shape - 1)
+
+    bucket_list, cell_list = [], []
+    spans = (last - first).max(axis=0) + 1
+    for offset in itertools.product(*[range(n) for n in spans]):
+        ind = first + offset
+        keep = np.all(ind <= last, axis=1)
+        cell_list.append(np.flatnonzero(keep))
+        bucket_list.append(np.ravel_multi_index(ind[keep].T, shape, order="F"))
+    cells = np.concatenate(cell_list)
+    buckets = sp.csr_matrix(
+        (np.ones(cells.size, dtype=np.int8), (np.concatenate(bucket_list), cells)),
+        shape=(n_cells, n_cells),
+    )
+    return buckets, np.stack([lower, width])
+
+
 class CurvilinearMesh(BaseRectangularMesh, DiffOperators, InnerProducts):
     """CurvilinearMesh is a mesh class that deals with curvilinear meshes.
 
@@ -53,6 +143,20 @@ class CurvilinearMesh(BaseRectangularMesh, DiffOperators, InnerProducts):
             "gridEz": "edges_z",
         },
     }
+    # the nodes define the mesh, they are not cached
+    _cached_names = DiffOperators._cached_names + (
+        "_cell_centers",
+        "_faces_[xyz]",
+        "_edges_[xyz]",
+        "_cell_volumes",
+        "_face_areas",
+        "_normals",
+        "_edge_lengths",
+        "_edge_tangents",
+        "_padded_cell_centers",
+        "_*_buckets",
+        "_*_bucket_bounds",
+    )
 
     node_list = properties.List(
         "List of arrays describing the node locations",
@@ -84,11 +188,21 @@ class CurvilinearMesh(BaseRectangularMesh, DiffOperators, InnerProducts):
         BaseRectangularMesh.__init__(self, n, **kwargs)
 
         # Save nodes to private variable _nodes as vectors
-        self._nodes = np.ones((self.node_list[0].size, self.dim))
-        for i, node_i in enumerate(self.node_list):
-            self._nodes[:, i] = mkvc(node_i.astype(float))
+        self._set_nodes()
         self.origin = self.nodes.min(axis=0)
 
+    def _set_nodes(self):
+        nodes = np.column_stack(
+            [mkvc(node_i.astype(float)) for node_i in self.node_list]
+        )
+        self._nodes = cast_to_precision(nodes, self._precision)
+
+    def _clear_cache(self):
+        super()._clear_cache()
+        # _nodes is not a cache, rebuild it in the current precision
+        if self.node_list is not None:
+            self._set_nodes()
+
     @properties.validator("node_list")
     def _check_nodes(self, change):
         if len(change["value"]) <= 1:
@@ -403,40 +517,269 @@ class CurvilinearMesh(BaseRectangularMesh, DiffOperators, InnerProducts):
     def edge_lengths(self):
         """Edge lengths"""
         if getattr(self, "_edge_lengths", None) is None:
-            if self.dim == 2:
-                xy = self.gridN
-                A, D = index_cube("AD", self.vnN, self.vnEx)
-                edge1 = xy[D, :] - xy[A, :]
-                A, B = index_cube("AB", self.vnN, self.vnEy)
-                edge2 = xy[B, :] - xy[A, :]
-                self._edge_lengths = np.r_[mkvc(_length2D(edge1)), mkvc(_length2D(edge2))]
-                self._edge_tangents = np.r_[edge1, edge2] / np.c_[self._edge_lengths, self._edge_lengths]
-            elif self.dim == 3:
-                xyz = self.gridN
-                A, D = index_cube("AD", self.vnN, self.vnEx)
-                edge1 = xyz[D, :] - xyz[A, :]
-                A, B = index_cube("AB", self.vnN, self.vnEy)
-                edge2 = xyz[B, :] - xyz[A, :]
-                A, E = index_cube("AE", self.vnN, self.vnEz)
-                edge3 = xyz[E, :] - xyz[A, :]
-                self._edge_lengths = np.r_[
-                    mkvc(_length3D(edge1)),
-                    mkvc(_length3D(edge2)),
-                    mkvc(_length3D(edge3)),
-                ]
-                self._edge_tangents = (
-                    np.r_[edge1, edge2, edge3]
-                    / np.c_[self._edge_lengths, self._edge_lengths, self._edge_lengths]
-                )
+            return self._edge_lengths_and_tangents()[0]
         return self._edge_lengths
 
     @property
     def edge_tangents(self):
         """Edge tangents"""
         if getattr(self, "_edge_tangents", None) is None:
-            self.edge_lengths  # calling .edge_lengths will create the tangents
+            return self._edge_lengths_and_tangents()[1]
         return self._edge_tangents
 
+    def _edge_lengths_and_tangents(self):
+        if self.dim == 2:
+            xy = self.gridN
+            A, D = index_cube("AD", self.vnN, self.vnEx)
+            edge1 = xy[D, :] - xy[A, :]
+            A, B = index_cube("AB", self.vnN, self.vnEy)
+            edge2 = xy[B, :] - xy[A, :]
+            lengths = np.r_[mkvc(_length2D(edge1)), mkvc(_length2D(edge2))]
+            tangents = np.r_[edge1, edge2] / np.c_[lengths, lengths]
+        elif self.dim == 3:
+            xyz = self.gridN
+            A, D = index_cube("AD", self.vnN, self.vnEx)
+            edge1 = xyz[D, :] - xyz[A, :]
+            A, B = index_cube("AB", self.vnN, self.vnEy)
+            edge2 = xyz[B, :] - xyz[A, :]
+            A, E = index_cube("AE", self.vnN, self.vnEz)
+            edge3 = xyz[E, :] - xyz[A, :]
+            lengths = np.r_[
+                mkvc(_length3D(edge1)),
+                mkvc(_length3D(edge2)),
+                mkvc(_length3D(edge3)),
+            ]
+            tangents = np.r_[edge1, edge2, edge3] / np.c_[lengths, lengths, lengths]
+        self._edge_lengths = lengths
+        self._edge_tangents = tangents
+        return lengths, tangents
+
+    def _fingerprint_arrays(self):
+        return super()._fingerprint_arrays() + [np.array(self.vnN), self.nodes]
+
+    def _bucket_index(self, grid):
+        """Cached spatial index of the cells of the nodes or cell centers."""
+        buckets = getattr(self, "_{}_buckets".format(grid), None)
+        bounds = getattr(self, "_{}_bucket_bounds".format(grid), None)
+        if buckets is None or bounds is None:
+            buckets, bounds = _bucket_index(*self._structured_grid(grid))
+            setattr(self, "_{}_buckets".format(grid), buckets)
+            setattr(self, "_{}_bucket_bounds".format(grid), bounds)
+        return buckets, np.asarray(bounds, dtype=np.float64)
+
+    def _structured_grid(self, grid):
+        """Points and number of cells of the nodes or cell centers grid.
+
+        The cell centers grid is padded by the points of the boundary of the
+        mesh in front of the outer cell centers, at logical coordinates 0
+        and n along each axis, so that its cells cover the mesh.
+        """
+        shape = np.array(self.vnC)
+        if grid == "nodes":
+            return self.nodes, shape
+        if getattr(self, "_padded_cell_centers", None) is not None:
+            return self._padded_cell_centers, shape + 1
+        logical = np.meshgrid(
+            *[np.r_[0, np.arange(n) + 0.5, n] for n in shape], indexing="ij"
+        )
+        logical = np.column_stack([mkvc(s) for s in logical])
+        first = np.minimum(np.floor(logical), shape - 1).astype(np.int64)
+        points = np.zeros(logical.shape)
+        for ind, w in _corners(first, logical - first):
+            nodes = np.ravel_multi_index(ind.T, shape + 1, order="F")
+            points += w[:, None] * self.nodes[nodes]
+        self._padded_cell_centers = points
+        return points, shape + 1
+
+    def _locate(self, loc, grid, n_threads=1, chunk_size=65536):
+        """Cells (-1 outside) and reference coordinates of locations.
+
+        The cells are those of the nodes grid or of the padded cell centers
+        grid, their reference coordinates are found by Newton
+        iterations on their (bi/tri)linear map. Non finite locations are
+        outside.
+        """
+        finite = np.isfinite(loc).all(axis=1)
+        if not finite.all():
+            cells = np.full(loc.shape[0], -1, dtype=np.int64)
+            ref = np.zeros(loc.shape)
+            cells[finite], ref[finite] = self._locate(
+                np.ascontiguousarray(loc[finite]), grid, n_threads, chunk_size
+            )
+            return cells, ref
+        points, shape = self._structured_grid(grid)
+        points = np.require(points, dtype=np.float64, requirements="C")
+        buckets, bounds = self._bucket_index(grid)
+        cells = np.empty(loc.shape[0], dtype=np.int64)
+        ref = np.empty(loc.shape, dtype=np.float64)
+
+        def locate(start, stop):
+            _locate_in_cells(
+                loc,
+                points,
+                shape,
+                bounds[0],
+                bounds[1],
+                buckets.indptr,
+                buckets.indices,
+                cells,
+                ref,
+                start,
+                stop,
+            )
+
+        _map_chunks(locate, loc.shape[0], chunk_size, n_threads)
+        return cells, ref
+
+    def get_interpolation_matrix(
+        self,
+        loc,
+        location_type="cell_centers",
+        zeros_outside=False,
+        n_threads=1,
+        chunk_size=65536,
+        **kwargs
+    ):
+        """Produces linear interpolation matrix
+
+        The cell containing each location is found through a grid of
+        buckets over the cells, cached on the mesh, and the location is
+        mapped back to the reference coordinates of the cell by Newton
+        iterations on its (bi/tri)linear map. Values on the nodes are
+        interpolated with the weights of the cell's corners. Values on the
+        cell centers are interpolated in the cells joining the cell
+        centers, and between the outer cell centers and the boundary of the
+        mesh along the logical grid lines (constant towards the boundary).
+
+        Parameters
+        ----------
+        loc : numpy.ndarray
+            Location of points to interpolate to
+
+        location_type : str
+            What to interpolate, location_type can be::
+
+            'N', 'nodes'              -> scalar field defined on nodes
+            'CC', 'cell_centers'      -> scalar field defined on cell centers
+
+        zeros_outside : bool, optional
+            Whether locations outside of the mesh get zero rows, instead of
+            raising an error.
+
+        n_threads : int, optional
+            Number of threads locating chunks of locations.
+
+        chunk_size : int, optional
+            Number of locations per chunk.
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix
+            M, the interpolation matrix
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> import discretize
+        >>> X, Y = discretize.utils.example_curvilinear_grid([4, 4], "rotate")
+        >>> mesh = discretize.CurvilinearMesh([X, Y])
+        >>> v = mesh.nodes[:, 0] + 2 * mesh.nodes[:, 1]
+        >>> P = mesh.get_interpolation_matrix([[0.4, 0.5]], "nodes")
+        >>> np.round(P @ v, 8)
+        array([1.4])
+        """
+        if "locType" in kwargs:
+            warnings.warn(
+                "The locType keyword argument has been deprecated, please use location_type. "
+                "This will be removed in discretize 1.0.0",
+                DeprecationWarning,
+            )
+            location_type = kwargs["locType"]
+        if "zerosOutside" in kwargs:
+            warnings.warn(
+                "The zerosOutside keyword argument has been deprecated, please use zeros_outside. "
+                "This will be removed in discretize 1.0.0",
+                DeprecationWarning,
+            )
+            zeros_outside = kwargs["zerosOutside"]
+        location_type = self._parse_location_type(location_type)
+        if location_type not in ["nodes", "cell_centers"]:
+            raise NotImplementedError(
+                "getInterpolationMat: location_type=="
+                + location_type
+                + " and mesh.dim=="
+                + str(self.dim)
+            )
+        if _locate_in_cells is None:
+            raise ImportError(
+                "Interpolation on a CurvilinearMesh requires the compiled "
+                "interputils_cython extension of discretize, run "
+                "'python setup.py build_ext --inplace' to build it."
+            )
+        loc = np.require(
+            np.atleast_2d(np.asarray(loc, dtype=np.float64)).reshape(-1, self.dim),
+            requirements="C",
+        )
+        return self._persistent(
+            (loc, location_type, bool(zeros_outside)),
+            lambda: self._getInterpolationMat(
+                loc, location_type, zeros_outside, n_threads, chunk_size
+            ),
+        )
+
+    def _getInterpolationMat(
+        self, loc, location_type, zeros_outside, n_threads, chunk_size
+    ):
+        cells, ref = self._locate(loc, "nodes", n_threads, chunk_size)
+        found = cells >= 0
+        if not zeros_outside and not np.all(found):
+            raise ValueError("Points outside of mesh")
+        cells, ref = cells[found], ref[found]
+
+        shape = np.array(self.vnC)
+        first = np.column_stack(np.unravel_index(cells, shape, order="F"))
+        if location_type == "nodes":
+            grid = shape + 1
+            padding = 0
+        else:
+            # cell of the padded cell centers grid along the logical grid
+            # lines, only used for the slivers of the mesh that the padded
+            # grid misses along curved boundaries
+            t = first + ref
+            first = np.minimum(np.floor(t + 0.5), shape).astype(np.int64)
+            lower = np.maximum(first - 0.5, 0)
+            ref = (t - lower) / (np.minimum(first + 0.5, shape) - lower)
+            dual, dual_ref = self._locate(
+                loc[found], "cell_centers", n_threads, chunk_size
+            )
+            inside = dual >= 0
+            first[inside] = np.column_stack(
+                np.unravel_index(dual[inside], shape + 1, order="F")
+            )
+            ref[inside] = dual_ref[inside]
+            # the boundary points take the values of their cell centers
+            grid = shape
+            padding = 1
+
+        columns, weights = [], []
+        for ind, w in _corners(first, ref):
+            ind = np.clip(ind - padding, 0, grid - 1)
+            columns.append(np.ravel_multi_index(ind.T, grid, order="F"))
+            weights.append(w)
+        n_corners = len(columns)
+        indptr = np.zeros(loc.shape[0] + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(found) * n_corners
+        P = sp.csr_matrix(
+            (
+                np.column_stack(weights).ravel(),
+                np.column_stack(columns).ravel(),
+                indptr,
+            ),
+            shape=(loc.shape[0], int(np.prod(grid))),
+        )
+        P.sum_duplicates()
+        return P
+
     # DEPRECATIONS
     vol = deprecate_property("cell_volumes", "vol", removal_version="1.0.0")
     area = deprecate_property("face_areas", "area", removal_version="1.0.0")
@@ -1,3 +1,5 @@
+import itertools
+
 import numpy as np
 import properties
 import scipy.sparse as sp
@@ -11,9 +13,9 @@ from discretize.utils import (
     ddx,
     sdiag,
     spzeros,
-    interpolation_matrix,
     cyl2cart,
 )
+from discretize.utils.matrix_utils import _csr_matmat
 from discretize.base import BaseTensorMesh, BaseRectangularMesh
 from discretize.operators import DiffOperators, InnerProducts
 from discretize.utils.code_utils import (
@@ -71,6 +73,21 @@ class CylindricalMesh(
         **BaseRectangularMesh._aliases,
         **BaseTensorMesh._aliases,
     }
+    _cached_names = (
+        DiffOperators._cached_names
+        + BaseTensorMesh._cached_names
+        + (
+            "_cell_volumes",
+            "_face_[xyz]_areas",
+            "_edge_lengths_[xyz]",
+            "_*_full_array",
+            "_*_full_grid",
+            "_ishanging_*_bool",
+            "_axis_of_symmetry_*_bool",
+            "_deflation_*",
+            "_cartesian_grid_*",
+        )
+    )
 
     cartesian_origin = properties.Array(
         "Cartesian origin of the mesh", dtype=float, shape=("*",)
@@ -340,8 +357,12 @@ class CylindricalMesh(
         """
         full x-edge lengths (prior to deflating)
         """
-        nx, ny, nz = self._shape_total_nodes
-        return np.kron(np.ones(nz), np.kron(np.ones(ny), self.h[0]))
+        if getattr(self, "_edge_x_lengths_full_array", None) is None:
+            nx, ny, nz = self._shape_total_nodes
+            self._edge_x_lengths_full_array = np.kron(
+                np.ones(nz), np.kron(np.ones(ny), self.h[0])
+            )
+        return self._edge_x_lengths_full_array
 
     @property
     def edge_x_lengths(self):
@@ -363,9 +384,15 @@ class CylindricalMesh(
         """
         full vector of y-edge lengths (prior to deflating)
         """
-        if self.is_symmetric:
-            return 2 * pi * self.nodes[:, 0]
-        return np.kron(np.ones(self._shape_total_nodes[2]), np.kron(self.h[1], self.nodes_x))
+        if getattr(self, "_edge_y_lengths_full_array", None) is None:
+            if self.is_symmetric:
+                self._edge_y_lengths_full_array = 2 * pi * self.nodes[:, 0]
+            else:
+                self._edge_y_lengths_full_array = np.kron(
+                    np.ones(self._shape_total_nodes[2]),
+                    np.kron(self.h[1], self.nodes_x),
+                )
+        return self._edge_y_lengths_full_array
 
     @property
     def edge_y_lengths(self):
@@ -390,8 +417,12 @@ class CylindricalMesh(
         """
         full z-edge lengths (prior to deflation)
         """
-        nx, ny, nz = self._shape_total_nodes
-        return np.kron(self.h[2], np.kron(np.ones(ny), np.ones(nx)))
+        if getattr(self, "_edge_z_lengths_full_array", None) is None:
+            nx, ny, nz = self._shape_total_nodes
+            self._edge_z_lengths_full_array = np.kron(
+                self.h[2], np.kron(np.ones(ny), np.ones(nx))
+            )
+        return self._edge_z_lengths_full_array
 
     @property
     def edge_z_lengths(self):
@@ -414,10 +445,15 @@ class CylindricalMesh(
         full edge lengths [r-edges, theta-edgesm z-edges] (prior to
         deflation)
         """
-        if self.is_symmetric:
-            raise NotImplementedError
-        else:
-            return np.r_[self._edge_x_lengths_full, self._edge_y_lengths_full, self._edge_z_lengths_full]
+        if getattr(self, "_edge_lengths_full_array", None) is None:
+            if self.is_symmetric:
+                raise NotImplementedError
+            self._edge_lengths_full_array = np.r_[
+                self._edge_x_lengths_full,
+                self._edge_y_lengths_full,
+                self._edge_z_lengths_full,
+            ]
+        return self._edge_lengths_full_array
 
     @property
     def edge_lengths(self):
@@ -439,9 +475,16 @@ class CylindricalMesh(
         """
         area of x-faces prior to deflation
         """
-        if self.is_symmetric:
-            return np.kron(self.h[2], 2 * pi * self.nodes_x)
-        return np.kron(self.h[2], np.kron(self.h[1], self.nodes_x))
+        if getattr(self, "_face_x_areas_full_array", None) is None:
+            if self.is_symmetric:
+                self._face_x_areas_full_array = np.kron(
+                    self.h[2], 2 * pi * self.nodes_x
+                )
+            else:
+                self._face_x_areas_full_array = np.kron(
+                    self.h[2], np.kron(self.h[1], self.nodes_x)
+                )
+        return self._face_x_areas_full_array
 
     @property
     def face_x_areas(self):
@@ -469,7 +512,11 @@ class CylindricalMesh(
         """
         Area of y-faces (Azimuthal faces), prior to deflation.
         """
-        return np.kron(self.h[2], np.kron(np.ones(self._shape_total_nodes[1]), self.h[0]))
+        if getattr(self, "_face_y_areas_full_array", None) is None:
+            self._face_y_areas_full_array = np.kron(
+                self.h[2], np.kron(np.ones(self._shape_total_nodes[1]), self.h[0])
+            )
+        return self._face_y_areas_full_array
 
     @property
     def face_y_areas(self):
@@ -496,18 +543,21 @@ class CylindricalMesh(
         """
         area of z-faces prior to deflation
         """
-        if self.is_symmetric:
-            return np.kron(
-                np.ones_like(self.nodes_z),
-                pi * (self.nodes_x ** 2 - np.r_[0, self.nodes_x[:-1]] ** 2),
-            )
-        return np.kron(
-            np.ones(self._shape_total_nodes[2]),
-            np.kron(
-                self.h[1],
-                0.5 * (self.nodes_x[1:] ** 2 - self.nodes_x[:-1] ** 2),
-            ),
-        )
+        if getattr(self, "_face_z_areas_full_array", None) is None:
+            if self.is_symmetric:
+                self._face_z_areas_full_array = np.kron(
+                    np.ones_like(self.nodes_z),
+                    pi * (self.nodes_x ** 2 - np.r_[0, self.nodes_x[:-1]] ** 2),
+                )
+            else:
+                self._face_z_areas_full_array = np.kron(
+                    np.ones(self._shape_total_nodes[2]),
+                    np.kron(
+                        self.h[1],
+                        0.5 * (self.nodes_x[1:] ** 2 - self.nodes_x[:-1] ** 2),
+                    ),
+                )
+        return self._face_z_areas_full_array
 
     @property
     def face_z_areas(self):
@@ -534,7 +584,13 @@ class CylindricalMesh(
         """
         Area of all faces (prior to delflation)
         """
-        return np.r_[self._face_x_areas_full, self._face_y_areas_full, self._face_z_areas_full]
+        if getattr(self, "_face_areas_full_array", None) is None:
+            self._face_areas_full_array = np.r_[
+                self._face_x_areas_full,
+                self._face_y_areas_full,
+                self._face_z_areas_full,
+            ]
+        return self._face_areas_full_array
 
     @property
     def face_areas(self):
@@ -909,7 +965,11 @@ class CylindricalMesh(
         """
         Full Nodal grid (including hanging nodes)
         """
-        return ndgrid([self.nodes_x, self._nodes_y_full, self.nodes_z])
+        if getattr(self, "_nodes_full_grid", None) is None:
+            self._nodes_full_grid = ndgrid(
+                [self.nodes_x, self._nodes_y_full, self.nodes_z]
+            )
+        return self._nodes_full_grid
 
     @property
     def nodes(self):
@@ -933,9 +993,11 @@ class CylindricalMesh(
         """
         Full Fx grid (including hanging faces)
         """
-        return ndgrid(
-            [self.nodes_x, self.cell_centers_y, self.cell_centers_z]
-        )
+        if getattr(self, "_faces_x_full_grid", None) is None:
+            self._faces_x_full_grid = ndgrid(
+                [self.nodes_x, self.cell_centers_y, self.cell_centers_z]
+            )
+        return self._faces_x_full_grid
 
     @property
     def faces_x(self):
@@ -960,7 +1022,10 @@ class CylindricalMesh(
         """
         Full grid of y-edges (including eliminated edges)
         """
-        return super().edges_y
+        if getattr(self, "_edges_y_full_grid", None) is None:
+            # not through super().edges_y, which caches its grid on _edges_y
+            self._edges_y_full_grid = ndgrid(self.get_tensor("edges_y"))
+        return self._edges_y_full_grid
 
     @property
     def edges_y(self):
@@ -985,7 +1050,11 @@ class CylindricalMesh(
         """
         Full z-edge grid (including hanging edges)
         """
-        return ndgrid([self.nodes_x, self._nodes_y_full, self.cell_centers_z])
+        if getattr(self, "_edges_z_full_grid", None) is None:
+            self._edges_z_full_grid = ndgrid(
+                [self.nodes_x, self._nodes_y_full, self.cell_centers_z]
+            )
+        return self._edges_z_full_grid
 
     @property
     def edges_z(self):
@@ -1044,8 +1113,8 @@ class CylindricalMesh(
             self._face_x_divergence = sdiag(1 / V) * D1 * sdiag(S)
 
             if not self.is_symmetric:
-                self._face_x_divergence = (
-                    self._face_x_divergence * self._deflation_matrix("Fx", as_ones=True).T
+                self._face_x_divergence = self._deflate_operator(
+                    self._face_x_divergence, columns="faces_x"
                 )
 
         return self._face_x_divergence
@@ -1060,11 +1129,8 @@ class CylindricalMesh(
             D2 = super()._face_y_divergence_stencil
             S = self._face_y_areas_full  # self.reshape(self.face_areas, 'F', 'Fy', 'V')
             V = self.cell_volumes
-            self._face_y_divergence = (
-                sdiag(1 / V)
-                * D2
-                * sdiag(S)
-                * self._deflation_matrix("Fy", as_ones=True).T
+            self._face_y_divergence = self._deflate_operator(
+                sdiag(1 / V) * D2 * sdiag(S), columns="faces_y"
             )
         return self._face_y_divergence
 
@@ -1199,12 +1265,10 @@ class CylindricalMesh(
                 # Edge curl operator
                 self._edge_curl = sdiag(1 / A) * sp.vstack((Dz, Dr)) * sdiag(E)
             else:
-                self._edge_curl = (
-                    sdiag(1 / self.face_areas)
-                    * self._deflation_matrix("F", as_ones=False)
-                    * self._edge_curl_stencil
-                    * sdiag(self._edge_lengths_full)
-                    * self._deflation_matrix("E", as_ones=True).T
+                self._edge_curl = sdiag(1 / A) * self._deflate_operator(
+                    self._edge_curl_stencil * sdiag(self._edge_lengths_full),
+                    rows="faces",
+                    columns="edges",
                 )
 
         return self._edge_curl
@@ -1221,14 +1285,16 @@ class CylindricalMesh(
         """
         if self.is_symmetric:
             raise Exception("There are no x-edges on a cyl symmetric mesh")
-        return (
-            kron3(
-                av(self.shape_cells[2]),
-                av(self.shape_cells[1]),
-                speye(self.shape_cells[0]),
+        if getattr(self, "_average_edge_x_to_cell", None) is None:
+            self._average_edge_x_to_cell = self._deflate_operator(
+                kron3(
+                    av(self.shape_cells[2]),
+                    av(self.shape_cells[1]),
+                    speye(self.shape_cells[0]),
+                ),
+                columns="edges_x",
             )
-            * self._deflation_matrix("Ex", as_ones=True).T
-        )
+        return self._average_edge_x_to_cell
 
     @property
     def average_edge_y_to_cell(self):
@@ -1240,18 +1306,22 @@ class CylindricalMesh(
         scipy.sparse.csr_matrix
             matrix that averages from y-edges to cell centers
         """
-        if self.is_symmetric:
-            avR = av(self.shape_cells[0])[:, 1:]
-            return sp.kron(av(self.shape_cells[2]), avR, format="csr")
-        else:
-            return (
-                kron3(
-                    av(self.shape_cells[2]),
-                    speye(self.shape_cells[1]),
-                    av(self.shape_cells[0]),
+        if getattr(self, "_average_edge_y_to_cell", None) is None:
+            if self.is_symmetric:
+                avR = av(self.shape_cells[0])[:, 1:]
+                self._average_edge_y_to_cell = sp.kron(
+                    av(self.shape_cells[2]), avR, format="csr"
                 )
-                * self._deflation_matrix("Ey", as_ones=True).T
-            )
+            else:
+                self._average_edge_y_to_cell = self._deflate_operator(
+                    kron3(
+                        av(self.shape_cells[2]),
+                        speye(self.shape_cells[1]),
+                        av(self.shape_cells[0]),
+                    ),
+                    columns="edges_y",
+                )
+        return self._average_edge_y_to_cell
 
     @property
     def average_edge_z_to_cell(self):
@@ -1265,14 +1335,16 @@ class CylindricalMesh(
         """
         if self.is_symmetric:
             raise Exception("There are no z-edges on a cyl symmetric mesh")
-        return (
-            kron3(
-                speye(self.shape_cells[2]),
-                av(self.shape_cells[1]),
-                av(self.shape_cells[0]),
+        if getattr(self, "_average_edge_z_to_cell", None) is None:
+            self._average_edge_z_to_cell = self._deflate_operator(
+                kron3(
+                    speye(self.shape_cells[2]),
+                    av(self.shape_cells[1]),
+                    av(self.shape_cells[0]),
+                ),
+                columns="edges_z",
             )
-            * self._deflation_matrix("Ez", as_ones=True).T
-        )
+        return self._average_edge_z_to_cell
 
     @property
     def average_edge_to_cell(self):
@@ -1328,10 +1400,14 @@ class CylindricalMesh(
         scipy.sparse.csr_matrix
             matrix that averages from x-faces to cell centers
         """
-        avR = av(self.vnC[0])[
-            :, 1:
-        ]  # TODO: this should be handled by a deflation matrix
-        return kron3(speye(self.vnC[2]), speye(self.vnC[1]), avR)
+        if getattr(self, "_average_face_x_to_cell", None) is None:
+            avR = av(self.vnC[0])[
+                :, 1:
+            ]  # TODO: this should be handled by a deflation matrix
+            self._average_face_x_to_cell = kron3(
+                speye(self.vnC[2]), speye(self.vnC[1]), avR
+            )
+        return self._average_face_x_to_cell
 
     @property
     def average_face_y_to_cell(self):
@@ -1343,10 +1419,12 @@ class CylindricalMesh(
         scipy.sparse.csr_matrix
             matrix that averages from y-faces to cell centers
         """
-        return (
-            kron3(speye(self.vnC[2]), av(self.vnC[1]), speye(self.vnC[0]))
-            * self._deflation_matrix("Fy", as_ones=True).T
-        )
+        if getattr(self, "_average_face_y_to_cell", None) is None:
+            self._average_face_y_to_cell = self._deflate_operator(
+                kron3(speye(self.vnC[2]), av(self.vnC[1]), speye(self.vnC[0])),
+                columns="faces_y",
+            )
+        return self._average_face_y_to_cell
 
     @property
     def average_face_z_to_cell(self):
@@ -1358,8 +1436,11 @@ class CylindricalMesh(
         scipy.sparse.csr_matrix
             matrix that averages from z-faces to cell centers
         """
-
-        return kron3(av(self.vnC[2]), speye(self.vnC[1]), speye(self.vnC[0]))
+        if getattr(self, "_average_face_z_to_cell", None) is None:
+            self._average_face_z_to_cell = kron3(
+                av(self.vnC[2]), speye(self.vnC[1]), speye(self.vnC[0])
+            )
+        return self._average_face_z_to_cell
 
     @property
     def average_face_to_cell(self):
@@ -1414,75 +1495,157 @@ class CylindricalMesh(
     # Deflation Matrices
     ####################################################
 
-    def _deflation_matrix(self, location, as_ones=False):
+    def _deflation_index(self, location):
         """
-        construct the deflation matrix to remove hanging edges / faces / nodes
-        from the operators
+        index of the deflated edge / face / node that each edge / face / node
+        of the full grid maps to (-1 for the eliminated ones)
         """
         location = self._parse_location_type(location)
         if location not in ["nodes", "faces", "faces_x", "faces_y", "faces_z", "edges", "edges_x", "edges_y", "edges_z", "cell_centers"]:
             raise AssertionError(
                 "Location must be a grid location, not {}".format(location)
             )
+        name = "_deflation_index_{}".format(location)
+        if getattr(self, name, None) is not None:
+            return getattr(self, name)
+
         if location == "cell_centers":
-            return speye(self.nC)
+            index = np.arange(self.nC)
 
         elif location in ["edges", "faces"]:
             if self.is_symmetric:
-                if location == "edges":
-                    return self._deflation_matrix("edges_y", as_ones=as_ones)
-                elif location == "faces":
-                    return sp.block_diag(
-                        [
-                            self._deflation_matrix(location + coord, as_ones=as_ones)
-                            for coord in ["_x", "_z"]
-                        ]
-                    )
-            return sp.block_diag(
-                [
-                    self._deflation_matrix(location + coord, as_ones=as_ones)
-                    for coord in ["_x", "_y", "_z"]
-                ]
-            )
-
-        R = speye(getattr(self, "_n_total_{}".format(location)))
-        hanging_dict = getattr(self, "_hanging_{}".format(location))
-        nothanging = ~getattr(self, "_ishanging_{}".format(location))
-
-        # remove eliminated edges / faces (eg. Fx just doesn't exist)
-        hang = {k: v for k, v in hanging_dict.items() if v is not None}
+                coords = ["_y"] if location == "edges" else ["_x", "_z"]
+            else:
+                coords = ["_x", "_y", "_z"]
+            indices = []
+            offset = 0
+            for coord in coords:
+                sub_index = self._deflation_index(location + coord)
+                indices.append(np.where(sub_index >= 0, sub_index + offset, -1))
+                offset = offset + sub_index.max() + 1
+            index = np.concatenate(indices)
 
-        values = list(hang.values())
-        entries = np.ones(len(values))
+        else:
+            nothanging = ~getattr(self, "_ishanging_{}".format(location))
+            index = np.full(len(nothanging), -1, dtype=int)
+            index[nothanging] = np.arange(np.count_nonzero(nothanging))
+
+            # hanging edges / faces / nodes map onto the one they are
+            # deflated into, eliminated ones (eg. Fx just doesn't exist) don't
+            hang = {
+                k: v
+                for k, v in getattr(self, "_hanging_{}".format(location)).items()
+                if v is not None
+            }
+            if len(hang) > 0:
+                keys = np.fromiter(hang.keys(), dtype=int, count=len(hang))
+                values = np.fromiter(hang.values(), dtype=int, count=len(hang))
+                index[keys] = index[values]
+
+        setattr(self, name, index)
+        return index
 
-        if not as_ones and len(hang) > 0:
-            repeats = set(values)
-            repeat_locs = [(np.r_[values] == repeat).nonzero()[0] for repeat in repeats]
-            for loc in repeat_locs:
-                entries[loc] = 1.0 / len(loc)
+    def _deflation_matrix(self, location, as_ones=False):
+        """
+        construct the deflation matrix to remove hanging edges / faces / nodes
+        from the operators
+        """
+        index = self._deflation_index(location)
+        location = self._parse_location_type(location)
+        name = "_deflation_{}{}".format(location, "_ones" if as_ones else "")
+        if getattr(self, name, None) is not None:
+            return getattr(self, name)
 
-        Hang = sp.csr_matrix(
-            (entries, (values, list(hang.keys()))),
-            shape=(
-                getattr(self, "_n_total_{}".format(location)),
-                getattr(self, "_n_total_{}".format(location)),
-            ),
-        )
-        R = R + Hang
+        if location == "cell_centers":
+            R = speye(self.nC)
 
-        R = R[nothanging, :]
+        elif location in ["edges", "faces"]:
+            if self.is_symmetric:
+                coords = ["_y"] if location == "edges" else ["_x", "_z"]
+            else:
+                coords = ["_x", "_y", "_z"]
+            R = sp.block_diag(
+                [
+                    self._deflation_matrix(location + coord, as_ones=as_ones)
+                    for coord in coords
+                ],
+                format="csr",
+            )
 
-        if not as_ones:
-            R = sdiag(1.0 / R.sum(1)) * R
+        else:
+            kept = np.nonzero(index >= 0)[0]
+            rows = index[kept]
+            entries = np.ones(len(kept))
+            if not as_ones:
+                # the ones deflated into the same edge / face / node share a
+                # weight, then each row is normalized
+                hanging = getattr(self, "_ishanging_{}".format(location))[kept]
+                entries[hanging] = 1.0 / np.bincount(rows[hanging])[rows[hanging]]
+                entries = entries / np.bincount(rows, weights=entries)[rows]
+            R = sp.csr_matrix(
+                (entries, (rows, kept)), shape=(index.max() + 1, len(index))
+            )
 
+        setattr(self, name, R)
         return R
 
+    def _deflate_operator(self, A, rows=None, columns=None):
+        """
+        assemble an operator on the full grids directly on the deflated index
+        sets, the same as ``_deflation_matrix(rows) * A *
+        _deflation_matrix(columns, as_ones=True).T`` without the products
+        """
+        A = A.tocoo()
+        i, j, data = A.row, A.col, A.data
+        n_rows, n_columns = A.shape
+        if columns is not None:
+            index = self._deflation_index(columns)
+            j = index[j]
+            kept = j >= 0
+            i, j, data = i[kept], j[kept], data[kept]
+            n_columns = index.max() + 1
+        if rows is not None:
+            # every full row appears in (at most) one column of the deflation
+            R = self._deflation_matrix(rows).tocoo()
+            weights = np.zeros(R.shape[1])
+            weights[R.col] = R.data
+            index = self._deflation_index(rows)
+            kept = index[i] >= 0
+            i, j, data = index[i[kept]], j[kept], data[kept] * weights[i[kept]]
+            n_rows = R.shape[0]
+        return sp.csr_matrix((data, (i, j)), shape=(n_rows, n_columns))
+
     ####################################################
     # Interpolation
     ####################################################
 
+    def _interpolation_component(self, location_type):
+        location_type = self._parse_location_type(location_type)
+
+        if self.is_symmetric and location_type in ["edges_x", "edges_z", "faces_y"]:
+            raise Exception(
+                "Symmetric CylindricalMesh does not support {0!s} interpolation, "
+                "as this variable does not exist.".format(location_type)
+            )
+
+        if location_type in ["cell_centers_x", "cell_centers_y", "cell_centers_z"]:
+            offset, n_columns = {
+                "x": (0, 2 * self.nC),
+                "y": (0, self.nC),
+                "z": (self.nC, 2 * self.nC),
+            }[location_type[-1]]
+            return "cell_centers", offset, n_columns
+
+        return super()._interpolation_component(location_type)
+
     def get_interpolation_matrix(
-        self, loc, location_type="cell_centers", zeros_outside=False, **kwargs
+        self,
+        loc,
+        location_type="cell_centers",
+        zeros_outside=False,
+        n_threads=1,
+        chunk_size=1048576,
+        **kwargs
     ):
         """Produces interpolation matrix
 
@@ -1506,6 +1669,16 @@ class CylindricalMesh(
             'CCVy', 'cell_centers_y'  -> y-component of vector field defined on cell centers
             'CCVz', 'cell_centers_z'  -> z-component of vector field defined on cell centers
 
+        zeros_outside : bool, optional
+            Whether locations outside of the mesh get zero rows, instead of
+            raising an error.
+
+        n_threads : int, optional
+            Number of threads computing chunks of locations.
+
+        chunk_size : int, optional
+            Number of locations per chunk.
+
         Returns
         -------
         scipy.sparse.csr_matrix
@@ -1527,32 +1700,9 @@ class CylindricalMesh(
             )
             zeros_outside = kwargs["zerosOutside"]
 
-        location_type = self._parse_location_type(location_type)
-
-        if self.is_symmetric and location_type in ["edges_x", "edges_z", "faces_y"]:
-            raise Exception(
-                "Symmetric CylindricalMesh does not support {0!s} interpolation, "
-                "as this variable does not exist.".format(location_type)
-            )
-
-        if location_type in ["cell_centers_x", "cell_centers_y", "cell_centers_z"]:
-            Q = interpolation_matrix(loc, *self.get_tensor("cell_centers"))
-            Z = spzeros(loc.shape[0], self.nC)
-            if location_type[-1] == "x":
-                Q = sp.hstack([Q, Z])
-            elif location_type[-1] == "y":
-                Q = sp.hstack([Q])
-            elif location_type[-1] == "z":
-                Q = sp.hstack([Z, Q])
-
-            if zeros_outside:
-                indZeros = np.logical_not(self.is_inside(loc))
-                loc[indZeros, :] = np.array([v.mean() for v in self.get_tensor("CC")])
-                Q[indZeros, :] = 0
-
-            return Q.tocsr()
-
-        return self._getInterpolationMat(loc, location_type, zeros_outside)
+        return self._getInterpolationMat(
+            loc, location_type, zeros_outside, n_threads, chunk_size
+        )
 
     def cartesian_grid(self, location_type="cell_centers", theta_shift=None, **kwargs):
         """
@@ -1578,6 +1728,17 @@ class CylindricalMesh(
                 DeprecationWarning,
             )
             location_type = kwargs["locType"]
+        if theta_shift is None:
+            # the unshifted grids are the common case, keep them
+            name = "_cartesian_grid_{}".format(
+                self._parse_location_type(location_type)
+            )
+            if getattr(self, name, None) is None:
+                setattr(self, name, self._cartesian_grid(location_type))
+            return getattr(self, name)
+        return self._cartesian_grid(location_type, theta_shift)
+
+    def _cartesian_grid(self, location_type, theta_shift=None):
         try:
             grid = getattr(self, location_type).copy()
         except AttributeError:
@@ -1622,85 +1783,30 @@ class CylindricalMesh(
             )
             location_type_to = kwargs["locTypeTo"]
 
-        location_type = self._parse_location_type(location_type)
-
-        if not self.is_symmetric:
-            raise AssertionError(
-                "Currently we have not taken into account other projections "
-                "for more complicated CylindricalMeshes"
-            )
-
-        if location_type_to is None:
-            location_type_to = location_type
-        location_type_to = self._parse_location_type(location_type_to)
+        return CartesianTransferPlan(
+            self, Mrect, location_type, location_type_to
+        ).matrix
 
-        print(location_type, location_type_to)
-        if location_type == "faces":
-            # do this three times for each component
-            X = self.get_interpolation_matrix_cartesian_mesh(
-                Mrect, location_type="faces_x", location_type_to=location_type_to + "_x"
-            )
-            Y = self.get_interpolation_matrix_cartesian_mesh(
-                Mrect, location_type="faces_y", location_type_to=location_type_to + "_y"
-            )
-            Z = self.get_interpolation_matrix_cartesian_mesh(
-                Mrect, location_type="faces_z", location_type_to=location_type_to + "_z"
-            )
-            return sp.vstack((X, Y, Z))
-        if location_type == "edges":
-            X = self.get_interpolation_matrix_cartesian_mesh(
-                Mrect, location_type="edges_x", location_type_to=location_type_to + "_x"
-            )
-            Y = self.get_interpolation_matrix_cartesian_mesh(
-                Mrect, location_type="edges_y", location_type_to=location_type_to + "_y"
-            )
-            Z = spzeros(getattr(Mrect, "n_" + location_type_to + "_z"), self.n_edges)
-            return sp.vstack((X, Y, Z))
+    def cartesian_transfer_plan(
+        self, mesh, location_type="cell_centers", location_type_to=None
+    ):
+        """Transfer of fields on this mesh to a cartesian mesh.
 
-        grid = getattr(Mrect, location_type_to)
-        # This is unit circle stuff, 0 to 2*pi, starting at x-axis, rotating
-        # counter clockwise in an x-y slice
-        theta = (
-            -np.arctan2(
-                grid[:, 0] - self.cartesian_origin[0],
-                grid[:, 1] - self.cartesian_origin[1],
-            )
-            + np.pi / 2
-        )
-        theta[theta < 0] += np.pi * 2.0
-        r = (
-            (grid[:, 0] - self.cartesian_origin[0]) ** 2
-            + (grid[:, 1] - self.cartesian_origin[1]) ** 2
-        ) ** 0.5
+        Parameters
+        ----------
+        mesh : discretize.base.BaseMesh
+            the cartesian mesh to interpolate on to
+        location_type : {'CC', 'N', 'E', 'F', 'Ex', 'Ey', 'Ez', 'Fx', 'Fy', 'Fz'}
+            grid location
+        location_type_to : str or None, optional
+            grid location to interpolate to. If None, the same grid type as
+            `location_type` will be assumed
 
-        if location_type in ["cell_centers", "nodes", "faces_z", "edges_z"]:
-            G, proj = np.c_[r, theta, grid[:, 2]], np.ones(r.size)
-        else:
-            dotMe = {
-                "faces_x": Mrect.face_normals[:Mrect.nFx, :],
-                "faces_y": Mrect.face_normals[Mrect.nFx:(Mrect.nFx + Mrect.nFy), :],
-                "faces_z": Mrect.face_normals[-Mrect.nFz:, :],
-                "edges_x": Mrect.edge_tangents[: Mrect.nEx, :],
-                "edges_y": Mrect.edge_tangents[Mrect.nEx: (Mrect.nEx + Mrect.nEy), :],
-                "edges_z": Mrect.edge_tangents[-Mrect.nEz:, :],
-            }[location_type_to]
-            if "faces" in location_type:
-                normals = np.c_[np.cos(theta), np.sin(theta), np.zeros(theta.size)]
-                proj = (normals * dotMe).sum(axis=1)
-            elif "edges" in location_type:
-                tangents = np.c_[-np.sin(theta), np.cos(theta), np.zeros(theta.size)]
-                proj = (tangents * dotMe).sum(axis=1)
-            G = np.c_[r, theta, grid[:, 2]]
-
-        interp_type = location_type
-        if interp_type == "faces_y":
-            interp_type = "faces_x"
-        elif interp_type == "edges_x":
-            interp_type = "edges_y"
-
-        Pc2r = self.get_interpolation_matrix(G, interp_type)
-        Proj = sdiag(proj)
-        return Proj * Pc2r
+        Returns
+        -------
+        CartesianTransferPlan
+        """
+        return CartesianTransferPlan(self, mesh, location_type, location_type_to)
 
     # DEPRECATIONS
     vol = deprecate_property("cell_volumes", "vol", removal_version="1.0.0")
@@ -1728,6 +1834,175 @@ class CylindricalMesh(
     )
 
 
+class CartesianTransferPlan(object):
+    """Transfer of fields of a symmetric cylindrical mesh to a cartesian mesh.
+
+    The cylindrical coordinates of the cartesian grid locations and the
+    rotation of the vector components onto the cartesian normals (or
+    tangents) are computed once, when the plan is created, and combined
+    into the sparse matrix of
+    :meth:`CylindricalMesh.get_interpolation_matrix_cartesian_mesh`. The
+    plan then maps any number of fields, e.g. the time channels of a
+    simulation, in one call.
+
+    Parameters
+    ----------
+    mesh : CylindricalMesh
+        the symmetric cylindrical mesh to interpolate from
+    mesh_to : discretize.base.BaseMesh
+        the cartesian mesh to interpolate on to
+    location_type : {'CC', 'N', 'E', 'F', 'Ex', 'Ey', 'Ez', 'Fx', 'Fy', 'Fz'}
+        grid location
+    location_type_to : str or None, optional
+        grid location to interpolate to. If None, the same grid type as
+        `location_type` will be assumed
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> import discretize
+    >>> mesh = discretize.CylindricalMesh([10, 1, 10])
+    >>> mesh_to = discretize.TensorMesh([20, 20, 10], "CC0")
+    >>> plan = mesh.cartesian_transfer_plan(mesh_to, "F")
+    >>> fields = np.random.rand(mesh.nF, 5)
+    >>> plan.apply(fields).shape
+    (12800, 5)
+    """
+
+    def __init__(
+        self, mesh, mesh_to, location_type="cell_centers", location_type_to=None
+    ):
+        if not mesh.is_symmetric:
+            raise AssertionError(
+                "Currently we have not taken into account other projections "
+                "for more complicated CylindricalMeshes"
+            )
+        self.mesh = mesh
+        self.mesh_to = mesh_to
+
+        location_type = mesh._parse_location_type(location_type)
+        if location_type_to is None:
+            location_type_to = location_type
+        location_type_to = mesh._parse_location_type(location_type_to)
+
+        # the component interpolated to each component of the result, a
+        # symmetric mesh has no z edges
+        if location_type in ["faces", "edges"]:
+            components = [
+                (location_type + "_" + xyz, location_type_to + "_" + xyz)
+                for xyz in "xyz"
+            ]
+            if location_type == "edges":
+                components[2] = (None, components[2][1])
+        else:
+            components = [(location_type, location_type_to)]
+
+        # the result components interpolated from the same component of the
+        # mesh are interpolated at once
+        blocks = []
+        for interp_type, group in itertools.groupby(
+            components, key=lambda component: self._interpolated_type(component[0])
+        ):
+            group = list(group)
+            if interp_type is None:
+                n_rows = sum(getattr(mesh_to, to).shape[0] for _, to in group)
+                blocks.append(spzeros(n_rows, mesh.n_edges))
+                continue
+            G, proj = zip(*[self._geometry(*component) for component in group])
+            P = mesh.get_interpolation_matrix(np.vstack(G), interp_type)
+            # scale the rows without touching the (maybe cached) matrix
+            proj = np.repeat(np.concatenate(proj), np.diff(P.indptr))
+            blocks.append(
+                sp.csr_matrix((P.data * proj, P.indices, P.indptr), shape=P.shape)
+            )
+        self._matrix = sp.vstack(blocks, format="csr")
+
+    @staticmethod
+    def _interpolated_type(location_type):
+        # the y faces and x edges of a symmetric mesh are its x faces and
+        # y edges turned towards the location
+        if location_type == "faces_y":
+            return "faces_x"
+        if location_type == "edges_x":
+            return "edges_y"
+        return location_type
+
+    def _geometry(self, location_type, location_type_to):
+        """Cylindrical coordinates of the locations and component weights."""
+        mesh, mesh_to = self.mesh, self.mesh_to
+        grid = getattr(mesh_to, location_type_to)
+        # This is unit circle stuff, 0 to 2*pi, starting at x-axis, rotating
+        # counter clockwise in an x-y slice
+        x = grid[:, 0] - mesh.cartesian_origin[0]
+        y = grid[:, 1] - mesh.cartesian_origin[1]
+        theta = -np.arctan2(x, y) + np.pi / 2
+        theta[theta < 0] += np.pi * 2.0
+        r = (x ** 2 + y ** 2) ** 0.5
+        G = np.c_[r, theta, grid[:, 2]]
+
+        if location_type in ["cell_centers", "nodes", "faces_z", "edges_z"]:
+            return G, np.ones(r.size)
+
+        nFx, nFy = mesh_to.nFx, mesh_to.nFy
+        nEx, nEy = mesh_to.nEx, mesh_to.nEy
+        if location_type_to == "faces_x":
+            dotMe = mesh_to.face_normals[:nFx, :]
+        elif location_type_to == "faces_y":
+            dotMe = mesh_to.face_normals[nFx : (nFx + nFy), :]
+        elif location_type_to == "faces_z":
+            dotMe = mesh_to.face_normals[-mesh_to.nFz :, :]
+        elif location_type_to == "edges_x":
+            dotMe = mesh_to.edge_tangents[:nEx, :]
+        elif location_type_to == "edges_y":
+            dotMe = mesh_to.edge_tangents[nEx : (nEx + nEy), :]
+        else:
+            dotMe = mesh_to.edge_tangents[-mesh_to.nEz :, :]
+        if "faces" in location_type:
+            # the normals of the x faces
+            return G, dotMe[:, 0] * np.cos(theta) + dotMe[:, 1] * np.sin(theta)
+        # the tangents of the y edges
+        return G, -dotMe[:, 0] * np.sin(theta) + dotMe[:, 1] * np.cos(theta)
+
+    @property
+    def shape(self):
+        """Shape of the transfer matrix."""
+        return self._matrix.shape
+
+    @property
+    def matrix(self):
+        """The transfer matrix.
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix
+            M, the interpolation matrix
+        """
+        return self._matrix
+
+    def apply(self, values, output=None, n_threads=1, chunk_size=65536):
+        """Transfer fields of the cylindrical mesh to the cartesian mesh.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Fields on the cylindrical mesh, (n,) or (n, n_fields).
+        output : numpy.ndarray, optional
+            Array of ``np.float64`` to write the result to.
+        n_threads : int, optional
+            Number of threads computing chunks of the cartesian locations.
+        chunk_size : int, optional
+            Number of cartesian locations per chunk.
+
+        Returns
+        -------
+        numpy.ndarray
+            The fields on the cartesian mesh, (n_to,) or (n_to, n_fields).
+        """
+        return _csr_matmat(self._matrix, values, output, n_threads, chunk_size)
+
+    __call__ = apply
+
+
 @deprecate_class(removal_version="1.0.0")
 class CylMesh(CylindricalMesh):
     pass
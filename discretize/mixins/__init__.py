@@ -3,35 +3,116 @@ The ``mixins`` module provides a set of tools for interfacing ``discretize``
 with external libraries such as VTK and OMF. These modules are only imported if
 those external packages are available in the active Python environment and
 provide extra functionality that different finite volume meshes can inherrit.
+
+The modules (and the external packages behind them) are imported the first
+time one of their methods is used, so that ``import discretize`` does not pay
+for plotting and file format stacks that are never used.
 """
+import importlib
 
-AVAILABLE_MIXIN_CLASSES = []
+# the module and public attributes of each mixin, the other attributes of a
+# mixin are only ever used through these
+_MIXINS = {
+    "InterfaceVTK": ("vtk_mod", ["to_vtk", "toVTK", "write_vtk", "writeVTK"]),
+    "InterfaceTensorread_vtk": (
+        "vtk_mod",
+        ["vtk_to_tensor_mesh", "read_vtk", "readVTK"],
+    ),
+    "InterfaceOMF": ("omf_mod", ["to_omf", "from_omf"]),
+    "InterfaceMPL": (
+        "mpl_mod",
+        [
+            "plot_grid",
+            "plot_image",
+            "plot_slice",
+            "plot_3d_slicer",
+            "plotGrid",
+            "plotImage",
+            "plotSlice",
+        ],
+    ),
+}
+_MODULE_ATTRIBUTES = {"Slicer": "mpl_mod"}
+_MODULE_ATTRIBUTES.update((name, module) for name, (module, _) in _MIXINS.items())
+_lazy_mixins = {}
 
-try:
-    from .vtk_mod import InterfaceVTK, InterfaceTensorread_vtk
 
-    AVAILABLE_MIXIN_CLASSES.append(InterfaceVTK)
-except ImportError as err:
-    pass
+class _LazyAttribute(object):
+    """Placeholder loading its mixin when it is first looked up."""
 
-try:
-    from .omf_mod import InterfaceOMF
+    def __init__(self, mixin, name):
+        self.mixin = mixin
+        self.name = name
 
-    AVAILABLE_MIXIN_CLASSES.append(InterfaceOMF)
-except ImportError as err:
-    pass
+    def __get__(self, instance, owner):
+        _load_mixin(self.mixin)
+        return getattr(owner if instance is None else instance, self.name)
 
-# keep this one last in defaults in case anything else wants to overwrite
-# plot commands
-try:
-    from .mpl_mod import Slicer, InterfaceMPL
 
-    AVAILABLE_MIXIN_CLASSES.append(InterfaceMPL)
-except ImportError as err:
-    pass
+def _load_mixin(mixin):
+    """Replace the placeholders of a lazy mixin by the methods of the real one."""
+    module_name, names = _MIXINS[mixin]
+    stub = _lazy_mixins[mixin]
+    try:
+        module = importlib.import_module("." + module_name, __name__)
+    except ImportError as err:
+        # unavailable, the mesh then lacks these methods altogether
+        for name in names:
+            if isinstance(stub.__dict__.get(name), _LazyAttribute):
+                delattr(stub, name)
+        raise AttributeError(
+            "{} is not available: {}".format(mixin, err)
+        ) from err
+    for name, value in vars(getattr(module, mixin)).items():
+        if not (name.startswith("__") and name.endswith("__")):
+            setattr(stub, name, value)
+
+
+def lazy_mixin(mixin):
+    """Return a stand-in for a mixin class that imports it on first use.
 
-# # Python 3 friendly
-class InterfaceMixins(*AVAILABLE_MIXIN_CLASSES):
+    Parameters
+    ----------
+    mixin : str
+        Name of the mixin class, e.g. ``"InterfaceVTK"``.
+
+    Returns
+    -------
+    type
+        A class to inherit from in place of the mixin.
+    """
+    if mixin not in _lazy_mixins:
+        _lazy_mixins[mixin] = type(
+            mixin,
+            (object,),
+            {name: _LazyAttribute(mixin, name) for name in _MIXINS[mixin][1]},
+        )
+    return _lazy_mixins[mixin]
+
+
+def __getattr__(name):
+    if name == "AVAILABLE_MIXIN_CLASSES":
+        available = []
+        for mixin in ["InterfaceVTK", "InterfaceOMF", "InterfaceMPL"]:
+            try:
+                available.append(__getattr__(mixin))
+            except AttributeError:
+                pass
+        return available
+    if name in _MODULE_ATTRIBUTES:
+        try:
+            module = importlib.import_module("." + _MODULE_ATTRIBUTES[name], __name__)
+        except ImportError as err:
+            raise AttributeError("{} is not available: {}".format(name, err)) from err
+        return getattr(module, name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+# keep the matplotlib interface last in case anything else wants to overwrite
+# plot commands
+class InterfaceMixins(
+    lazy_mixin("InterfaceVTK"), lazy_mixin("InterfaceOMF"), lazy_mixin("InterfaceMPL")
+):
     """This class handles all the avaialble mixins that can be inherrited
     directly onto ``discretize.BaseMesh``
     """
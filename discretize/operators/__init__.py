@@ -1,2 +1,3 @@
 from discretize.operators.differential_operators import DiffOperators
 from discretize.operators.inner_products import InnerProducts
+from discretize.operators.matrix_free import MatrixFreeOperators
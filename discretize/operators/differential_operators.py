@@ -144,6 +144,19 @@ class DiffOperators(object):
         "aveN2E": "average_node_to_edge",
         "aveN2F": "average_node_to_face",
     }
+    # cached operators, see BaseMesh._cached_names
+    _cached_names = (
+        "_face_divergence",
+        "_face_[xyz]_divergence",
+        "_nodal_gradient",
+        "_nodal_laplacian",
+        "_cell_gradient",
+        "_cell_gradient_[xyz]",
+        "_cell_gradient_BC",
+        "_edge_curl",
+        "_average_*",
+        "_avE2CC",
+    )
 
     def __init__(self):
         raise Exception(
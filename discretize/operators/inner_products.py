@@ -2,7 +2,6 @@ from scipy import sparse as sp
 from discretize.utils import (
     sub2ind,
     sdiag,
-    inverse_property_tensor,
     TensorType,
     make_property_tensor,
     ndgrid,
@@ -12,11 +11,99 @@ from discretize.utils import (
     spzeros,
     sdinv,
 )
+from discretize.utils.matrix_utils import _as_property_model
 import numpy as np
 from discretize.utils.code_utils import deprecate_method
 import warnings
 
 
+class InnerProductDeriv(object):
+    """Derivative of an inner product matrix with respect to the model.
+
+    Calling the object with a vector ``v`` returns the sparse matrix
+    :math:`\\partial (M v) / \\partial m`, exactly as the closures returned
+    by earlier versions did. The ``matvec`` and ``rmatvec`` methods apply
+    that derivative and its adjoint without forming the sparse matrix, and
+    accept a block of vectors stored column-wise so that many right hand
+    sides (e.g. sources) are handled in a single pass.
+
+    Parameters
+    ----------
+    matrix : callable
+        ``matrix(v)`` returns the sparse derivative for a single vector ``v``.
+
+    matvec : callable
+        ``matvec(V, X)`` with ``V`` of shape (n, k) and ``X`` of shape
+        (n_model, k) or (n_model, 1), returning an (n, k) array.
+
+    rmatvec : callable
+        ``rmatvec(V, Y)`` with ``V`` and ``Y`` of shape (n, k), returning an
+        (n_model, k) array.
+    """
+
+    def __init__(self, matrix, matvec, rmatvec):
+        self._matrix = matrix
+        self._matvec = matvec
+        self._rmatvec = rmatvec
+
+    def __call__(self, v=None):
+        return self._matrix(v)
+
+    def matvec(self, v, x):
+        """Apply the derivative to a model perturbation.
+
+        Parameters
+        ----------
+        v : numpy.ndarray
+            vector(s) the inner product matrix multiplies, (n,) or (n, k)
+
+        x : numpy.ndarray
+            model perturbation(s), (n_model,) or (n_model, k). A single
+            perturbation is applied to every column of ``v``.
+
+        Returns
+        -------
+        numpy.ndarray
+            dMdm(v) @ x, (n,) or (n, k)
+        """
+        v = np.asarray(v)
+        x = np.asarray(x)
+        out = self._matvec(v.reshape(v.shape[0], -1), x.reshape(x.shape[0], -1))
+        if v.ndim == 1 and x.ndim == 1:
+            return out[:, 0]
+        return out
+
+    def rmatvec(self, v, y):
+        """Apply the adjoint of the derivative.
+
+        Parameters
+        ----------
+        v : numpy.ndarray
+            vector(s) the inner product matrix multiplies, (n,) or (n, k)
+
+        y : numpy.ndarray
+            vector(s) to apply the adjoint to, same shape as ``v``
+
+        Returns
+        -------
+        numpy.ndarray
+            dMdm(v).T @ y, (n_model,) or (n_model, k), computed column by
+            column.
+        """
+        v = np.asarray(v)
+        y = np.asarray(y)
+        if v.shape != y.shape:
+            raise ValueError(
+                "v and y must have the same shape, got {} and {}".format(
+                    v.shape, y.shape
+                )
+            )
+        out = self._rmatvec(v.reshape(v.shape[0], -1), y.reshape(y.shape[0], -1))
+        if v.ndim == 1:
+            return out[:, 0]
+        return out
+
+
 class InnerProducts(object):
     """This is a base for the discretize mesh classes.
     This mixIn creates the all the inner product matrices that you need!
@@ -36,7 +123,7 @@ class InnerProducts(object):
 
         Parameters
         ----------
-        model : numpy.ndarray
+        model : numpy.ndarray or discretize.utils.PropertyModel
             material property (tensor properties are possible) at each cell center (nC, (1, 3, or 6))
 
         invert_model : bool
@@ -89,7 +176,7 @@ class InnerProducts(object):
         Parameters
         ----------
 
-        model : numpy.ndarray
+        model : numpy.ndarray or discretize.utils.PropertyModel
             material property (tensor properties are possible) at each cell center (nC, (1, 3, or 6))
 
         invert_model : bool
@@ -194,6 +281,9 @@ class InnerProducts(object):
         if projection_type not in ["F", "E"]:
             raise TypeError("projection_type must be 'F' for faces or 'E' for edges")
 
+        # classify the model once for the fast and the general paths
+        model = _as_property_model(self, model)
+
         fast = None
         if hasattr(self, "_fastInnerProduct") and do_fast:
             fast = self._fastInnerProduct(
@@ -203,9 +293,9 @@ class InnerProducts(object):
             return fast
 
         if invert_model:
-            model = inverse_property_tensor(self, model)
+            model = model.inverse
 
-        tensorType = TensorType(self, model)
+        tensorType = model.tensor_type
 
         Mu = make_property_tensor(self, model)
         Ps = self._getInnerProductProjectionMatrices(projection_type, tensorType)
@@ -273,7 +363,7 @@ class InnerProducts(object):
         """
         Parameters
         ----------
-        model : numpy.ndarray
+        model : numpy.ndarray or discretize.utils.PropertyModel
             material property (tensor properties are possible) at each cell center (nC, (1, 3, or 6))
 
         do_fast :
@@ -288,8 +378,9 @@ class InnerProducts(object):
         Returns
         -------
 
-        scipy.sparse.csr_matrix
-            dMdmu(u), the derivative of the inner product matrix for a certain u
+        InnerProductDeriv
+            dMdmu, call with u to get the derivative of the inner product
+            matrix for a certain u, or use its matvec and rmatvec methods
 
         """
         if "invProp" in kwargs:
@@ -323,7 +414,7 @@ class InnerProducts(object):
         """
         Parameters
         ----------
-        model : numpy.ndarray
+        model : numpy.ndarray or discretize.utils.PropertyModel
             material property (tensor properties are possible) at each cell center (nC, (1, 3, or 6))
 
         do_fast : bool
@@ -338,7 +429,7 @@ class InnerProducts(object):
 
         Returns
         -------
-        scipy.sparse.csr_matrix
+        InnerProductDeriv
             dMdm, the derivative of the inner product matrix (nE, nC*nA)
 
         """
@@ -391,10 +482,12 @@ class InnerProducts(object):
 
         Returns
         -------
-        scipy.sparse.csr_matrix
+        InnerProductDeriv
             dMdm, the derivative of the inner product matrix (nE, nC*nA)
 
         """
+        model = _as_property_model(self, model)
+
         fast = None
         if hasattr(self, "_fastInnerProductDeriv") and do_fast:
             fast = self._fastInnerProductDeriv(
@@ -408,13 +501,121 @@ class InnerProducts(object):
                 "inverting the property or the matrix is not yet implemented for this mesh/tensorType. You should write it!"
             )
 
-        tensorType = TensorType(self, model)
+        tensorType = model.tensor_type
         P = self._getInnerProductProjectionMatrices(projection_type, tensorType=tensorType)
 
         def innerProductDeriv(v):
             return self._getInnerProductDerivFunction(tensorType, P, projection_type, v)
 
-        return innerProductDeriv
+        def matvec(V, X):
+            return self._innerProductDerivMatvec(tensorType, P, V, X)
+
+        def rmatvec(V, Y):
+            return self._innerProductDerivRmatvec(tensorType, P, V, Y)
+
+        return InnerProductDeriv(innerProductDeriv, matvec, rmatvec)
+
+    def _innerProductDerivMatvec(self, tensorType, P, V, X):
+        """Applies dMdm(V) to the model perturbations X.
+
+        Because the inner product matrix is linear in the model, this is
+        sum(P.T * Sigma(X) * P * V), evaluated component-wise on the
+        projected vectors.
+
+        Parameters
+        ----------
+        tensorType : TensorType
+            type of the tensor: TensorType(mesh, sigma)
+
+        P : list
+            list of projection matrices
+
+        V : numpy.ndarray
+            vectors the inner product multiplies (n, k)
+
+        X : numpy.ndarray
+            model perturbations (n_model, k) or (n_model, 1)
+
+        Returns
+        -------
+        numpy.ndarray
+            (n, k)
+        """
+        if tensorType == -1:
+            raise TypeError("The derivative is not defined when no model is given.")
+        d = self.dim
+        nC = self.nC
+        X = X.reshape((-1, nC if tensorType > 0 else 1, X.shape[-1]))
+        out = 0.0
+        for p in P:
+            Y = (p * V).reshape((d, nC, -1))
+            if tensorType < 3:
+                Z = Y * X
+            elif d == 2:
+                Z = np.stack(
+                    (Y[0] * X[0] + Y[1] * X[2], Y[0] * X[2] + Y[1] * X[1])
+                )
+            else:
+                Z = np.stack(
+                    (
+                        Y[0] * X[0] + Y[1] * X[3] + Y[2] * X[4],
+                        Y[0] * X[3] + Y[1] * X[1] + Y[2] * X[5],
+                        Y[0] * X[4] + Y[1] * X[5] + Y[2] * X[2],
+                    )
+                )
+            out = out + p.T * Z.reshape((d * nC, -1))
+        return out
+
+    def _innerProductDerivRmatvec(self, tensorType, P, V, Y):
+        """Applies dMdm(V).T to the vectors Y, column by column.
+
+        Parameters
+        ----------
+        tensorType : TensorType
+            type of the tensor: TensorType(mesh, sigma)
+
+        P : list
+            list of projection matrices
+
+        V : numpy.ndarray
+            vectors the inner product multiplies (n, k)
+
+        Y : numpy.ndarray
+            vectors to apply the adjoint to (n, k)
+
+        Returns
+        -------
+        numpy.ndarray
+            (n_model, k)
+        """
+        if tensorType == -1:
+            raise TypeError("The derivative is not defined when no model is given.")
+        d = self.dim
+        nC = self.nC
+        out = 0.0
+        for p in P:
+            PV = (p * V).reshape((d, nC, -1))
+            PY = (p * Y).reshape((d, nC, -1))
+            G = PV * PY
+            if tensorType == 0:
+                G = G.sum(axis=(0, 1))[None, :]
+            elif tensorType == 1:
+                G = G.sum(axis=0)
+            elif tensorType == 2:
+                G = G.reshape((d * nC, -1))
+            elif d == 2:
+                G = np.r_[G[0], G[1], PV[0] * PY[1] + PV[1] * PY[0]]
+            else:
+                G = np.r_[
+                    G[0],
+                    G[1],
+                    G[2],
+                    PV[0] * PY[1] + PV[1] * PY[0],
+                    PV[0] * PY[2] + PV[2] * PY[0],
+                    PV[1] * PY[2] + PV[2] * PY[1],
+                ]
+            out = out + G
+        return out
 
     def _getInnerProductDerivFunction(self, tensorType, P, projection_type, v):
         """
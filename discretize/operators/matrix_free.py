@@ -0,0 +1,450 @@
+import numpy as np
+from scipy.linalg import eigh
+from scipy.sparse.linalg import LinearOperator
+from discretize.utils import (
+    av,
+    av_extrap,
+    ddx,
+    mkvc,
+    sdiag,
+    speye,
+    KroneckerProduct,
+)
+from discretize.operators.differential_operators import _validate_BC, _ddxCellGrad
+
+
+def _slab(u, axis, index):
+    """Index ``u`` along a single axis, leaving the other axes untouched."""
+    return u[(slice(None),) * axis + (index,)]
+
+
+def _along(v, axis, n_axes):
+    """Reshape the 1D array ``v`` to broadcast along ``axis`` of a grid."""
+    shape = [1] * n_axes
+    shape[axis] = -1
+    return v.reshape(shape)
+
+
+def _difference_adjoint(w, axis):
+    """Adjoint of ``np.diff(u, axis=axis)``."""
+    shape = list(w.shape)
+    shape[axis] += 1
+    out = np.zeros(shape, dtype=w.dtype)
+    _slab(out, axis, slice(None, -1))[...] -= w
+    _slab(out, axis, slice(1, None))[...] += w
+    return out
+
+
+def _to_grid(x, shape):
+    """Reshape an (n, k) block of vectors to a (*shape, k) grid."""
+    return x.reshape(tuple(shape) + (-1,), order="F")
+
+
+def _from_grid(u):
+    """Reshape a (*shape, k) grid back to an (n, k) block of vectors."""
+    return u.reshape((-1, u.shape[-1]), order="F")
+
+
+def _split(x, shapes):
+    """Split an (n, k) block of stacked components into grids."""
+    grids = []
+    start = 0
+    for shape in shapes:
+        end = start + int(np.prod(shape))
+        grids.append(_to_grid(x[start:end], shape))
+        start = end
+    return grids
+
+
+class MatrixFreeOperators(object):
+    """Matrix-free differential operators for tensor meshes.
+
+    The operators returned here are :class:`scipy.sparse.linalg.LinearOperator`
+    objects equivalent to the sparse matrices of :class:`DiffOperators`. They
+    apply the finite volume stencils by differencing the reshaped grid along
+    each axis, so their memory footprint is a few vectors instead of the
+    sparse matrix. Both the forward and adjoint actions are exact.
+
+    Operators that are a single Kronecker product of 1D operators (the
+    directional divergences, gradients and averages) are also available as
+    :class:`discretize.utils.KroneckerProduct` objects, which keep the 1D
+    factors for factor-wise application and further (factored) algebra.
+
+    Examples
+    --------
+
+    .. code:: python
+
+        mesh = discretize.TensorMesh([500, 500, 500])
+        D = mesh.get_matrix_free_operator('face_divergence')
+        G = mesh.get_matrix_free_operator('cell_gradient')
+        r = D * (G * phi)
+
+        # the factored x-divergence, I_z (x) I_y (x) Dx
+        Dx = mesh.get_kronecker_operator('face_x_divergence')
+        Dx.factors[-1]
+    """
+
+    _matrix_free_operators = [
+        "face_divergence",
+        "nodal_gradient",
+        "edge_curl",
+        "cell_gradient",
+    ]
+
+    _kronecker_operators = [
+        "face_x_divergence",
+        "face_y_divergence",
+        "face_z_divergence",
+        "cell_gradient_x",
+        "cell_gradient_y",
+        "cell_gradient_z",
+        "average_face_x_to_cell",
+        "average_face_y_to_cell",
+        "average_face_z_to_cell",
+        "average_edge_x_to_cell",
+        "average_edge_y_to_cell",
+        "average_edge_z_to_cell",
+        "average_node_to_cell",
+    ]
+
+    def __init__(self):
+        raise Exception(
+            "MatrixFreeOperators is a base class providing matrix free "
+            "operators on tensor meshes and cannot run on its own. "
+            "Inherit to your favorite Mesh class."
+        )
+
+    def get_matrix_free_operator(self, name):
+        """Return a matrix free version of a differential operator.
+
+        Parameters
+        ----------
+        name : str
+            The operator, one of 'face_divergence', 'nodal_gradient',
+            'edge_curl' or 'cell_gradient'. The cell gradient uses the
+            boundary conditions set with ``set_cell_gradient_BC``.
+
+        Returns
+        -------
+        scipy.sparse.linalg.LinearOperator
+            An operator with the same action as the sparse matrix
+            ``getattr(mesh, name)``, supporting both ``matvec`` and
+            ``rmatvec`` on single vectors or (n, k) blocks.
+        """
+        if name not in self._matrix_free_operators:
+            raise ValueError(
+                "name must be one of {}, not {}".format(
+                    self._matrix_free_operators, name
+                )
+            )
+        forward, adjoint, shape = getattr(self, "_matrix_free_" + name)()
+
+        def matvec(x):
+            return forward(x.reshape(x.shape[0], -1))
+
+        def rmatvec(x):
+            return adjoint(x.reshape(x.shape[0], -1))
+
+        return LinearOperator(
+            shape,
+            matvec=matvec,
+            rmatvec=rmatvec,
+            matmat=forward,
+            rmatmat=adjoint,
+            dtype=float,
+        )
+
+    def get_kronecker_operator(self, name):
+        """Return an operator as a Kronecker product of 1D operators.
+
+        Parameters
+        ----------
+        name : str
+            The operator, one of the directional operators
+            'face_{x,y,z}_divergence', 'cell_gradient_{x,y,z}',
+            'average_face_{x,y,z}_to_cell', 'average_edge_{x,y,z}_to_cell'
+            or 'average_node_to_cell'.
+
+        Returns
+        -------
+        discretize.utils.KroneckerProduct or None
+            The factored operator, equal to ``getattr(mesh, name)``. The
+            factors are ordered as for ``kron3``, so the x-direction factor
+            is last. None if the mesh does not have that direction.
+        """
+        if name not in self._kronecker_operators:
+            raise ValueError(
+                "name must be one of {}, not {}".format(
+                    self._kronecker_operators, name
+                )
+            )
+        n = self.shape_cells
+        if name == "average_node_to_cell":
+            return KroneckerProduct(*[av(n_i) for n_i in n[::-1]])
+
+        axis = ["x", "y", "z"].index(
+            [part for part in name.split("_") if part in "xyz"][0]
+        )
+        if axis >= self.dim:
+            return None
+        if "divergence" in name:
+            along = sdiag(1.0 / self.h[axis]) * ddx(n[axis])
+            factors = [speye(n_i) for n_i in n]
+        elif "gradient" in name:
+            dh = av_extrap(n[axis]) * self.h[axis]
+            along = sdiag(1.0 / dh) * _ddxCellGrad(n[axis], ["neumann", "neumann"])
+            factors = [speye(n_i) for n_i in n]
+        elif "face" in name:
+            along = av(n[axis])
+            factors = [speye(n_i) for n_i in n]
+        else:
+            along = speye(n[axis])
+            factors = [av(n_i) for n_i in n]
+        factors[axis] = along
+        return KroneckerProduct(*factors[::-1])
+
+    def get_separable_solver(self, location_type="cell_centers", shift=0.0):
+        """Fast direct solver for constant coefficient Poisson/Helmholtz problems.
+
+        On a tensor mesh the constant coefficient Laplacians are Kronecker
+        sums of 1D operators. Each 1D operator is diagonalized with a
+        (generalized, to allow non-uniform cell widths) symmetric eigenvalue
+        problem, so the system can be solved in O(N * (nx + ny + nz))
+        operations with O(N) memory.
+
+        For ``location_type='cell_centers'`` the solver inverts
+
+            ``face_divergence * cell_gradient + shift * I``
+
+        using the boundary conditions set with ``set_cell_gradient_BC``.
+        For ``location_type='nodes'`` it inverts
+
+            ``nodal_gradient.T * Me * nodal_gradient + shift * W``
+
+        where ``Me = get_edge_inner_product()`` and ``W`` is the diagonal
+        (lumped) nodal volume matrix.
+
+        Parameters
+        ----------
+        location_type : str
+            'cell_centers' or 'nodes'
+
+        shift : float
+            constant added to the diagonal, e.g. ``-k**2`` for a Helmholtz
+            problem on cell centers.
+
+        Returns
+        -------
+        scipy.sparse.linalg.LinearOperator
+            The inverse operator, usable directly or as a preconditioner for
+            variable coefficient problems. For singular systems (e.g. pure
+            Neumann boundary conditions with no shift) the null space
+            component is dropped from the solution.
+        """
+        location_type = self._parse_location_type(location_type)
+        if location_type not in ["cell_centers", "nodes"]:
+            raise ValueError(
+                "location_type must be 'cell_centers' or 'nodes', not {}".format(
+                    location_type
+                )
+            )
+
+        # L_i = M_i^-1 T_i along each axis, with T_i symmetric
+        T, M = [], []
+        if location_type == "cell_centers":
+            BC = self._get_cell_gradient_BC()
+            for h, bc in zip(self.h, BC):
+                dh = av_extrap(len(h)) * h
+                G = sdiag(1.0 / dh) * _ddxCellGrad(len(h), bc)
+                T.append((ddx(len(h)) * G).toarray())
+                M.append(h)
+            scale = np.ones(self.nC)
+        else:
+            for h in self.h:
+                D = ddx(len(h))
+                T.append((D.T * sdiag(1.0 / h) * D).toarray())
+                M.append(av(len(h)).T * h)
+            W = 1.0
+            for i, M_i in enumerate(M):
+                W = W * _along(M_i, i, self.dim)
+            scale = 1.0 / mkvc(W)
+
+        values, vectors, inverses = [], [], []
+        for T_i, M_i in zip(T, M):
+            lam, V = eigh(0.5 * (T_i + T_i.T), np.diag(M_i))
+            values.append(lam)
+            vectors.append(V)
+            inverses.append(V.T * M_i)
+
+        n_axes = len(values)
+        lam = 0.0
+        for i, lam_i in enumerate(values):
+            lam = lam + _along(lam_i, i, n_axes)
+        lam = mkvc(lam + shift)
+        tol = 1e-10 * np.abs(lam).max()
+        inv_lam = np.zeros_like(lam)
+        nonzero = np.abs(lam) > tol
+        inv_lam[nonzero] = 1.0 / lam[nonzero]
+
+        V = KroneckerProduct(*vectors[::-1])
+        Vinv = KroneckerProduct(*inverses[::-1])
+        n = len(lam)
+
+        def solve(x):
+            x = x.reshape(n, -1)
+            return V * ((Vinv * (scale[:, None] * x)) * inv_lam[:, None])
+
+        def solve_adjoint(x):
+            x = x.reshape(n, -1)
+            return scale[:, None] * (Vinv.T * ((V.T * x) * inv_lam[:, None]))
+
+        return LinearOperator(
+            (n, n),
+            matvec=solve,
+            rmatvec=solve_adjoint,
+            matmat=solve,
+            rmatmat=solve_adjoint,
+            dtype=float,
+        )
+
+    def _get_cell_gradient_BC(self):
+        """The cell gradient boundary conditions as a list of pairs"""
+        BC = self._cell_gradient_BC_list
+        if isinstance(BC, str):
+            BC = [BC] * self.dim
+        return [_validate_BC(bc) for bc in BC]
+
+    @property
+    def _shapes_faces(self):
+        return [self.shape_faces_x, self.shape_faces_y, self.shape_faces_z][: self.dim]
+
+    @property
+    def _shapes_edges(self):
+        return [self.shape_edges_x, self.shape_edges_y, self.shape_edges_z][: self.dim]
+
+    def _matrix_free_face_divergence(self):
+        dim = self.dim
+        h = [_along(h_i, i, dim + 1) for i, h_i in enumerate(self.h)]
+
+        def forward(x):
+            out = 0.0
+            for i, u in enumerate(_split(x, self._shapes_faces)):
+                out = out + np.diff(u, axis=i) / h[i]
+            return _from_grid(out)
+
+        def adjoint(x):
+            c = _to_grid(x, self.shape_cells)
+            return np.vstack(
+                [_from_grid(_difference_adjoint(c / h[i], i)) for i in range(dim)]
+            )
+
+        return forward, adjoint, (self.nC, self.nF)
+
+    def _matrix_free_nodal_gradient(self):
+        dim = self.dim
+        h = [_along(h_i, i, dim + 1) for i, h_i in enumerate(self.h)]
+
+        def forward(x):
+            u = _to_grid(x, self.shape_nodes)
+            return np.vstack([_from_grid(np.diff(u, axis=i) / h[i]) for i in range(dim)])
+
+        def adjoint(x):
+            out = 0.0
+            for i, w in enumerate(_split(x, self._shapes_edges)):
+                out = out + _difference_adjoint(w / h[i], i)
+            return _from_grid(out)
+
+        return forward, adjoint, (self.nE, self.nN)
+
+    def _matrix_free_edge_curl(self):
+        dim = self.dim
+        if dim <= 1:
+            raise NotImplementedError("Edge Curl only programed for 2 or 3D.")
+
+        if dim == 2:
+            # matches DiffOperators.edge_curl, which scales by the face
+            # areas before applying the stencil in 2D
+            S = self.face_areas[:, None]
+
+            def forward(x):
+                ex, ey = _split(x / S, self._shapes_edges)
+                return _from_grid(np.diff(ey, axis=0) - np.diff(ex, axis=1))
+
+            def adjoint(x):
+                c = _to_grid(x, self.shape_cells)
+                out = np.vstack(
+                    [
+                        _from_grid(-_difference_adjoint(c, 1)),
+                        _from_grid(_difference_adjoint(c, 0)),
+                    ]
+                )
+                return out / S
+
+            return forward, adjoint, (self.nC, self.nE)
+
+        h = [_along(h_i, i, dim + 1) for i, h_i in enumerate(self.h)]
+        # face component a is d(e_c)/d(b) - d(e_b)/d(c) for cyclic (a, b, c)
+        cycles = [(0, 1, 2), (1, 2, 0), (2, 0, 1)]
+
+        def forward(x):
+            e = _split(x, self._shapes_edges)
+            return np.vstack(
+                [
+                    _from_grid(
+                        np.diff(e[c], axis=b) / h[b] - np.diff(e[b], axis=c) / h[c]
+                    )
+                    for a, b, c in cycles
+                ]
+            )
+
+        def adjoint(x):
+            f = _split(x, self._shapes_faces)
+            e = [0.0, 0.0, 0.0]
+            for a, b, c in cycles:
+                e[c] = e[c] + _difference_adjoint(f[a] / h[b], b)
+                e[b] = e[b] - _difference_adjoint(f[a] / h[c], c)
+            return np.vstack([_from_grid(e_i) for e_i in e])
+
+        return forward, adjoint, (self.nF, self.nE)
+
+    def _matrix_free_cell_gradient(self):
+        dim = self.dim
+        BC = self._get_cell_gradient_BC()
+        # ghost point coefficients at either end of each axis
+        ends = [
+            (2.0 if bc[0] == "dirichlet" else 0.0, -2.0 if bc[1] == "dirichlet" else 0.0)
+            for bc in BC
+        ]
+        # distance between adjacent cell centers (half a cell at the boundary
+        # is doubled to match the averaged volumes of DiffOperators)
+        dh = [
+            _along(1.0 / (av_extrap(len(h_i)) * h_i), i, dim + 1)
+            for i, h_i in enumerate(self.h)
+        ]
+
+        def forward(x):
+            u = _to_grid(x, self.shape_cells)
+            out = []
+            for i in range(dim):
+                shape = list(u.shape)
+                shape[i] += 1
+                g = np.empty(shape, dtype=u.dtype)
+                _slab(g, i, slice(1, -1))[...] = np.diff(u, axis=i)
+                _slab(g, i, 0)[...] = ends[i][0] * _slab(u, i, 0)
+                _slab(g, i, -1)[...] = ends[i][1] * _slab(u, i, -1)
+                out.append(_from_grid(g * dh[i]))
+            return np.vstack(out)
+
+        def adjoint(x):
+            out = 0.0
+            for i, g in enumerate(_split(x, self._shapes_faces)):
+                g = g * dh[i]
+                _slab(g, i, 0)[...] *= ends[i][0]
+                _slab(g, i, -1)[...] *= -ends[i][1]
+                out = out + (
+                    _slab(g, i, slice(None, -1)) - _slab(g, i, slice(1, None))
+                )
+            return _from_grid(out)
+
+        return forward, adjoint, (self.nF, self.nC)
@@ -2,14 +2,19 @@ import numpy as np
 
 
 from discretize.base import BaseRectangularMesh, BaseTensorMesh
-from discretize.operators import DiffOperators, InnerProducts
+from discretize.operators import DiffOperators, InnerProducts, MatrixFreeOperators
 from discretize.base.mesh_io import TensorMeshIO
 from discretize.utils import mkvc
 from discretize.utils.code_utils import deprecate_property
 
 
 class TensorMesh(
-    BaseTensorMesh, BaseRectangularMesh, DiffOperators, InnerProducts, TensorMeshIO
+    BaseTensorMesh,
+    BaseRectangularMesh,
+    DiffOperators,
+    InnerProducts,
+    MatrixFreeOperators,
+    TensorMeshIO,
 ):
     """
     TensorMesh is a mesh class that deals with tensor product meshes.
@@ -58,10 +63,58 @@ class TensorMesh(
         **BaseRectangularMesh._aliases,
         **BaseTensorMesh._aliases,
     }
+    _cached_names = (
+        DiffOperators._cached_names
+        + BaseTensorMesh._cached_names
+        + ("_cell_volumes", "_face_[xyz]_areas", "_edge_[xyz]_lengths")
+    )
 
     def __init__(self, h=None, origin=None, **kwargs):
         BaseTensorMesh.__init__(self, h=h, origin=origin, **kwargs)
 
+    @classmethod
+    def from_trusted(cls, h, origin=None):
+        """Create a mesh from cell widths without validating them.
+
+        A low overhead alternative to the constructor when creating many
+        (small) meshes, e.g. a 1D layered mesh per sounding. The widths and
+        origin are used as given, none of the conveniences of the
+        constructor (number of cells, ``'C'`` origins, padding tuples) nor
+        its checks are applied.
+
+        Parameters
+        ----------
+        h : list of numpy.ndarray
+            The cell widths along each dimension, 1D float arrays that are
+            not copied.
+        origin : numpy.ndarray, optional
+            The origin of the mesh, defaults to zeros.
+
+        Returns
+        -------
+        discretize.TensorMesh
+        """
+        template = cls.__dict__.get("_trusted_template")
+        if template is None:
+            # the default values of the other properties and attributes
+            mesh = cls([1])
+            backend = mesh._backend.copy()
+            for key in ["_n", "origin", "h"]:
+                backend.pop(key)
+            state = mesh.__getstate__()
+            for key in ["_backend", "_listeners"]:
+                state.pop(key)
+            template = cls._trusted_template = (backend, state)
+        backend, state = template
+        h = tuple(np.asarray(h_i, dtype=float) for h_i in h)
+        origin = np.zeros(len(h)) if origin is None else np.asarray(origin, dtype=float)
+        backend = {
+            key: value.copy() if isinstance(value, np.ndarray) else value
+            for key, value in backend.items()
+        }
+        backend.update(_n=tuple(len(h_i) for h_i in h), origin=origin, h=h)
+        return cls._from_trusted(backend, state, lambda: cls(h, origin))
+
     def __repr__(self):
         """Plain text representation."""
         fmt = "\n  {}: {:,} cells\n\n".format(type(self).__name__, self.nC)
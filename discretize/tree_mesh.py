@@ -88,6 +88,7 @@
 import properties
 
 from discretize.base import BaseTensorMesh
+from discretize.base.base_mesh import _copy_arrays
 from discretize.operators import InnerProducts, DiffOperators
 from discretize.base.mesh_io import TreeMeshIO
 from discretize.utils import as_array_n_by_dim
@@ -135,6 +136,23 @@ class TreeMesh(_TreeMesh, BaseTensorMesh, InnerProducts, TreeMeshIO):
             "gridhEz": "hanging_edges_z",
         },
     }
+    _cached_names = (
+        DiffOperators._cached_names
+        + BaseTensorMesh._cached_names
+        + (
+            "_hanging_nodes",
+            "_hanging_faces_[xyz]",
+            "_hanging_edges_[xyz]",
+            "_h_gridded",
+            "_cell_volumes",
+            "_face_areas",
+            "_edge_lengths",
+            "_stencil_cell_gradient*",
+            "_boundary_*",
+            "_cell_boundary_ind",
+            "_face_boundary_ind",
+        )
+    )
 
     # inheriting stuff from BaseTensorMesh that isn't defined in _QuadTree
     def __init__(self, h=None, origin=None, **kwargs):
@@ -160,6 +178,36 @@ class TreeMesh(_TreeMesh, BaseTensorMesh, InnerProducts, TreeMeshIO):
             inds = kwargs.pop("cell_indexes")
             levels = kwargs.pop("cell_levels")
             self.__setstate__((inds, levels))
+        self.precision = kwargs.pop("precision", "double")
+
+    def _clear_cache(self):
+        _TreeMesh._clear_cache(self)
+        BaseTensorMesh._clear_cache(self)
+
+    def copy(self):
+        """Make a copy of the current mesh.
+
+        The tree of the copy is rebuilt from the cells of this (finalized)
+        mesh, it then shares the cached geometry and operators of this mesh.
+
+        Returns
+        -------
+        discretize.TreeMesh
+        """
+        mesh = TreeMesh(self.h, self.origin, precision=self.precision)
+        mesh._backend.update(
+            {key: _copy_arrays(value) for key, value in self._backend.items()}
+        )
+        if self.finalized:
+            mesh.__setstate__(self.__getstate__())
+            mesh._share_cache(self)
+        return mesh
+
+    def _fingerprint_arrays(self):
+        if not self.finalized:
+            return None
+        levels = self.cell_levels_by_index(np.arange(self.n_cells))
+        return super()._fingerprint_arrays() + [self.cell_centers, levels]
 
     def __repr__(self):
         """Plain text representation."""
@@ -538,15 +586,87 @@ class TreeMesh(_TreeMesh, BaseTensorMesh, InnerProducts, TreeMeshIO):
 
         locs = np.require(np.atleast_2d(locs), dtype=np.float64, requirements="C")
 
-        if location_type == "N":
-            Av = self._getNodeIntMat(locs, zeros_outside)
-        elif location_type in ["Ex", "Ey", "Ez"]:
-            Av = self._getEdgeIntMat(locs, zeros_outside, location_type[1])
-        elif location_type in ["Fx", "Fy", "Fz"]:
-            Av = self._getFaceIntMat(locs, zeros_outside, location_type[1])
-        elif location_type in ["CC"]:
-            Av = self._getCellIntMat(locs, zeros_outside)
-        return Av
+        def build():
+            if location_type == "N":
+                return self._getNodeIntMat(locs, zeros_outside)
+            elif location_type in ["Ex", "Ey", "Ez"]:
+                return self._getEdgeIntMat(locs, zeros_outside, location_type[1])
+            elif location_type in ["Fx", "Fy", "Fz"]:
+                return self._getFaceIntMat(locs, zeros_outside, location_type[1])
+            return self._getCellIntMat(locs, zeros_outside)
+
+        return self._persistent((locs, location_type, bool(zeros_outside)), build)
+
+    def evaluate(self, values, loc, location_type="CC", zeros_outside=False):
+        """Linearly interpolate values on the mesh to locations.
+
+        Gives the same result as ``get_interpolation_matrix(loc,
+        location_type) @ values``, but without building the interpolation
+        matrix: the weights of each location are applied as soon as they
+        are found.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Values on the cells, nodes, edges or faces, (n,) or (n, n_values)
+            to evaluate several columns at once.
+        loc : numpy.ndarray
+            Locations to evaluate at, (n_loc, dim).
+        location_type : str, optional
+            What to interpolate, one of ``'N'``, ``'CC'``,
+            ``'Ex'``, ``'Ey'``, ``'Ez'``, ``'Fx'``, ``'Fy'`` or ``'Fz'`` (or
+            their long names, e.g. ``'cell_centers'``).
+        zeros_outside : bool, optional
+            Whether locations outside of the mesh evaluate to zero.
+
+        Returns
+        -------
+        numpy.ndarray
+            The interpolated values, (n_loc,) or (n_loc, n_values).
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> from discretize import TreeMesh
+        >>> mesh = TreeMesh([8, 8])
+        >>> mesh.refine(2)
+        >>> v = mesh.nodes[:, 0] + 2 * mesh.nodes[:, 1]
+        >>> mesh.evaluate(v, [[0.3, 0.4]], "N")
+        array([1.1])
+        """
+        # the long names come from _parse_location_type, the short name the
+        # kernel expects is derived back from them
+        long_type = self._parse_location_type(location_type)
+        if long_type == "cell_centers":
+            location_type = "CC"
+        else:
+            location_type = long_type[0].upper() + long_type.partition("_")[2]
+        if location_type not in ["N", "CC", "Ex", "Ey", "Ez", "Fx", "Fy", "Fz"]:
+            raise Exception("location_type must be one of N, CC, Ex, Ey, Ez, Fx, Fy, or Fz")
+
+        if self.dim == 2 and location_type in ["Ez", "Fz"]:
+            raise Exception("Unable to interpolate from Z edges/face in 2D")
+
+        # like the interpolation matrix, edge and face components are
+        # evaluated from the values on all the edges (faces)
+        n_rows = {"C": self.n_cells, "N": self.n_nodes, "E": self.n_edges, "F": self.n_faces}[
+            location_type[0]
+        ]
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape[0] != n_rows:
+            raise ValueError(
+                "values must have {} rows for {}, not {}".format(
+                    n_rows, location_type, values.shape[0]
+                )
+            )
+        locs = as_array_n_by_dim(loc, self.dim)
+        locs = np.require(np.atleast_2d(locs), dtype=np.float64, requirements="C")
+        out = self._evaluate(
+            locs, values.reshape(n_rows, -1), zeros_outside, location_type
+        )
+        if values.ndim == 1:
+            return out[:, 0]
+        return out
 
     @property
     def permute_cells(self):
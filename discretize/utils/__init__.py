@@ -4,6 +4,7 @@ from discretize.utils.matrix_utils import (
     sdiag,
     sdinv,
     speye,
+    kron,
     kron3,
     spzeros,
     ddx,
@@ -16,10 +17,18 @@ from discretize.utils.matrix_utils import (
     inverse_3x3_block_diagonal,
     inverse_2x2_block_diagonal,
     TensorType,
+    PropertyModel,
     make_property_tensor,
     inverse_property_tensor,
+    inverse_packed_tensor,
+    cast_to_precision,
     Zero,
     Identity,
+    LazyOperator,
+    KroneckerProduct,
+    DiagonalOperator,
+    ComposedOperator,
+    BlockOperator,
 )
 from discretize.utils.mesh_utils import (
     example_curvilinear_grid,
@@ -32,7 +41,12 @@ from discretize.utils.mesh_utils import (
     mesh_builder_xyz,
 )
 from discretize.utils.curvilinear_utils import volume_tetrahedron, face_info, index_cube
-from discretize.utils.interpolation_utils import interpolation_matrix, volume_average
+from discretize.utils.interpolation_utils import (
+    interpolation_matrix,
+    interpolate_values,
+    volume_average,
+    VolumeAveragingPlan,
+)
 from discretize.utils.coordinate_utils import (
     rotate_points_from_normals,
     rotation_matrix_from_normals,
@@ -43,6 +57,20 @@ from discretize.utils.coordinate_utils import (
     # rotate_vec_cyl2cart
 )
 
+from discretize.utils.multigrid_utils import (
+    coarsen_mesh,
+    mesh_hierarchy,
+    prolongation_matrix,
+    galerkin_operator,
+)
+from discretize.utils.cache_utils import (
+    CacheInfo,
+    set_cache_limit,
+    get_cache_limit,
+    set_cache_directory,
+    get_cache_directory,
+)
+from discretize.utils.shared_memory_utils import SharedMesh
 from discretize.utils.io_utils import download
 
 # DEPRECATIONS
@@ -0,0 +1,398 @@
+import fnmatch
+import hashlib
+import itertools
+import json
+import os
+import re
+import shutil
+import tempfile
+import weakref
+from collections import OrderedDict, namedtuple
+import numpy as np
+import scipy.sparse as sp
+
+CacheInfo = namedtuple(
+    "CacheInfo", ["hits", "misses", "evictions", "limit", "size", "entries"]
+)
+CacheInfo.__doc__ = """Statistics of a mesh's operator cache.
+
+``entries`` maps the cached names to their size in bytes, ordered from the
+least to the most recently used.
+"""
+
+# every live cache, held weakly so the registry never keeps a mesh alive
+_live_caches = weakref.WeakSet()
+_clock = itertools.count()
+_global_limit = None
+_cache_directory = None
+
+
+def set_cache_limit(limit):
+    """Set a byte limit shared by the operator caches of all meshes.
+
+    When the cached geometry and operators of all live meshes exceed this
+    limit, the least recently used entries (across meshes) are evicted and
+    rebuilt on their next use. Meshes are only referenced weakly, so
+    discarded meshes release their share of the limit.
+
+    Parameters
+    ----------
+    limit : int or None
+        Limit in bytes, ``None`` (default) for no limit.
+    """
+    global _global_limit
+    if limit is not None and limit < 0:
+        raise ValueError("limit must be positive or None, not {}".format(limit))
+    _global_limit = limit
+    if limit is not None:
+        _evict_global()
+
+
+def get_cache_limit():
+    """The byte limit shared by the operator caches of all meshes.
+
+    Returns
+    -------
+    int or None
+        Limit in bytes, ``None`` for no limit.
+    """
+    return _global_limit
+
+
+def set_cache_directory(path):
+    """Set the default directory of the persistent operator cache.
+
+    Sparse operators built by a mesh (divergence, curl, nodal gradient and
+    averaging matrices) are saved under ``path/<fingerprint>/`` and memory
+    mapped from there by any later mesh with the same fingerprint (same
+    type, precision, widths, origin and, for a TreeMesh, the same cells),
+    e.g. in another process. Individual meshes can override this with their
+    ``cache_directory``, and opt in to saving their interpolation matrices
+    with ``cache_interpolation``.
+
+    Parameters
+    ----------
+    path : str or None
+        The directory, ``None`` (default) disables the persistent cache.
+    """
+    global _cache_directory
+    _cache_directory = None if path is None else os.fspath(path)
+
+
+def get_cache_directory():
+    """The default directory of the persistent operator cache.
+
+    Returns
+    -------
+    str or None
+    """
+    return _cache_directory
+
+
+def fingerprint(*values):
+    """Stable hexadecimal digest of a sequence of arrays (or strings).
+
+    Parameters
+    ----------
+    *values : array_like
+
+    Returns
+    -------
+    str
+    """
+    digest = hashlib.sha1()
+    for value in values:
+        value = np.ascontiguousarray(value)
+        digest.update("{}{}".format(value.dtype.str, value.shape).encode())
+        digest.update(value.view(np.uint8) if value.size else b"")
+    return digest.hexdigest()
+
+
+def save_sparse(path, A):
+    """Save a sparse matrix as memory mappable arrays in a directory.
+
+    The matrix is written to a temporary directory that is then renamed, so
+    concurrent writers and readers never see a partial matrix.
+
+    Parameters
+    ----------
+    path : str
+        The directory to create, it is left untouched if it already exists.
+    A : scipy.sparse.spmatrix
+    """
+    if os.path.exists(path):
+        return
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    if A.format not in ("csr", "csc"):
+        A = A.tocsr()
+    tmp = tempfile.mkdtemp(dir=parent)
+    try:
+        for key in ["data", "indices", "indptr"]:
+            np.save(os.path.join(tmp, key + ".npy"), getattr(A, key))
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump({"format": A.format, "shape": list(A.shape)}, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # another process won the race
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def load_sparse(path):
+    """Memory map a sparse matrix saved by :func:`save_sparse`.
+
+    Parameters
+    ----------
+    path : str
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix or scipy.sparse.csc_matrix or None
+        The matrix, memory mapped copy on write (changes are not written
+        back), or ``None`` if ``path`` does not hold one.
+    """
+    try:
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        data, indices, indptr = (
+            np.load(os.path.join(path, key + ".npy"), mmap_mode="c")
+            for key in ["data", "indices", "indptr"]
+        )
+    except (OSError, ValueError):
+        return None
+    matrix = sp.csr_matrix if meta["format"] == "csr" else sp.csc_matrix
+    return matrix((data, indices, indptr), shape=tuple(meta["shape"]), copy=False)
+
+
+def nbytes(value):
+    """Memory held by an array or sparse matrix, in bytes.
+
+    Parameters
+    ----------
+    value : numpy.ndarray or scipy.sparse.spmatrix
+
+    Returns
+    -------
+    int
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if sp.issparse(value):
+        if value.format in ("csr", "csc", "bsr"):
+            arrays = [value.data, value.indices, value.indptr]
+        elif value.format == "coo":
+            arrays = [value.data, value.row, value.col]
+        elif value.format == "dia":
+            arrays = [value.data, value.offsets]
+        else:
+            return nbytes(value.tocsr())
+        return sum(a.nbytes for a in arrays)
+    return 0
+
+
+def name_matcher(patterns):
+    """Match function of a name against any of a sequence of glob patterns.
+
+    Parameters
+    ----------
+    patterns : sequence of str
+
+    Returns
+    -------
+    callable
+        Returns a match object, or ``None``, for a name.
+    """
+    if not patterns:
+        return lambda name: None
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns)).match
+
+
+def is_cacheable(value):
+    """Whether a value is stored in the operator cache of a mesh."""
+    return isinstance(value, np.ndarray) or sp.issparse(value)
+
+
+class OperatorCache(object):
+    """Size bounded, least recently used store for a mesh's cached values.
+
+    Meshes store their cached geometry and operators (the private
+    attributes matching their ``_cached_names`` patterns) here instead of
+    on the instance.
+    Names stay known after their value is evicted, so they read as ``None``
+    and are rebuilt on their next use.
+
+    When the owning mesh has a persistent cache directory, sparse operators
+    are also saved there and missing entries are memory mapped from it.
+
+    Parameters
+    ----------
+    limit : int, optional
+        Byte limit of this cache, ``None`` for no limit.
+    owner : discretize.base.BaseMesh, optional
+        The mesh, held weakly, providing ``_persistent_cache_directory``.
+    persistent : tuple of str, optional
+        Glob patterns of the names that may be persisted. Only operators
+        that depend on nothing but the mesh fingerprint may be listed.
+    """
+
+    def __init__(self, limit=None, owner=None, persistent=()):
+        self._entries = OrderedDict()  # name -> [value, nbytes, tick]
+        self._known = set()
+        self._owner = None if owner is None else weakref.ref(owner)
+        self._persistent = persistent
+        self._directory = False  # not resolved yet
+        self.limit = limit
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, name):
+        if name in self._known:
+            return True
+        path = self._path(name)
+        return path is not None and os.path.isdir(path)
+
+    @property
+    def directory(self):
+        """The persistent cache directory of the owning mesh (or ``None``)."""
+        if self._directory is False:
+            # guard against re-entry while the owner computes its fingerprint
+            self._directory = None
+            owner = None if self._owner is None else self._owner()
+            if owner is not None:
+                self._directory = owner._persistent_cache_directory()
+        return self._directory
+
+    def reset_directory(self):
+        """Resolve the persistent cache directory again on its next use."""
+        self._directory = False
+
+    def _path(self, name):
+        if not any(fnmatch.fnmatchcase(name, p) for p in self._persistent):
+            return None
+        directory = self.directory
+        if directory is None:
+            return None
+        return os.path.join(directory, name.lstrip("_"))
+
+    def load(self, name):
+        """Load an operator from the persistent cache (``None`` if absent)."""
+        path = self._path(name)
+        if path is None:
+            return None
+        return load_sparse(path)
+
+    def save(self, name, value):
+        """Save a sparse operator to the persistent cache, if there is one."""
+        path = self._path(name)
+        if path is not None and sp.issparse(value):
+            save_sparse(path, value)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, name):
+        """Return a cached value (``None`` if it is not cached)."""
+        entry = self._entries.get(name)
+        if entry is None:
+            value = self.load(name)
+            if value is not None:
+                self._known.add(name)
+                self._store(name, value)
+            return value
+        self.hits += 1
+        entry[2] = next(_clock)
+        self._entries.move_to_end(name)
+        return entry[0]
+
+    def set(self, name, value):
+        """Store a value, ``None`` removes it."""
+        self._known.add(name)
+        if value is None:
+            self._entries.pop(name, None)
+            return
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] is value:
+            entry[2] = next(_clock)
+            self._entries.move_to_end(name)
+            return
+        self.misses += 1
+        self.save(name, value)
+        self._store(name, value)
+
+    def update(self, items):
+        """Store already built (name, value) pairs, e.g. those of another cache."""
+        for name, value in items:
+            self._known.add(name)
+            self._store(name, value)
+
+    def _store(self, name, value):
+        self._entries[name] = [value, nbytes(value), next(_clock)]
+        self._entries.move_to_end(name)
+        _live_caches.add(self)
+        if self.limit is not None:
+            self._evict(self.limit, keep=name)
+        if _global_limit is not None:
+            _evict_global(keep=(self, name))
+
+    def items(self):
+        """The cached (name, value) pairs, from least to most recently used."""
+        return [(name, entry[0]) for name, entry in self._entries.items()]
+
+    @property
+    def size(self):
+        """Total size of the cached values in bytes."""
+        return sum(entry[1] for entry in self._entries.values())
+
+    def clear(self, pattern=None):
+        """Remove the entries whose name matches a glob pattern (all by default).
+
+        The pattern is matched against the names without their leading
+        underscore, e.g. ``"average_*"``.
+        """
+        for name in list(self._entries):
+            if pattern is None or fnmatch.fnmatchcase(name.lstrip("_"), pattern):
+                del self._entries[name]
+
+    def info(self):
+        """Return the statistics of the cache as a :class:`CacheInfo`."""
+        entries = OrderedDict(
+            (name.lstrip("_"), entry[1]) for name, entry in self._entries.items()
+        )
+        return CacheInfo(
+            self.hits, self.misses, self.evictions, self.limit, self.size, entries
+        )
+
+    def _evict(self, limit, keep=None):
+        size = self.size
+        for name in list(self._entries):
+            if size <= limit:
+                break
+            if name == keep:
+                continue
+            size -= self._pop_evicted(name)
+
+    def _oldest(self, keep=None):
+        for name, entry in self._entries.items():
+            if name != keep:
+                return name, entry[2]
+        return None, None
+
+    def _pop_evicted(self, name):
+        self.evictions += 1
+        return self._entries.pop(name)[1]
+
+
+def _evict_global(keep=(None, None)):
+    caches = list(_live_caches)
+    size = sum(cache.size for cache in caches)
+    while size > _global_limit:
+        oldest = None
+        for cache in caches:
+            name, tick = cache._oldest(keep[1] if cache is keep[0] else None)
+            if name is not None and (oldest is None or tick < oldest[2]):
+                oldest = (cache, name, tick)
+        if oldest is None:
+            break
+        size -= oldest[0]._pop_evicted(oldest[1])
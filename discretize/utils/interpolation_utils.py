@@ -1,15 +1,14 @@
 import numpy as np
 import scipy.sparse as sp
-from discretize.utils.matrix_utils import mkvc, sub2ind
+from discretize.utils.matrix_utils import _index_dtype, _map_chunks, _csr_matmat
 from discretize.utils.code_utils import deprecate_function
 
 try:
     from discretize._extensions import interputils_cython as pyx
 
     _interp_point_1D = pyx._interp_point_1D
-    _interpmat1D = pyx._interpmat1D
-    _interpmat2D = pyx._interpmat2D
-    _interpmat3D = pyx._interpmat3D
+    _interpolation_csr = pyx._interpolation_csr
+    _interpolate_values = pyx._interpolate_values
     _vol_interp = pyx._tensor_volume_averaging
     _interpCython = True
 except ImportError as err:
@@ -39,13 +38,19 @@ except ImportError as err:
     _interpCython = False
 
 
-def interpolation_matrix(locs, x, y=None, z=None):
+def interpolation_matrix(locs, x, y=None, z=None, n_threads=1, chunk_size=1048576):
     """Local interpolation computed for each receiver point in turn
 
+    The rows of the interpolation matrix are written straight into the
+    arrays of the CSR format by a compiled kernel, one chunk of points at a
+    time, so no intermediate (row, column, value) triplets are allocated.
+
     :param numpy.ndarray loc: Location of points to interpolate to
     :param numpy.ndarray x: Tensor of 1st dimension of grid.
     :param numpy.ndarray y: Tensor of 2nd dimension of grid. None by default.
     :param numpy.ndarray z: Tensor of 3rd dimension of grid. None by default.
+    :param int n_threads: Number of threads filling in chunks of points.
+    :param int chunk_size: Number of points per chunk.
     :rtype: scipy.sparse.csr_matrix
     :return: Interpolation matrix
 
@@ -66,29 +71,92 @@ def interpolation_matrix(locs, x, y=None, z=None):
         plt.show()
 
     """
-
+    tensors = [np.asarray(v, dtype=float) for v in (x, y, z) if v is not None]
+    locs = np.asarray(locs, dtype=float)
     npts = locs.shape[0]
-    locs = locs.astype(float)
-    x = x.astype(float)
-    if y is None and z is None:
-        shape = [x.size]
-        inds, vals = _interpmat1D(mkvc(locs), x)
-    elif z is None:
-        y = y.astype(float)
-        shape = [x.size, y.size]
-        inds, vals = _interpmat2D(locs, x, y)
-    else:
-        y = y.astype(float)
-        z = z.astype(float)
-        shape = [x.size, y.size, z.size]
-        inds, vals = _interpmat3D(locs, x, y, z)
-
-    I = np.repeat(range(npts), 2 ** len(shape))
-    J = sub2ind(shape, inds)
-    Q = sp.csr_matrix((vals, (I, J)), shape=(npts, np.prod(shape)))
+    locs = locs.reshape((npts, -1))
+    if locs.shape[1] != len(tensors):
+        raise ValueError(
+            "locs must have {} columns, not {}".format(len(tensors), locs.shape[1])
+        )
+    # the unused tensors are ignored by the kernel
+    x, y, z = tensors + tensors[:1] * (3 - len(tensors))
+
+    n_per_row = 2 ** len(tensors)
+    n_columns = int(np.prod([v.size for v in tensors]))
+    dtype = _index_dtype(max(npts * n_per_row, n_columns))
+    indptr = np.arange(0, npts * n_per_row + 1, n_per_row, dtype=dtype)
+    indices = np.empty(npts * n_per_row, dtype=dtype)
+    data = np.empty(npts * n_per_row, dtype=np.float64)
+    _map_chunks(
+        lambda start, stop: _interpolation_csr(
+            locs, x, y, z, indices, data, start, stop
+        ),
+        npts,
+        chunk_size,
+        n_threads,
+    )
+
+    Q = sp.csr_matrix((data, indices, indptr), shape=(npts, n_columns))
+    if min(v.size for v in tensors) == 1:
+        # a single node in a dimension gets two equal columns
+        Q.sum_duplicates()
     return Q
 
 
+def interpolate_values(
+    values, locs, x, y=None, z=None, n_threads=1, chunk_size=1048576
+):
+    """Linearly interpolate values on a tensor grid to locations.
+
+    Equivalent to ``interpolation_matrix(locs, x, y, z) @ values``, but the
+    interpolation weights of each location are applied as they are computed
+    by a compiled loop, so no matrix is built.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Values on the grid, ordered with x fastest, (n,) or (n, n_values).
+    locs : numpy.ndarray
+        Locations to interpolate to, (n_loc, dim).
+    x, y, z : numpy.ndarray
+        Tensors of the grid, `y` and `z` are ``None`` for 1D and 2D grids.
+    n_threads : int, optional
+        Number of threads interpolating chunks of locations.
+    chunk_size : int, optional
+        Number of locations per chunk.
+
+    Returns
+    -------
+    numpy.ndarray
+        The values at the locations, (n_loc,) or (n_loc, n_values).
+    """
+    tensors = [np.asarray(v, dtype=float) for v in (x, y, z) if v is not None]
+    locs = np.asarray(locs, dtype=float)
+    npts = locs.shape[0]
+    locs = locs.reshape((npts, -1))
+    values = np.asarray(values, dtype=np.float64)
+    if values.shape[0] != np.prod([v.size for v in tensors]):
+        raise ValueError(
+            "values must have a row for each of the {} grid locations".format(
+                np.prod([v.size for v in tensors])
+            )
+        )
+    x, y, z = tensors + tensors[:1] * (3 - len(tensors))
+
+    columns = values.reshape((values.shape[0], -1))
+    out = np.empty((npts, columns.shape[1]), dtype=np.float64)
+    _map_chunks(
+        lambda start, stop: _interpolate_values(
+            locs, x, y, z, columns, out, start, stop
+        ),
+        npts,
+        chunk_size,
+        n_threads,
+    )
+    return out.reshape((npts,) + values.shape[1:])
+
+
 def volume_average(mesh_in, mesh_out, values=None, output=None):
     """Volume averaging interpolation between meshes.
 
@@ -108,6 +176,8 @@ def volume_average(mesh_in, mesh_out, values=None, output=None):
     internally forming the matrix) and the returned value is the result of this.
     If ``output`` is given as well, it will be filled with the values of the
     operation and then returned (assuming it has the correct ``dtype``).
+    To transfer many models between the same two meshes, use a
+    :class:`VolumeAveragingPlan`, which finds the overlapping cells once.
 
     Parameters
     ----------
@@ -202,6 +272,128 @@ def volume_average(mesh_in, mesh_out, values=None, output=None):
         raise TypeError("Unsupported mesh types")
 
 
+class VolumeAveragingPlan(object):
+    """Volume averaging between two meshes, computed once and applied often.
+
+    The overlaps of the cells of the two meshes are found once, when the
+    plan is created, and kept as the sparse matrix of
+    :func:`volume_average`. The plan then transfers any number of models,
+    or matrices of models, between the meshes, and back with the adjoint
+    operation, with chunks of the output cells computed in parallel.
+
+    Parameters
+    ----------
+    mesh_in : TensorMesh or TreeMesh
+        Input mesh (the mesh you are interpolating from)
+    mesh_out : TensorMesh or TreeMesh
+        Output mesh (the mesh you are interpolating to)
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from discretize import TensorMesh
+    >>> from discretize.utils import VolumeAveragingPlan
+    >>> mesh_in = TensorMesh([np.ones(32), np.ones(32)])
+    >>> mesh_out = TensorMesh([2 * np.ones(16), 2 * np.ones(16)])
+    >>> plan = VolumeAveragingPlan(mesh_in, mesh_out)
+
+    Transfer ten models at once
+
+    >>> models = np.random.rand(mesh_in.nC, 10)
+    >>> plan.apply(models, n_threads=2).shape
+    (256, 10)
+    >>> plan.adjoint_matrix.shape
+    (1024, 256)
+    """
+
+    def __init__(self, mesh_in, mesh_out):
+        self.mesh_in = mesh_in
+        self.mesh_out = mesh_out
+        matrix = sp.csr_matrix(volume_average(mesh_in, mesh_out))
+        matrix.sum_duplicates()
+        self._matrix = matrix
+        self._adjoint_matrix = None
+
+    @property
+    def shape(self):
+        """Shape of the operator, (mesh_out.nC, mesh_in.nC)."""
+        return self._matrix.shape
+
+    @property
+    def matrix(self):
+        """The volume averaging operator.
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix
+            (mesh_out.nC, mesh_in.nC) matrix
+        """
+        return self._matrix
+
+    @property
+    def adjoint_matrix(self):
+        """The adjoint (transpose) of the volume averaging operator.
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix
+            (mesh_in.nC, mesh_out.nC) matrix, built on first use
+        """
+        if self._adjoint_matrix is None:
+            self._adjoint_matrix = self._matrix.T.tocsr()
+        return self._adjoint_matrix
+
+    def apply(self, values, output=None, n_threads=1, chunk_size=65536):
+        """Volume average values on the input mesh to the output mesh.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Values on the cells of ``mesh_in``, (mesh_in.nC,) or
+            (mesh_in.nC, n_models).
+        output : numpy.ndarray, optional
+            Array of ``np.float64`` to write the result to, of shape
+            (mesh_out.nC,) or (mesh_out.nC, n_models).
+        n_threads : int, optional
+            Number of threads computing chunks of output cells.
+        chunk_size : int, optional
+            Number of output cells per chunk.
+
+        Returns
+        -------
+        numpy.ndarray
+            The values on the cells of ``mesh_out``.
+        """
+        return _csr_matmat(self._matrix, values, output, n_threads, chunk_size)
+
+    def apply_adjoint(self, values, output=None, n_threads=1, chunk_size=65536):
+        """Apply the adjoint of the volume averaging to values on the output mesh.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Values on the cells of ``mesh_out``, (mesh_out.nC,) or
+            (mesh_out.nC, n_models).
+        output : numpy.ndarray, optional
+            Array of ``np.float64`` to write the result to, of shape
+            (mesh_in.nC,) or (mesh_in.nC, n_models).
+        n_threads : int, optional
+            Number of threads computing chunks of input cells.
+        chunk_size : int, optional
+            Number of input cells per chunk.
+
+        Returns
+        -------
+        numpy.ndarray
+            The values on the cells of ``mesh_in``.
+        """
+        return _csr_matmat(
+            self.adjoint_matrix, values, output, n_threads, chunk_size
+        )
+
+    __call__ = apply
+
+
 interpmat = deprecate_function(
     interpolation_matrix, "interpmat", removal_version="1.0.0"
 )
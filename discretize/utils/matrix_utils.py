@@ -2,6 +2,21 @@ import numpy as np
 import scipy.sparse as sp
 from discretize.utils.code_utils import is_scalar, deprecate_function
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from discretize._extensions import matutils_cython as pyx
+
+    _inverse_symmetric_kernels = {
+        3: pyx._inverse_symmetric_2x2,
+        6: pyx._inverse_symmetric_3x3,
+    }
+    _csr_matmat_kernel = pyx._csr_matmat
+except ImportError:
+    # the numpy kernels below are used instead, the missing extension is
+    # reported by discretize.utils.interpolation_utils
+    _inverse_symmetric_kernels = {}
+    _csr_matmat_kernel = None
 
 
 def mkvc(x, n_dims=1, **kwargs):
@@ -48,12 +63,44 @@ def mkvc(x, n_dims=1, **kwargs):
         return x.flatten(order="F")[:, np.newaxis, np.newaxis]
 
 
-def sdiag(h):
-    """Sparse diagonal matrix"""
+def _index_dtype(maxval):
+    """The index dtype scipy uses for sparse matrices up to `maxval`, building
+    the index arrays with it spares scipy a conversion copy."""
+    return np.int32 if maxval <= np.iinfo(np.int32).max else np.int64
+
+
+def _compressed_matrix(shape, arrays, format="csr"):
+    """Wrap CSR (data, indices, indptr) arrays as a sparse matrix.
+
+    ``arrays(transpose)`` returns the CSR arrays of the matrix, or of its
+    transpose (which are the CSC arrays of the matrix) when `transpose` is
+    ``True``. Other formats are converted from CSR.
+    """
+    if format == "csc":
+        return sp.csc_matrix(arrays(True), shape=shape)
+    A = sp.csr_matrix(arrays(False), shape=shape)
+    if format is None or format == "csr":
+        return A
+    return A.asformat(format)
+
+
+def sdiag(h, format="csr"):
+    """Sparse diagonal matrix
+
+    Parameters
+    ----------
+    h : numpy.ndarray
+        The diagonal.
+    format : str, optional
+        Sparse format of the matrix, CSR and CSC are built directly.
+    """
     if isinstance(h, Zero):
         return Zero()
 
-    return sp.spdiags(mkvc(h), 0, h.size, h.size, format="csr")
+    h = mkvc(h)
+    n = h.size
+    index = np.arange(n + 1, dtype=_index_dtype(n))
+    return _compressed_matrix((n, n), lambda transpose: (h, index[:-1], index), format)
 
 
 def sdinv(M):
@@ -61,14 +108,123 @@ def sdinv(M):
     return sdiag(1.0 / M.diagonal())
 
 
-def speye(n):
+def speye(n, format="csr"):
     """Sparse identity"""
-    return sp.identity(n, format="csr")
+    return sdiag(np.ones(n), format=format)
+
+
+def _row_blocks(A):
+    """The entries of a CSR matrix as (n_rows, k) blocks.
+
+    Rows with fewer than k entries are padded with zeros, `valid` then flags
+    the actual entries (it is ``None`` when no row is padded).
+    """
+    n = np.diff(A.indptr)
+    k = n.max(initial=0)
+    if (n == k).all():
+        shape = (A.shape[0], k)
+        return A.data.reshape(shape), A.indices.reshape(shape), None
+    valid = np.arange(k) < n[:, None]
+    data = np.zeros(valid.shape, dtype=A.data.dtype)
+    indices = np.zeros(valid.shape, dtype=A.indices.dtype)
+    data[valid] = A.data
+    indices[valid] = A.indices
+    return data, indices, valid
+
+
+def _kron_csr(A, B):
+    """CSR arrays of the Kronecker product of two canonical CSR matrices."""
+    # row i * B.shape[0] + k holds every entry of row i of A times every
+    # entry of row k of B, in the column order of A then B, so the product
+    # is a broadcast of the row blocks of A and B
+    dtype = _index_dtype(max(A.nnz * B.nnz, A.shape[1] * B.shape[1]))
+    n_a = np.diff(A.indptr)
+    if (n_a == 1).all():
+        # diagonal like A (identities...): every row of A scales all of B
+        data = np.multiply.outer(A.data, B.data).reshape(-1)
+        indices = (
+            A.indices.astype(dtype)[:, None] * B.shape[1] + B.indices
+        ).reshape(-1)
+        indptr = np.empty(A.shape[0] * B.shape[0] + 1, dtype=dtype)
+        starts = indptr[:-1].reshape(A.shape[0], B.shape[0])
+        np.add.outer(np.arange(A.shape[0]) * B.nnz, B.indptr[:-1], out=starts)
+        indptr[-1] = A.shape[0] * B.nnz
+        return data, indices, indptr
+
+    a_data, a_indices, a_valid = _row_blocks(A)
+    b_data, b_indices, b_valid = _row_blocks(B)
+    a_shape = (A.shape[0], 1, a_data.shape[1], 1)
+    b_shape = (1, B.shape[0], 1, b_data.shape[1])
+    shape = (A.shape[0], B.shape[0], a_data.shape[1], b_data.shape[1])
+
+    data = np.empty(shape, dtype=np.result_type(a_data, b_data))
+    indices = np.empty(shape, dtype=dtype)
+    b_indices = b_indices.astype(dtype)
+    # one entry of the rows of A at a time keeps the contiguous rows of B as
+    # the inner loop of the broadcasts
+    for j in range(shape[2]):
+        np.multiply(a_data[:, None, j, None], b_data, out=data[:, :, j])
+        np.multiply(a_indices[:, None, j, None], B.shape[1], out=indices[:, :, j])
+        indices[:, :, j] += b_indices
+    data = data.reshape(-1)
+    indices = indices.reshape(-1)
+    if a_valid is not None or b_valid is not None:
+        # drop the products of padding
+        if a_valid is None:
+            a_valid = np.ones(a_data.shape, dtype=bool)
+        if b_valid is None:
+            b_valid = np.ones(b_data.shape, dtype=bool)
+        valid = (a_valid.reshape(a_shape) & b_valid.reshape(b_shape)).reshape(-1)
+        data = data[valid]
+        indices = indices[valid]
+
+    counts = np.outer(n_a, np.diff(B.indptr)).ravel()
+    indptr = np.zeros(counts.size + 1, dtype=dtype)
+    np.cumsum(counts, out=indptr[1:])
+    return data, indices, indptr
+
+
+def kron(A, B, format="csr"):
+    """Kronecker product of two sparse matrices
+
+    Builds the arrays of the CSR or CSC format directly instead of going
+    through the COO format like :func:`scipy.sparse.kron`.
+
+    Parameters
+    ----------
+    A, B : scipy.sparse.spmatrix or numpy.ndarray
+        The factors.
+    format : str, optional
+        Sparse format of the product, CSR and CSC are built directly.
+
+    Returns
+    -------
+    scipy.sparse.spmatrix
+    """
+    A = sp.csr_matrix(A)
+    B = sp.csr_matrix(B)
+    shape = (A.shape[0] * B.shape[0], A.shape[1] * B.shape[1])
 
+    def arrays(transpose):
+        if transpose:
+            return _kron_csr(_canonical_csr(A.T), _canonical_csr(B.T))
+        return _kron_csr(_canonical_csr(A), _canonical_csr(B))
 
-def kron3(A, B, C):
+    return _compressed_matrix(shape, arrays, format)
+
+
+def _canonical_csr(A):
+    """A CSR matrix without duplicate entries and with sorted indices."""
+    A = A.tocsr()
+    if not A.has_canonical_format:
+        A = A.copy()
+        A.sum_duplicates()
+    return A
+
+
+def kron3(A, B, C, format="csr"):
     """Three kron prods"""
-    return sp.kron(sp.kron(A, B), C, format="csr")
+    return kron(A, kron(B, C), format=format)
 
 
 def spzeros(n1, n2):
@@ -76,24 +232,48 @@ def spzeros(n1, n2):
     return sp.dia_matrix((n1, n2))
 
 
-def ddx(n):
+def _two_band(n, lower, upper, transpose):
+    """CSR arrays of the (n, n + 1) matrix with `lower` at (i, i) and `upper`
+    at (i, i + 1), or of its (n + 1, n) transpose."""
+    index = np.arange(-1, 2 * n + 1, dtype=_index_dtype(2 * n))
+    if not transpose:
+        indptr = index[1::2]
+        indices = np.c_[index[1 : n + 1], index[2 : n + 2]].ravel()
+        data = np.tile(np.array([lower, upper], dtype=float), n)
+    else:
+        # row j holds upper at j - 1 and lower at j, the first and last rows
+        # only hold one of them
+        indptr = np.r_[index[1], index[2 : 2 * n + 1 : 2], index[-1]]
+        indices = np.c_[index[: n + 1], index[1 : n + 2]].ravel()[1:-1]
+        data = np.tile(np.array([upper, lower], dtype=float), n + 1)[1:-1]
+    return data, indices, indptr
+
+
+def ddx(n, format="csr"):
     """Define 1D derivatives, inner, this means we go from n+1 to n"""
-    return sp.spdiags((np.ones((n + 1, 1)) * [-1, 1]).T, [0, 1], n, n + 1, format="csr")
+    return _compressed_matrix(
+        (n, n + 1), lambda transpose: _two_band(n, -1.0, 1.0, transpose), format
+    )
 
 
-def av(n):
+def av(n, format="csr"):
     """Define 1D averaging operator from nodes to cell-centers."""
-    return sp.spdiags(
-        (0.5 * np.ones((n + 1, 1)) * [1, 1]).T, [0, 1], n, n + 1, format="csr"
+    return _compressed_matrix(
+        (n, n + 1), lambda transpose: _two_band(n, 0.5, 0.5, transpose), format
     )
 
 
-def av_extrap(n):
+def av_extrap(n, format="csr"):
     """Define 1D averaging operator from cell-centers to nodes."""
-    Av = sp.spdiags(
-        (0.5 * np.ones((n, 1)) * [1, 1]).T, [-1, 0], n + 1, n, format="csr"
-    ) + sp.csr_matrix(([0.5, 0.5], ([0, n], [0, n - 1])), shape=(n + 1, n))
-    return Av
+
+    def arrays(transpose):
+        # the transpose of the averaging operator, with the nodes at the
+        # ends taking the value of their only cell
+        data, indices, indptr = _two_band(n, 0.5, 0.5, not transpose)
+        data[[0, -1]] = 1.0
+        return data, indices, indptr
+
+    return _compressed_matrix((n + 1, n), arrays, format)
 
 
 def ndgrid(*args, **kwargs):
@@ -251,12 +431,8 @@ def inverse_3x3_block_diagonal(
     if not return_matrix:
         return b11, b12, b13, b21, b22, b23, b31, b32, b33
 
-    return sp.vstack(
-        (
-            sp.hstack((sdiag(b11), sdiag(b12), sdiag(b13))),
-            sp.hstack((sdiag(b21), sdiag(b22), sdiag(b23))),
-            sp.hstack((sdiag(b31), sdiag(b32), sdiag(b33))),
-        )
+    return _block_diagonal_matrix(
+        [[b11, b12, b13], [b21, b22, b23], [b31, b32, b33]]
     )
 
 
@@ -297,14 +473,170 @@ def inverse_2x2_block_diagonal(a11, a12, a21, a22, return_matrix=True, **kwargs)
     if not return_matrix:
         return b11, b12, b21, b22
 
-    return sp.vstack(
-        (sp.hstack((sdiag(b11), sdiag(b12))), sp.hstack((sdiag(b21), sdiag(b22))))
+    return _block_diagonal_matrix([[b11, b12], [b21, b22]])
+
+
+def _block_diagonal_matrix(blocks):
+    """Assemble the CSR matrix made of k x k blocks of diagonal matrices.
+
+    Equivalent to ``sp.bmat`` of ``sdiag`` of each block, but builds the
+    arrays of the CSR format directly instead of stacking sparse matrices.
+    """
+    k = len(blocks)
+    n = len(blocks[0][0])
+    # row i * n + c of block row i holds the entries of cell c of each block
+    data = np.stack([np.column_stack(row) for row in blocks]).reshape(-1)
+    indices = np.broadcast_to(
+        np.arange(n)[:, None] + n * np.arange(k), (k, n, k)
+    ).reshape(-1)
+    indptr = np.arange(0, k * k * n + 1, k)
+    return sp.csr_matrix((data, indices, indptr), shape=(k * n, k * n))
+
+
+_packed_blocks = {3: [[0, 2], [2, 1]], 6: [[0, 3, 4], [3, 1, 5], [4, 5, 2]]}
+
+
+def _inverse_symmetric_numpy(A, B, start, stop):
+    """Numpy version of the compiled packed symmetric inverse kernels."""
+    A = A[start:stop]
+    if A.shape[1] == 3:
+        a11, a22, a12 = A.T
+        det = a11 * a22 - a12 * a12
+        inv = np.column_stack((a22, a11, -a12))
+    else:
+        a11, a22, a33, a12, a13, a23 = A.T
+        inv = np.column_stack(
+            (
+                a22 * a33 - a23 * a23,
+                a11 * a33 - a13 * a13,
+                a11 * a22 - a12 * a12,
+                a13 * a23 - a12 * a33,
+                a12 * a23 - a13 * a22,
+                a12 * a13 - a11 * a23,
+            )
+        )
+        det = a11 * inv[:, 0] + a12 * inv[:, 3] + a13 * inv[:, 4]
+    inv /= det[:, None]
+    B[start:stop] = inv
+
+
+def inverse_packed_tensor(tensor, out=None, n_threads=1, chunk_size=65536):
+    """Invert a stack of packed symmetric 2x2 or 3x3 tensors.
+
+    Each row of `tensor` holds the independent entries of one symmetric
+    tensor, ``[a11, a22, a12]`` in 2D or ``[a11, a22, a33, a12, a13, a23]``
+    in 3D, which is the column order of fully anisotropic property models.
+    The rows are inverted chunk by chunk by a compiled kernel, without the
+    full length temporaries of :func:`inverse_2x2_block_diagonal` and
+    :func:`inverse_3x3_block_diagonal`, optionally over several threads.
+
+    Parameters
+    ----------
+    tensor : (n, 3) or (n, 6) numpy.ndarray
+        The packed tensors.
+    out : (n, 3) or (n, 6) numpy.ndarray, optional
+        Array receiving the inverses, which may be `tensor` itself to invert
+        in place. By default a new array with the layout of `tensor`.
+    n_threads : int, optional
+        Number of threads inverting chunks concurrently.
+    chunk_size : int, optional
+        Number of tensors inverted per chunk.
+
+    Returns
+    -------
+    numpy.ndarray
+        `out`, the packed inverse tensors.
+
+    Examples
+    --------
+    >>> from discretize.utils import inverse_packed_tensor
+    >>> import numpy as np
+    >>> inverse_packed_tensor(np.array([[2.0, 4.0, 0.0], [2.0, 1.0, 1.0]]))
+    array([[ 0.5 ,  0.25, -0.  ],
+           [ 1.  ,  2.  , -1.  ]])
+    """
+    tensor = np.asarray(tensor)
+    if tensor.ndim != 2 or tensor.shape[1] not in _packed_blocks:
+        raise ValueError(
+            "tensor must be an (n, 3) or (n, 6) array, not {}".format(tensor.shape)
+        )
+    if out is None:
+        out = np.empty_like(tensor, dtype=np.result_type(tensor.dtype, np.float32))
+    elif out.shape != tensor.shape:
+        raise ValueError(
+            "out must have the shape {} of tensor, not {}".format(
+                tensor.shape, out.shape
+            )
+        )
+    kernel = _inverse_symmetric_kernels.get(tensor.shape[1])
+    if kernel is None or tensor.dtype != np.float64 or out.dtype != np.float64:
+        kernel = _inverse_symmetric_numpy
+
+    _map_chunks(
+        lambda start, stop: kernel(tensor, out, start, stop),
+        tensor.shape[0],
+        chunk_size,
+        n_threads,
     )
+    return out
+
+
+def _map_chunks(func, n, chunk_size, n_threads=1):
+    """Call ``func(start, stop)`` on the chunks of ``range(n)``.
+
+    The chunks are spread over `n_threads` threads, which only pays off for
+    functions releasing the GIL (like the compiled kernels).
+    """
+    chunk_size = max(int(chunk_size), 1)
+    chunks = [(i, min(i + chunk_size, n)) for i in range(0, n, chunk_size)]
+    if n_threads > 1 and len(chunks) > 1:
+        with ThreadPoolExecutor(n_threads) as pool:
+            list(pool.map(lambda chunk: func(*chunk), chunks))
+    else:
+        for chunk in chunks:
+            func(*chunk)
+
+
+def _csr_matmat(A, x, out=None, n_threads=1, chunk_size=65536):
+    """Product of a CSR matrix with a (n,) or (n, k) array.
+
+    Chunks of rows are computed by `n_threads` threads (the compiled kernel
+    releases the GIL), into `out` when it is given.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if x.shape[0] != A.shape[1]:
+        raise ValueError(
+            "values must have {} rows, not {}".format(A.shape[1], x.shape[0])
+        )
+    shape = (A.shape[0],) + x.shape[1:]
+    if out is None:
+        out = np.empty(shape, dtype=np.float64)
+    elif out.shape != shape:
+        raise ValueError("out must have shape {}, not {}".format(shape, out.shape))
+    x2 = x.reshape(x.shape[0], -1)
+    out2 = out.reshape(shape[0], -1)
+
+    if _csr_matmat_kernel is None or out.dtype != np.float64:
+
+        def kernel(start, stop):
+            out2[start:stop] = A[start:stop] @ x2
+
+    else:
+        data = np.asarray(A.data, dtype=np.float64)
+
+        def kernel(start, stop):
+            _csr_matmat_kernel(A.indptr, A.indices, data, x2, out2, start, stop)
+
+    _map_chunks(kernel, A.shape[0], chunk_size, n_threads)
+    return out
 
 
 class TensorType(object):
     def __init__(self, M, tensor):
-        if tensor is None:  # default is ones
+        if isinstance(tensor, PropertyModel):  # already classified
+            self._tt = tensor.tensor_type._tt
+            self._tts = tensor.tensor_type._tts
+        elif tensor is None:  # default is ones
             self._tt = -1
             self._tts = "none"
         elif is_scalar(tensor):
@@ -345,35 +677,117 @@ class TensorType(object):
         return self._tt > v
 
 
+class PropertyModel(object):
+    """A material property model classified once for a mesh.
+
+    The inner product methods of the meshes, :func:`make_property_tensor` and
+    :func:`inverse_property_tensor` all accept a property model in place of
+    the model array. The :class:`TensorType` of the model, its contiguous
+    packed values and its inverse are then computed once and reused by every
+    call, e.g. by all of the inner products built at one iteration of an
+    inversion.
+
+    Parameters
+    ----------
+    mesh : discretize.base.BaseMesh
+        The mesh the model is defined on.
+    model : None or float or numpy.ndarray
+        Material property at the cell centers, a scalar or an array of 1,
+        ``dim`` or ``3 * (dim - 1)`` values per cell. ``None`` is a unit
+        property.
+
+    Examples
+    --------
+    >>> import discretize
+    >>> import numpy as np
+    >>> mesh = discretize.TensorMesh([4, 4])
+    >>> sigma = discretize.utils.PropertyModel(mesh, np.ones((mesh.nC, 3)) * [2, 2, 1])
+    >>> sigma
+    PropertyModel(TensorType[3]: tensor, n_cells=16)
+    >>> Mf = mesh.get_face_inner_product(sigma)
+    >>> Mf_inv = mesh.get_face_inner_product(sigma, invert_model=True)
+    """
+
+    def __init__(self, mesh, model):
+        if isinstance(model, PropertyModel):
+            model = model.values
+        self.mesh = mesh
+        self.tensor_type = TensorType(mesh, model)
+        if model is None or is_scalar(model):
+            self.values = model
+        elif model.ndim == 1:
+            self.values = np.ascontiguousarray(model)
+        else:
+            self.values = mkvc(model)
+        self._inverse = None
+
+    @property
+    def packed(self):
+        """The values as an (n_cells, n_components) Fortran ordered view.
+
+        Returns
+        -------
+        None or float or numpy.ndarray
+        """
+        if self.values is None or is_scalar(self.values):
+            return self.values
+        return self.values.reshape((self.mesh.nC, -1), order="F")
+
+    @property
+    def inverse(self):
+        """The inverse property model, computed on first access.
+
+        Returns
+        -------
+        PropertyModel
+        """
+        if self.values is None:  # the unit property
+            return self
+        if self._inverse is None:
+            inverse = PropertyModel(
+                self.mesh, inverse_property_tensor(self.mesh, self.values)
+            )
+            inverse._inverse = self
+            self._inverse = inverse
+        return self._inverse
+
+    def __repr__(self):
+        return "PropertyModel({}, n_cells={})".format(self.tensor_type, self.mesh.nC)
+
+
+def _as_property_model(mesh, model):
+    """Wrap a model as a PropertyModel unless it already is one."""
+    if isinstance(model, PropertyModel):
+        return model
+    return PropertyModel(mesh, model)
+
+
 def make_property_tensor(M, tensor):
+    propType = None
+    if isinstance(tensor, PropertyModel):
+        if tensor.tensor_type > 0:
+            propType = tensor.tensor_type
+        tensor = tensor.values
+
     if tensor is None:  # default is ones
         tensor = np.ones(M.nC)
 
     if is_scalar(tensor):
         tensor = tensor * np.ones(M.nC)
 
-    propType = TensorType(M, tensor)
+    if propType is None:
+        propType = TensorType(M, tensor)
     if propType == 1:  # Isotropic!
-        Sigma = sp.kron(sp.identity(M.dim), sdiag(mkvc(tensor)))
+        Sigma = sdiag(np.tile(mkvc(tensor), M.dim))
     elif propType == 2:  # Diagonal tensor
         Sigma = sdiag(mkvc(tensor))
-    elif M.dim == 2 and tensor.size == M.nC * 3:  # Fully anisotropic, 2D
-        tensor = tensor.reshape((M.nC, 3), order="F")
-        row1 = sp.hstack((sdiag(tensor[:, 0]), sdiag(tensor[:, 2])))
-        row2 = sp.hstack((sdiag(tensor[:, 2]), sdiag(tensor[:, 1])))
-        Sigma = sp.vstack((row1, row2))
-    elif M.dim == 3 and tensor.size == M.nC * 6:  # Fully anisotropic, 3D
-        tensor = tensor.reshape((M.nC, 6), order="F")
-        row1 = sp.hstack(
-            (sdiag(tensor[:, 0]), sdiag(tensor[:, 3]), sdiag(tensor[:, 4]))
-        )
-        row2 = sp.hstack(
-            (sdiag(tensor[:, 3]), sdiag(tensor[:, 1]), sdiag(tensor[:, 5]))
-        )
-        row3 = sp.hstack(
-            (sdiag(tensor[:, 4]), sdiag(tensor[:, 5]), sdiag(tensor[:, 2]))
+    elif (M.dim == 2 and tensor.size == M.nC * 3) or (
+        M.dim == 3 and tensor.size == M.nC * 6
+    ):  # Fully anisotropic
+        tensor = tensor.reshape((M.nC, -1), order="F")
+        Sigma = _block_diagonal_matrix(
+            [[tensor[:, j] for j in row] for row in _packed_blocks[tensor.shape[1]]]
         )
-        Sigma = sp.vstack((row1, row2, row3))
     else:
         raise Exception("Unexpected shape of tensor")
 
@@ -389,35 +803,23 @@ def inverse_property_tensor(M, tensor, return_matrix=False, **kwargs):
         )
         return_matrix = kwargs["returnMatrix"]
 
+    if isinstance(tensor, PropertyModel):
+        if return_matrix:
+            return make_property_tensor(M, tensor.inverse)
+        return tensor.inverse.values
+
     propType = TensorType(M, tensor)
 
     if is_scalar(tensor):
         T = 1.0 / tensor
     elif propType < 3:  # Isotropic or Diagonal
         T = 1.0 / mkvc(tensor)  # ensure it is a vector.
-    elif M.dim == 2 and tensor.size == M.nC * 3:  # Fully anisotropic, 2D
-        tensor = tensor.reshape((M.nC, 3), order="F")
-        B = inverse_2x2_block_diagonal(
-            tensor[:, 0], tensor[:, 2], tensor[:, 2], tensor[:, 1], return_matrix=False
-        )
-        b11, b12, b21, b22 = B
-        T = np.r_[b11, b22, b12]
-    elif M.dim == 3 and tensor.size == M.nC * 6:  # Fully anisotropic, 3D
-        tensor = tensor.reshape((M.nC, 6), order="F")
-        B = inverse_3x3_block_diagonal(
-            tensor[:, 0],
-            tensor[:, 3],
-            tensor[:, 4],
-            tensor[:, 3],
-            tensor[:, 1],
-            tensor[:, 5],
-            tensor[:, 4],
-            tensor[:, 5],
-            tensor[:, 2],
-            return_matrix=False,
-        )
-        b11, b12, b13, b21, b22, b23, b31, b32, b33 = B
-        T = np.r_[b11, b22, b33, b12, b13, b23]
+    elif (M.dim == 2 and tensor.size == M.nC * 3) or (
+        M.dim == 3 and tensor.size == M.nC * 6
+    ):  # Fully anisotropic
+        # inverting the Fortran ordered packed tensor keeps T a flat view
+        T = inverse_packed_tensor(tensor.reshape((M.nC, -1), order="F"))
+        T = T.reshape(-1, order="F")
     else:
         raise Exception("Unexpected shape of tensor")
 
@@ -427,6 +829,444 @@ def inverse_property_tensor(M, tensor, return_matrix=False, **kwargs):
     return T
 
 
+_precision_dtypes = {"double": np.float64, "single": np.float32}
+
+
+def cast_to_precision(value, precision="double"):
+    """Cast a floating point array or sparse matrix to a given precision.
+
+    Single precision sparse matrices are returned in CSR (or CSC) format
+    with 32 bit indices when their size allows it. Integer, boolean and
+    complex arrays, and any other objects, are returned unchanged.
+
+    Parameters
+    ----------
+    value : numpy.ndarray or scipy.sparse.spmatrix
+        The object to cast
+
+    precision : {'double', 'single'}
+        The target precision
+
+    Returns
+    -------
+    numpy.ndarray or scipy.sparse.spmatrix
+        ``value`` in the requested precision. No copy is made if it is
+        already in that precision.
+    """
+    if precision not in _precision_dtypes:
+        raise ValueError(
+            "precision must be one of {}, not {}".format(
+                list(_precision_dtypes.keys()), precision
+            )
+        )
+    dtype = _precision_dtypes[precision]
+    if sp.issparse(value):
+        if value.dtype.kind != "f":
+            return value
+        single_index = (
+            precision == "single"
+            and max(value.shape + (value.nnz,)) < np.iinfo(np.int32).max
+        )
+        if value.dtype == dtype and (
+            not single_index
+            or (value.format in ("csr", "csc") and value.indices.dtype == np.int32)
+        ):
+            return value
+        if value.format not in ("csr", "csc"):
+            value = value.tocsr()
+        value = value.astype(dtype)
+        if single_index:
+            value.indices = value.indices.astype(np.int32, copy=False)
+            value.indptr = value.indptr.astype(np.int32, copy=False)
+        return value
+    if isinstance(value, np.ndarray) and value.dtype.kind == "f":
+        return value.astype(dtype, copy=False)
+    return value
+
+
+class LazyOperator(object):
+    """Base class of the lazily applied operators.
+
+    A lazy operator represents a matrix by the pieces it is built from
+    (diagonals, Kronecker factors, products or blocks of matrices) instead of
+    forming it. Products with a vector (n,) or a block of vectors (n, k) are
+    applied piece by piece, products with other operators or sparse matrices
+    stay lazy, and the matrix is only formed on request, by ``tocsr``.
+    Every lazy operator also has a (lazy) transpose ``T``.
+
+    Examples
+    --------
+
+    .. code:: python
+
+        # diag(1/V) * D * diag(S), applied without forming the products
+        A = DiagonalOperator(1.0 / V) * D * DiagonalOperator(S)
+        A * x
+        A.T * y
+        A.tocsr()
+    """
+
+    __numpy_ufunc__ = True
+    __array_ufunc__ = None
+
+    @property
+    def ndim(self):
+        return 2
+
+    def transpose(self):
+        return self.T
+
+    def diagonal(self):
+        """Diagonal of the represented matrix"""
+        return self.tocsr().diagonal()
+
+    def dot(self, x):
+        """Apply the operator to a vector (n,) or a block of vectors (n, k)"""
+        x = np.asarray(x)
+        if x.shape[0] != self.shape[1]:
+            raise ValueError(
+                "Dimension mismatch, {} and {}".format(self.shape, x.shape)
+            )
+        out = self._dot(x.reshape(x.shape[0], -1))
+        return out.reshape((self.shape[0],) + x.shape[1:])
+
+    def _scale(self, v):
+        return ComposedOperator(self, coefficient=v)
+
+    def __mul__(self, v):
+        if is_scalar(v):
+            return self._scale(v)
+        if isinstance(v, (Zero, Identity)):
+            return v * self
+        if isinstance(v, LazyOperator) or sp.issparse(v):
+            return ComposedOperator(self, v)
+        return self.dot(v)
+
+    def __rmul__(self, v):
+        if is_scalar(v):
+            return self._scale(v)
+        if isinstance(v, (Zero, Identity)):
+            return v * self
+        return ComposedOperator(v, self)
+
+    __matmul__ = __mul__
+
+    def __rmatmul__(self, v):
+        if is_scalar(v):
+            raise ValueError("Scalar operands are not allowed, use '*' instead")
+        return self.__rmul__(v)
+
+    def __neg__(self):
+        return self._scale(-1.0)
+
+    def __repr__(self):
+        return "<{} with shape {}>".format(type(self).__name__, self.shape)
+
+
+def _to_csr(A):
+    """Materialize a lazy operator, sparse or dense matrix as csr."""
+    if isinstance(A, LazyOperator):
+        return A.tocsr()
+    return sp.csr_matrix(A)
+
+
+class KroneckerProduct(LazyOperator):
+    """A Kronecker product of matrices that is stored by its factors.
+
+    ``KroneckerProduct(A, B, C)`` represents the same matrix as
+    ``kron3(A, B, C)``, but only ever stores the (small) factors. Products
+    with vectors are applied factor by factor on the reshaped vector,
+    transposes are taken factor-wise and the product of two Kronecker
+    products with matching factors stays factored. This makes it possible
+    to represent tensor mesh operators, which are Kronecker products of 1D
+    operators, in O(n) storage.
+
+    Parameters
+    ----------
+    factors : scipy.sparse.spmatrix or numpy.ndarray
+        The factors, in the order they are passed to ``kron3`` (i.e. the
+        factor acting on the fastest varying index last).
+
+    coefficient : float, optional
+        A scalar multiplying the product.
+
+    Examples
+    --------
+
+    .. code:: python
+
+        K = KroneckerProduct(speye(nz), speye(ny), ddx(nx))
+        K * x  # == kron3(speye(nz), speye(ny), ddx(nx)) * x
+        K.tocsr()
+    """
+
+    def __init__(self, *factors, coefficient=1.0):
+        if len(factors) == 0:
+            raise ValueError("KroneckerProduct needs at least one factor")
+        self.factors = tuple(
+            f if sp.issparse(f) else np.atleast_2d(np.asarray(f)) for f in factors
+        )
+        self.coefficient = coefficient
+
+    @property
+    def shape(self):
+        """Shape of the represented matrix"""
+        return (
+            int(np.prod([f.shape[0] for f in self.factors])),
+            int(np.prod([f.shape[1] for f in self.factors])),
+        )
+
+    @property
+    def T(self):
+        """The transpose, taken factor-wise"""
+        return KroneckerProduct(
+            *[f.T for f in self.factors], coefficient=self.coefficient
+        )
+
+    def tocsr(self):
+        """Materialize the represented matrix as a scipy.sparse.csr_matrix"""
+        A = sp.csr_matrix(self.factors[0])
+        for f in self.factors[1:]:
+            A = sp.kron(A, f, format="csr")
+        return self.coefficient * A
+
+    def diagonal(self):
+        """Diagonal of the represented matrix"""
+        d = np.ones(1)
+        for f in self.factors:
+            d = np.kron(d, f.diagonal())
+        return self.coefficient * d
+
+    def _dot(self, x):
+        # the first factor acts on the slowest varying index, so the
+        # C-ordered reshape puts factor i on axis i
+        X = x.reshape([f.shape[1] for f in self.factors] + [-1])
+        for i, f in enumerate(self.factors):
+            X = np.moveaxis(X, i, 0)
+            shape = X.shape
+            X = (f @ X.reshape(shape[0], -1)).reshape((f.shape[0],) + shape[1:])
+            X = np.moveaxis(X, 0, i)
+        return self.coefficient * X.reshape(self.shape[0], -1)
+
+    def _scale(self, v):
+        return KroneckerProduct(*self.factors, coefficient=self.coefficient * v)
+
+    def __mul__(self, v):
+        if isinstance(v, KroneckerProduct):
+            if len(v.factors) == len(self.factors) and all(
+                a.shape[1] == b.shape[0] for a, b in zip(self.factors, v.factors)
+            ):
+                return KroneckerProduct(
+                    *[a @ b for a, b in zip(self.factors, v.factors)],
+                    coefficient=self.coefficient * v.coefficient,
+                )
+            return self.tocsr() * v.tocsr()
+        if sp.issparse(v):
+            return self.tocsr() * v
+        return super().__mul__(v)
+
+    def __rmul__(self, v):
+        if is_scalar(v) or isinstance(v, (Zero, Identity)):
+            return super().__rmul__(v)
+        return v * self.tocsr()
+
+    __matmul__ = __mul__
+
+    def __repr__(self):
+        return "<KroneckerProduct of {} factors with shape {}>".format(
+            len(self.factors), self.shape
+        )
+
+
+class DiagonalOperator(LazyOperator):
+    """A diagonal matrix stored by its diagonal.
+
+    The lazy counterpart of ``sdiag(d)``: it is applied with a broadcast
+    multiplication and products of diagonal operators stay diagonal.
+
+    Parameters
+    ----------
+    d : numpy.ndarray
+        The diagonal, (n,)
+    """
+
+    def __init__(self, d):
+        self.d = mkvc(np.asarray(d))
+
+    @property
+    def shape(self):
+        """Shape of the represented matrix"""
+        return (len(self.d), len(self.d))
+
+    @property
+    def T(self):
+        """The transpose, the operator itself"""
+        return self
+
+    def tocsr(self):
+        """Materialize the represented matrix as a scipy.sparse.csr_matrix"""
+        return sp.csr_matrix(sdiag(self.d))
+
+    def diagonal(self):
+        """Diagonal of the represented matrix"""
+        return self.d
+
+    def _dot(self, x):
+        return self.d[:, None] * x
+
+    def _scale(self, v):
+        return DiagonalOperator(v * self.d)
+
+    def __mul__(self, v):
+        if isinstance(v, DiagonalOperator):
+            return DiagonalOperator(self.d * v.d)
+        return super().__mul__(v)
+
+
+class ComposedOperator(LazyOperator):
+    """The product of a chain of operators, applied right to left.
+
+    Nested products are flattened and adjacent diagonal operators are
+    merged, so ``A * x`` costs one application of each factor and no
+    intermediate matrix product is ever formed.
+
+    Parameters
+    ----------
+    operators : LazyOperator or scipy.sparse.spmatrix or numpy.ndarray
+        The factors, in the order they are written in the product.
+
+    coefficient : float, optional
+        A scalar multiplying the product.
+    """
+
+    def __init__(self, *operators, coefficient=1.0):
+        if len(operators) == 0:
+            raise ValueError("ComposedOperator needs at least one operator")
+        flat = []
+        for op in operators:
+            if isinstance(op, ComposedOperator):
+                coefficient = coefficient * op.coefficient
+                ops = op.operators
+            else:
+                if not (isinstance(op, LazyOperator) or sp.issparse(op)):
+                    op = np.atleast_2d(np.asarray(op))
+                ops = [op]
+            for op in ops:
+                if flat and flat[-1].shape[1] != op.shape[0]:
+                    raise ValueError(
+                        "Dimension mismatch, {} and {}".format(
+                            flat[-1].shape, op.shape
+                        )
+                    )
+                if (
+                    flat
+                    and isinstance(op, DiagonalOperator)
+                    and isinstance(flat[-1], DiagonalOperator)
+                ):
+                    flat[-1] = flat[-1] * op
+                else:
+                    flat.append(op)
+        self.operators = tuple(flat)
+        self.coefficient = coefficient
+
+    @property
+    def shape(self):
+        """Shape of the represented matrix"""
+        return (self.operators[0].shape[0], self.operators[-1].shape[1])
+
+    @property
+    def T(self):
+        """The transpose, the reversed product of the transposes"""
+        return ComposedOperator(
+            *[op.T for op in self.operators[::-1]], coefficient=self.coefficient
+        )
+
+    def tocsr(self):
+        """Materialize the represented matrix as a scipy.sparse.csr_matrix"""
+        A = _to_csr(self.operators[-1])
+        for op in self.operators[-2::-1]:
+            A = _to_csr(op) @ A
+        return sp.csr_matrix(self.coefficient * A)
+
+    def _dot(self, x):
+        for op in self.operators[::-1]:
+            x = op @ x
+        return self.coefficient * np.asarray(x)
+
+    def _scale(self, v):
+        return ComposedOperator(*self.operators, coefficient=self.coefficient * v)
+
+
+class BlockOperator(LazyOperator):
+    """A block matrix of operators.
+
+    The lazy counterpart of ``scipy.sparse.bmat``: each block is applied to
+    its part of the vector, without assembling the block matrix.
+
+    Parameters
+    ----------
+    blocks : list of list
+        The rows of blocks, each a LazyOperator, a scipy.sparse.spmatrix,
+        a numpy.ndarray or None for a block of zeros. Every block row and
+        column needs at least one block that is not None.
+    """
+
+    def __init__(self, blocks):
+        blocks = [list(row) for row in blocks]
+        n_cols = len(blocks[0])
+        if any(len(row) != n_cols for row in blocks):
+            raise ValueError("Every block row must have the same number of blocks")
+        rows = [None] * len(blocks)
+        cols = [None] * n_cols
+        for i, row in enumerate(blocks):
+            for j, block in enumerate(row):
+                if block is None:
+                    continue
+                if not (isinstance(block, LazyOperator) or sp.issparse(block)):
+                    block = row[j] = np.atleast_2d(np.asarray(block))
+                for sizes, k, n in [(rows, i, block.shape[0]), (cols, j, block.shape[1])]:
+                    if sizes[k] is None:
+                        sizes[k] = n
+                    elif sizes[k] != n:
+                        raise ValueError("Block shapes do not line up in the block matrix")
+        if None in rows or None in cols:
+            raise ValueError("Every block row and column needs a block that is not None")
+        self.blocks = blocks
+        self._row_offsets = np.r_[0, np.cumsum(rows)]
+        self._col_offsets = np.r_[0, np.cumsum(cols)]
+
+    @property
+    def shape(self):
+        """Shape of the represented matrix"""
+        return (int(self._row_offsets[-1]), int(self._col_offsets[-1]))
+
+    @property
+    def T(self):
+        """The transpose, the transposed block matrix of the transposed blocks"""
+        return BlockOperator(
+            [
+                [None if row[j] is None else row[j].T for row in self.blocks]
+                for j in range(len(self.blocks[0]))
+            ]
+        )
+
+    def tocsr(self):
+        """Materialize the represented matrix as a scipy.sparse.csr_matrix"""
+        return sp.bmat(
+            [[None if b is None else _to_csr(b) for b in row] for row in self.blocks],
+            format="csr",
+        )
+
+    def _dot(self, x):
+        out = np.zeros((self.shape[0], x.shape[1]), dtype=np.result_type(x, float))
+        r, c = self._row_offsets, self._col_offsets
+        for i, row in enumerate(self.blocks):
+            for j, block in enumerate(row):
+                if block is not None:
+                    out[r[i] : r[i + 1]] += block @ x[c[j] : c[j + 1]]
+        return out
+
+
 class Zero(object):
 
     __numpy_ufunc__ = True
@@ -1,8 +1,9 @@
 import numpy as np
 import scipy.ndimage as ndi
 import scipy.sparse as sp
+from scipy.fft import dctn, idctn
 
-from discretize.utils.matrix_utils import ndgrid
+from discretize.utils.matrix_utils import ndgrid, _map_chunks
 from discretize.utils.code_utils import as_array_n_by_dim, is_scalar
 from scipy.spatial import cKDTree, Delaunay
 from scipy import interpolate
@@ -54,10 +55,15 @@ def random_model(shape, seed=None, anisotropy=None, its=100, bounds=None):
     Create a random model by convolving a kernel with a
     uniformly distributed model.
 
+    Kernels that are symmetric along each axis, like the default ones, are
+    diagonalized by the discrete cosine transform under the reflecting
+    boundaries of the convolution, so the ``its`` convolutions are applied
+    at once in that domain. Other kernels are convolved ``its`` times.
+
     Parameters
     ----------
-    shape: tuple
-        shape of the model.
+    shape: tuple or discretize.base.BaseMesh
+        shape of the model, or a mesh to create the model on.
     seed: int
         pick which model to produce, prints the seed if you don't choose.
     anisotropy: numpy.ndarray
@@ -70,7 +76,9 @@ def random_model(shape, seed=None, anisotropy=None, its=100, bounds=None):
     Returns
     -------
     numpy.ndarray
-        M, the model
+        M, the model. For a mesh this is a vector of its cells' values, on a
+        ``TreeMesh`` it is interpolated to the cell centers from a model on
+        its finest cells.
 
     Examples
     --------
@@ -86,6 +94,20 @@ def random_model(shape, seed=None, anisotropy=None, its=100, bounds=None):
 
 
     """
+    if isinstance(shape, discretize.base.BaseMesh):
+        mesh = shape
+        if mesh._meshType == "TREE":
+            fine = discretize.TensorMesh(mesh.h, origin=mesh.origin)
+            model = random_model(
+                fine, seed=seed, anisotropy=anisotropy, its=its, bounds=bounds
+            )
+            P = fine.get_interpolation_matrix(mesh.cell_centers, "CC")
+            return P * model
+        model = random_model(
+            mesh.shape_cells, seed=seed, anisotropy=anisotropy, its=its, bounds=bounds
+        )
+        return model.reshape(-1, order="F")
+
     if bounds is None:
         bounds = [0, 1]
 
@@ -114,9 +136,7 @@ def random_model(shape, seed=None, anisotropy=None, its=100, bounds=None):
         smth = np.array(anisotropy, dtype=float)
 
     smth = smth / smth.sum()  # normalize
-    mi = mr
-    for i in range(its):
-        mi = ndi.convolve(mi, smth)
+    mi = _convolve_iterated(mr, smth, its)
 
     # scale the model to live between the bounds.
     mi = (mi - mi.min()) / (mi.max() - mi.min())  # scaled between 0 and 1
@@ -125,6 +145,31 @@ def random_model(shape, seed=None, anisotropy=None, its=100, bounds=None):
     return mi
 
 
+def _convolve_iterated(values, kernel, its):
+    """Convolve values its times with kernel (with reflecting boundaries)."""
+    symmetric = all(
+        n % 2 == 1 and np.array_equal(kernel, np.flip(kernel, axis))
+        for axis, n in enumerate(kernel.shape)
+    )
+    if not symmetric:
+        for i in range(its):
+            values = ndi.convolve(values, kernel)
+        return values
+
+    # The cosine modes are eigenvectors of the convolution, with eigenvalues
+    # sum_j kernel[j] * prod_d cos(pi * k_d * j_d / n_d), contract one axis
+    # of the kernel at a time (the contracted axis is appended at the end).
+    eigenvalues = kernel
+    for n, width in zip(values.shape, kernel.shape):
+        offsets = np.arange(width) - width // 2
+        cos = np.cos(np.pi * np.outer(offsets, np.arange(n)) / n)
+        eigenvalues = np.tensordot(eigenvalues, cos, axes=(0, 0))
+
+    values = dctn(values, type=2, norm="ortho")
+    values *= eigenvalues ** its
+    return idctn(values, type=2, norm="ortho")
+
+
 def unpack_widths(value):
     """**unpack_widths** takes a list of numbers and tuples
     that have the form::
@@ -182,9 +227,26 @@ def unpack_widths(value):
     return np.array(proposed)
 
 
+def _closest_on_axis(x, p):
+    """Index of the closest entry of the sorted vector x to each value of p.
+
+    The lower index wins ties.
+    """
+    if x.size == 1:
+        return np.zeros(p.shape, dtype=int)
+    i = np.clip(np.searchsorted(x, p), 1, x.size - 1)
+    return i - ((p - x[i - 1]) <= (x[i] - p))
+
+
 def closest_points_index(mesh, pts, grid_loc="CC", **kwargs):
     """Move a list of points to the closest points on a grid.
 
+    On tensor grids (``TensorMesh``, and ``CylindricalMesh`` grids that are
+    the full tensor product of their coordinates, in cylindrical
+    coordinates), the closest grid point is found along each axis with a
+    binary search. Any other grid, e.g. of a ``TreeMesh`` or a
+    ``CurvilinearMesh``, is searched through a KD-tree of its points.
+
     Parameters
     ----------
     mesh: BaseMesh
@@ -198,6 +260,15 @@ def closest_points_index(mesh, pts, grid_loc="CC", **kwargs):
     -------
     numpy.ndarray
         nodeInds
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from discretize import TensorMesh
+    >>> from discretize.utils import closest_points_index
+    >>> mesh = TensorMesh([4, 4])
+    >>> closest_points_index(mesh, np.array([[0.1, 0.1], [0.9, 0.4]]))
+    array([0, 7])
     """
     if "gridLoc" in kwargs:
         warnings.warn(
@@ -209,17 +280,20 @@ def closest_points_index(mesh, pts, grid_loc="CC", **kwargs):
 
     pts = as_array_n_by_dim(pts, mesh.dim)
     grid = getattr(mesh, "grid" + grid_loc)
-    nodeInds = np.empty(pts.shape[0], dtype=int)
+    if grid is None:
+        raise ValueError(
+            "{} mesh has no {} grid".format(type(mesh).__name__, grid_loc)
+        )
+    grid = grid.reshape(grid.shape[0], -1)
 
-    for i, pt in enumerate(pts):
-        if mesh.dim == 1:
-            nodeInds[i] = ((pt - grid) ** 2).argmin()
-        else:
-            nodeInds[i] = (
-                ((np.tile(pt, (grid.shape[0], 1)) - grid) ** 2).sum(axis=1).argmin()
-            )
+    if mesh._meshType in ["TENSOR", "CYL"]:
+        tensors = mesh.get_tensor(grid_loc)
+        shape = [x.size for x in tensors]
+        if np.prod(shape) == grid.shape[0]:
+            inds = [_closest_on_axis(x, p) for x, p in zip(tensors, pts.T)]
+            return np.ravel_multi_index(inds, shape, order="F")
 
-    return nodeInds
+    return cKDTree(grid).query(pts)[1]
 
 
 def extract_core_mesh(xyzlim, mesh, mesh_type="tensor"):
@@ -801,7 +875,9 @@ def refine_tree_xyz(
     return mesh
 
 
-def active_from_xyz(mesh, xyz, grid_reference="CC", method="linear"):
+def active_from_xyz(
+    mesh, xyz, grid_reference="CC", method="linear", n_threads=1, chunk_size=65536
+):
     """Returns an active cell index array below a surface
 
     Get active cells in the `mesh` that are below the surface create by
@@ -817,7 +893,11 @@ def active_from_xyz(mesh, xyz, grid_reference="CC", method="linear"):
     For `grid_reference='N'`, this will check if **every** node of a given cell
     in the mesh is below the interpolation surface.
 
-    For the
+    The surface is only interpolated where it decides the result: at the
+    distinct horizontal locations of the cell centers (or nodes) lying
+    between the lowest and the highest of the points. Those below all of
+    the points are active and those above inactive, so on large meshes
+    only the columns crossing the surface are evaluated.
 
     Parameters
     ----------
@@ -830,6 +910,10 @@ def active_from_xyz(mesh, xyz, grid_reference="CC", method="linear"):
         Use cell coordinates from cells-center 'CC' or nodes 'N'.
     method : {'linear', 'nearest'}
         Interpolation method for the xyz points.
+    n_threads : int, optional
+        Number of threads interpolating chunks of the horizontal locations.
+    chunk_size : int, optional
+        Number of horizontal locations per chunk.
 
     Returns
     -------
@@ -964,20 +1048,35 @@ def active_from_xyz(mesh, xyz, grid_reference="CC", method="linear"):
                     ]
                 )
 
-    # Interpolate z values on CC or N
-    z_xyz = z_interpolate(locations[:, :-1]).squeeze()
+    # The interpolated surface lies within the range of the points, so only
+    # the locations within this range need it
+    z_locations = locations[:, dim]
+    below = z_locations < xyz[:, dim].min()
+    crossing = ~below & (z_locations < xyz[:, dim].max())
+
+    # Interpolate z values once per distinct horizontal location
+    horizontal, inverse = np.unique(
+        locations[crossing, :-1], axis=0, return_inverse=True
+    )
+    z_horizontal = np.empty(horizontal.shape[0])
+
+    def interpolate_chunk(start, stop):
+        z_horizontal[start:stop] = z_interpolate(horizontal[start:stop]).reshape(-1)
+
+    _map_chunks(interpolate_chunk, horizontal.shape[0], chunk_size, n_threads)
+    z_xyz = z_horizontal[inverse.reshape(-1)]
 
     # Apply nearest neighbour if in extrapolation
     ind_nan = np.isnan(z_xyz)
     if any(ind_nan):
         tree = cKDTree(xyz)
-        _, ind = tree.query(locations[ind_nan, :])
+        _, ind = tree.query(locations[crossing][ind_nan, :])
         z_xyz[ind_nan] = xyz[ind, dim]
 
+    below[crossing] = z_locations[crossing] < z_xyz
+
     # Create an active bool of all True
-    active = np.all(
-        (locations[:, dim] < z_xyz).reshape((mesh.nC, -1), order="F"), axis=1
-    )
+    active = np.all(below.reshape((mesh.nC, -1), order="F"), axis=1)
 
     return active.ravel()
 
@@ -0,0 +1,204 @@
+import numpy as np
+import scipy.sparse as sp
+from discretize.utils.matrix_utils import KroneckerProduct
+from discretize.utils.interpolation_utils import interpolation_matrix
+import discretize
+
+
+def coarsen_mesh(mesh):
+    """Create the next coarser mesh of a multigrid hierarchy.
+
+    For a :class:`discretize.TensorMesh` adjacent pairs of cells are merged
+    along each axis (an odd last cell is kept as is). For a
+    :class:`discretize.TreeMesh` the finest level of the tree is dropped, i.e.
+    every cell at the finest used level is merged with its siblings.
+
+    Parameters
+    ----------
+    mesh : discretize.TensorMesh or discretize.TreeMesh
+        The fine mesh
+
+    Returns
+    -------
+    discretize.TensorMesh or discretize.TreeMesh
+        The coarse mesh, covering the same domain
+    """
+    if isinstance(mesh, discretize.TreeMesh):
+        levels = mesh.cell_levels_by_index(np.arange(mesh.nC))
+        if mesh.max_used_level == 0:
+            raise ValueError("The TreeMesh is a single cell and cannot be coarsened")
+        coarse = discretize.TreeMesh(mesh.h, origin=mesh.origin)
+        # capping a balanced level function keeps it balanced, so the coarse
+        # mesh is nowhere finer than the fine mesh
+        coarse.insert_cells(
+            mesh.cell_centers, np.minimum(levels, mesh.max_used_level - 1)
+        )
+        return coarse
+    if isinstance(mesh, discretize.TensorMesh):
+        if all(len(h) == 1 for h in mesh.h):
+            raise ValueError("The TensorMesh is a single cell and cannot be coarsened")
+        h = []
+        for h_i in mesh.h:
+            h_c = h_i[: len(h_i) // 2 * 2].reshape(-1, 2).sum(axis=1)
+            if len(h_i) % 2:
+                h_c = np.r_[h_c, h_i[-1]]
+            h.append(h_c)
+        return discretize.TensorMesh(h, origin=mesh.origin)
+    raise TypeError(
+        "Coarsening is only implemented for TensorMesh and TreeMesh, "
+        "not {}".format(type(mesh).__name__)
+    )
+
+
+def mesh_hierarchy(mesh, n_levels=None):
+    """Build a multigrid hierarchy by repeatedly coarsening a mesh.
+
+    Parameters
+    ----------
+    mesh : discretize.TensorMesh or discretize.TreeMesh
+        The finest mesh
+
+    n_levels : int, optional
+        The maximum number of meshes in the hierarchy (including ``mesh``).
+        By default coarsening continues down to a single cell.
+
+    Returns
+    -------
+    list
+        The meshes, ordered from fine to coarse
+    """
+    meshes = [mesh]
+    while n_levels is None or len(meshes) < n_levels:
+        try:
+            meshes.append(coarsen_mesh(meshes[-1]))
+        except ValueError:
+            break
+    return meshes
+
+
+def _tensor_prolongation_1d(x_fine, x_coarse):
+    """1D node (linear) and cell (injection) prolongations between two grids."""
+    tol = 1e-10 * (x_fine[-1] - x_fine[0])
+    ind = np.searchsorted(x_fine, x_coarse - tol).clip(max=len(x_fine) - 1)
+    if not np.all(np.abs(x_fine[ind] - x_coarse) < tol):
+        raise ValueError("The coarse mesh nodes must be a subset of the fine mesh nodes")
+    P_n = interpolation_matrix(x_fine, x_coarse)
+    cc_fine = 0.5 * (x_fine[1:] + x_fine[:-1])
+    ind = np.searchsorted(x_coarse, cc_fine) - 1
+    n_fine = len(cc_fine)
+    P_c = sp.csr_matrix(
+        (np.ones(n_fine), (np.arange(n_fine), ind)), shape=(n_fine, len(x_coarse) - 1)
+    )
+    return P_n, P_c
+
+
+def prolongation_matrix(fine_mesh, coarse_mesh, location_type="cell_centers"):
+    """Prolongation (coarse to fine transfer) operator between two meshes.
+
+    For tensor meshes the operators are tensor products of 1D piecewise
+    linear (along nodes) and piecewise constant (along cells) transfers, so
+    that they commute with the differential operators, e.g.
+    ``fine.face_divergence * P_faces == P_cells * coarse.face_divergence`` and
+    ``fine.edge_curl * P_edges == P_faces * coarse.edge_curl``. For tree meshes
+    cells are injected and the other locations use the coarse mesh's
+    interpolation matrix.
+
+    The matching restriction is the transpose, and Galerkin coarse
+    operators can be built with :func:`galerkin_operator`.
+
+    Parameters
+    ----------
+    fine_mesh : discretize.TensorMesh or discretize.TreeMesh
+        The fine mesh
+
+    coarse_mesh : discretize.TensorMesh or discretize.TreeMesh
+        The coarse mesh, e.g. from :func:`coarsen_mesh`
+
+    location_type : {'cell_centers', 'nodes', 'faces', 'edges'}
+        Where the transferred quantity lives
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix
+        P, (n_fine, n_coarse)
+    """
+    location_type = fine_mesh._parse_location_type(location_type)
+    if location_type not in ["cell_centers", "nodes", "faces", "edges"]:
+        raise ValueError(
+            "location_type must be 'cell_centers', 'nodes', 'faces' or 'edges', "
+            "not {}".format(location_type)
+        )
+    if type(fine_mesh) is not type(coarse_mesh) or fine_mesh.dim != coarse_mesh.dim:
+        raise TypeError(
+            "The fine and coarse meshes must be of the same type and dimension"
+        )
+
+    dim = fine_mesh.dim
+    if isinstance(fine_mesh, discretize.TreeMesh):
+        if location_type == "cell_centers":
+            ind = coarse_mesh._get_containing_cell_indexes(fine_mesh.cell_centers)
+            return sp.csr_matrix(
+                (np.ones(fine_mesh.nC), (np.arange(fine_mesh.nC), ind)),
+                shape=(fine_mesh.nC, coarse_mesh.nC),
+            )
+        if location_type == "nodes":
+            return coarse_mesh.get_interpolation_matrix(fine_mesh.nodes, "N")
+        key = "F" if location_type == "faces" else "E"
+        return sp.vstack(
+            [
+                coarse_mesh.get_interpolation_matrix(
+                    getattr(fine_mesh, location_type + "_" + comp), key + comp
+                )
+                for comp in "xyz"[:dim]
+            ],
+            format="csr",
+        )
+
+    P_n, P_c = zip(
+        *[
+            _tensor_prolongation_1d(x_f, x_c)
+            for x_f, x_c in zip(
+                fine_mesh.get_tensor("nodes"), coarse_mesh.get_tensor("nodes")
+            )
+        ]
+    )
+
+    def kron(factors):
+        return KroneckerProduct(*factors[::-1]).tocsr()
+
+    if location_type == "cell_centers":
+        return kron(P_c)
+    if location_type == "nodes":
+        return kron(P_n)
+    blocks = []
+    for i in range(dim):
+        if location_type == "faces":
+            factors = [P_n[j] if j == i else P_c[j] for j in range(dim)]
+        else:
+            factors = [P_c[j] if j == i else P_n[j] for j in range(dim)]
+        blocks.append(kron(factors))
+    return sp.block_diag(blocks, format="csr")
+
+
+def galerkin_operator(A, P, R=None):
+    """Galerkin coarse grid operator R * A * P.
+
+    Parameters
+    ----------
+    A : scipy.sparse.spmatrix
+        The fine mesh operator
+
+    P : scipy.sparse.spmatrix
+        The prolongation from :func:`prolongation_matrix`
+
+    R : scipy.sparse.spmatrix, optional
+        The restriction, defaults to ``P.T``
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix
+        The coarse operator
+    """
+    if R is None:
+        R = P.T
+    return sp.csr_matrix(R * A * P)
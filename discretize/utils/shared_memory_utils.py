@@ -0,0 +1,124 @@
+import pickle
+from multiprocessing import shared_memory
+
+# byte alignment of each array in the shared block
+_ALIGNMENT = 64
+
+# blocks attached by this process; they stay mapped for as long as the
+# process lives because the arrays of the attached meshes view them
+_attached = {}
+
+
+class SharedMesh(object):
+    """A mesh and its cached operators published in shared memory.
+
+    The mesh is pickled with protocol 5, sending the geometry arrays and the
+    cached sparse operators out-of-band into a single
+    :class:`multiprocessing.shared_memory.SharedMemory` block. The handle
+    itself only holds the small in-band pickle and the name of the block, so
+    it is cheap to send to the workers of a process pool, where
+    :meth:`attach` rebuilds the mesh with read only arrays viewing the
+    shared block, without copying or rebuilding them.
+
+    Parameters
+    ----------
+    mesh : discretize.base.BaseMesh
+        The mesh to publish
+    names : list of str, optional
+        Geometry and operator properties to build (if needed) before
+        publishing, e.g. ``["face_divergence", "cell_volumes"]``. Everything
+        cached on the mesh is published.
+
+    Examples
+    --------
+    With ``divergence`` defined at the top level of a module:
+
+    >>> from concurrent.futures import ProcessPoolExecutor
+    >>> import numpy as np
+    >>> import discretize
+    >>> def divergence(shared, u):
+    ...     return shared.attach().face_divergence @ u
+    >>> mesh = discretize.TensorMesh([32, 32, 32])
+    >>> fields = [np.random.rand(mesh.nF) for _ in range(4)]
+    >>> with mesh.to_shared_memory(["face_divergence"]) as shared:  # doctest: +SKIP
+    ...     with ProcessPoolExecutor() as pool:
+    ...         results = list(pool.map(divergence, [shared] * 4, fields))
+
+    The process that created the handle owns the block and frees it when the
+    handle is closed (or its ``with`` block ends).
+    """
+
+    def __init__(self, mesh, names=None):
+        for name in names or []:
+            getattr(mesh, name)
+        buffers = []
+        self._pickle = pickle.dumps(
+            mesh, protocol=5, buffer_callback=buffers.append
+        )
+        raws = [buffer.raw() for buffer in buffers]
+        self._layout = []
+        offset = 0
+        for raw in raws:
+            self._layout.append((offset, raw.nbytes))
+            offset += -(-raw.nbytes // _ALIGNMENT) * _ALIGNMENT
+        self._shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for (offset, size), raw in zip(self._layout, raws):
+            self._shm.buf[offset : offset + size] = raw
+        self.name = self._shm.name
+
+    @property
+    def nbytes(self):
+        """Size of the arrays in the shared block, in bytes."""
+        return sum(size for _, size in self._layout)
+
+    def attach(self):
+        """Rebuild the mesh, viewing the arrays in the shared block.
+
+        Returns
+        -------
+        discretize.base.BaseMesh
+            The mesh, its cached operators are read only views of the block.
+        """
+        shm = self._shm
+        if shm is None:
+            shm = _attached.get(self.name)
+            if shm is None:
+                shm = shared_memory.SharedMemory(name=self.name)
+                _attached[self.name] = shm
+        buffers = [
+            shm.buf[offset : offset + size].toreadonly()
+            for offset, size in self._layout
+        ]
+        return pickle.loads(self._pickle, buffers=buffers)
+
+    def close(self):
+        """Free the shared block.
+
+        Only the process that published the mesh frees the block, meshes
+        already attached by other processes remain valid.
+        """
+        if self._shm is not None:
+            self._shm.unlink()
+            try:
+                self._shm.close()
+            except BufferError:
+                # meshes attached in this process still view the block, keep
+                # it mapped like the blocks attached from other processes
+                _attached[self.name] = self._shm
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __getstate__(self):
+        return {"name": self.name, "_pickle": self._pickle, "_layout": self._layout}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._shm = None
+
+    def __repr__(self):
+        return "SharedMesh(name={!r}, nbytes={})".format(self.name, self.nbytes)
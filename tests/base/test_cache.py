@@ -0,0 +1,216 @@
+import gc
+import os
+import shutil
+import tempfile
+import weakref
+import numpy as np
+import unittest
+import discretize
+from discretize.utils import (
+    set_cache_limit,
+    get_cache_limit,
+    set_cache_directory,
+    get_cache_directory,
+    example_curvilinear_grid,
+)
+
+
+def _tree():
+    mesh = discretize.TreeMesh([8, 8, 8])
+    mesh.refine(lambda cell: 3 if cell.center[0] < 0.5 else 2)
+    return mesh
+
+
+class TestOperatorCache(unittest.TestCase):
+    def test_info(self):
+        for mesh in [discretize.TensorMesh([5, 6, 7]), _tree()]:
+            D = mesh.face_divergence
+            info = mesh.cache_info()
+            self.assertIn("face_divergence", info.entries)
+            self.assertEqual(
+                info.entries["face_divergence"],
+                D.data.nbytes + D.indices.nbytes + D.indptr.nbytes,
+            )
+            self.assertEqual(info.size, sum(info.entries.values()))
+            self.assertIsNone(info.limit)
+
+            mesh.face_divergence
+            self.assertGreater(mesh.cache_info().hits, info.hits)
+            self.assertEqual(list(mesh.cache_info().entries)[-1], "face_divergence")
+
+    def test_cached_names(self):
+        for mesh in [
+            discretize.TensorMesh([5, 6, 7]),
+            discretize.CurvilinearMesh(example_curvilinear_grid([4, 5], "rotate")),
+            _tree(),
+        ]:
+            mesh.precision = "single"
+            mesh.cell_volumes
+            self.assertIn("cell_volumes", mesh.cache_info().entries)
+            # other private state stays a plain attribute, in its own precision
+            mesh._weights = np.ones(3)
+            self.assertIn("_weights", mesh.__dict__)
+            self.assertNotIn("weights", mesh.cache_info().entries)
+            self.assertEqual(mesh._weights.dtype, np.float64)
+
+    def test_curvilinear_nodes(self):
+        # the nodes define a curvilinear mesh, they are never evicted
+        mesh = discretize.CurvilinearMesh(example_curvilinear_grid([4, 5], "rotate"))
+        mesh.cache_limit = 1
+        mesh.cell_volumes
+        self.assertNotIn("nodes", mesh.cache_info().entries)
+        self.assertEqual(mesh.nodes.shape, (30, 2))
+
+    def test_clear_pattern(self):
+        for mesh in [discretize.TensorMesh([5, 6, 7]), _tree()]:
+            D = mesh.face_divergence
+            mesh.average_face_to_cell
+            mesh.average_node_to_cell
+            mesh.clear_cache("average_*")
+            names = list(mesh.cache_info().entries)
+            self.assertIn("face_divergence", names)
+            self.assertFalse(any(name.startswith("average") for name in names))
+            mesh.clear_cache()
+            self.assertEqual(mesh.cache_info().size, 0)
+            # rebuilt on next use
+            self.assertEqual((mesh.face_divergence - D).nnz, 0)
+            self.assertEqual(mesh.average_node_to_cell.shape, (mesh.nC, mesh.nN))
+
+    def test_limit(self):
+        meshes = [
+            discretize.TensorMesh([5, 6, 7]),
+            discretize.CurvilinearMesh(example_curvilinear_grid([4, 5, 3], "rotate")),
+            _tree(),
+        ]
+        for mesh in meshes:
+            D = mesh.face_divergence
+            G = mesh.nodal_gradient
+            mesh.cache_limit = 1
+            info = mesh.cache_info()
+            self.assertEqual(info.size, 0)
+            self.assertGreater(info.evictions, 0)
+            self.assertEqual((mesh.face_divergence - D).nnz, 0)
+            # the most recently stored entry is always kept
+            self.assertEqual(list(mesh.cache_info().entries), ["face_divergence"])
+            self.assertEqual((mesh.nodal_gradient - G).nnz, 0)
+            self.assertEqual(mesh.edge_lengths.shape, (mesh.nE,))
+            self.assertEqual(mesh.edge_curl.shape, (mesh.nF, mesh.nE))
+            self.assertEqual(len(mesh.cache_info().entries), 1)
+
+            mesh.cache_limit = None
+            mesh.face_divergence
+            entries = mesh.cache_info().entries
+            self.assertIn("face_divergence", entries)
+            self.assertIn("edge_curl", entries)
+
+    def test_global_limit(self):
+        self.assertIsNone(get_cache_limit())
+        meshes = [discretize.TensorMesh([10, 10, 10]) for _ in range(3)]
+        try:
+            set_cache_limit(1)
+            for mesh in meshes:
+                mesh.face_divergence
+            sizes = [mesh.cache_info().size for mesh in meshes]
+            self.assertEqual(sizes[:2], [0, 0])
+            self.assertGreater(sizes[2], 0)
+            self.assertEqual(meshes[0].face_divergence.shape, (1000, 3300))
+        finally:
+            set_cache_limit(None)
+
+    def test_weakref(self):
+        mesh = discretize.TensorMesh([4, 4, 4])
+        mesh.face_divergence
+        ref = weakref.ref(mesh)
+        del mesh
+        gc.collect()
+        self.assertIsNone(ref())
+
+
+class TestPersistentCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            discretize.TensorMesh([4, 5]).fingerprint,
+            discretize.TensorMesh([4, 5]).fingerprint,
+        )
+        self.assertNotEqual(
+            discretize.TensorMesh([4, 5]).fingerprint,
+            discretize.TensorMesh([4, 5], origin=[1, 0]).fingerprint,
+        )
+        self.assertNotEqual(
+            discretize.TensorMesh([4, 5]).fingerprint,
+            discretize.TensorMesh([4, 5], precision="single").fingerprint,
+        )
+        tree1, tree2 = _tree(), _tree()
+        self.assertEqual(tree1.fingerprint, tree2.fingerprint)
+        tree3 = discretize.TreeMesh([8, 8, 8])
+        tree3.refine(2)
+        self.assertNotEqual(tree1.fingerprint, tree3.fingerprint)
+
+        # curvilinear meshes have no widths, their nodes must be included
+        nodes = example_curvilinear_grid([4, 5], "rect")
+        curv1 = discretize.CurvilinearMesh(nodes)
+        curv2 = discretize.CurvilinearMesh(example_curvilinear_grid([4, 5], "rotate"))
+        self.assertEqual(np.all(curv1.origin == curv2.origin), True)
+        self.assertNotEqual(curv1.fingerprint, curv2.fingerprint)
+        self.assertEqual(
+            curv1.fingerprint, discretize.CurvilinearMesh(nodes).fingerprint
+        )
+
+    def test_tree_roundtrip(self):
+        mesh = _tree()
+        mesh.cache_directory = self.directory
+        locs = np.random.rand(20, 3)
+        D = mesh.face_divergence
+        A = mesh.average_edge_to_cell
+        P = mesh.get_interpolation_matrix(locs, "Fx")
+        mesh.cell_gradient  # depends on the boundary conditions, never saved
+        directory = os.path.join(self.directory, mesh.fingerprint)
+        names = os.listdir(directory)
+        self.assertIn("face_divergence", names)
+        self.assertIn("average_edge_to_cell", names)
+        self.assertNotIn("cell_gradient", names)
+        # interpolation matrices are only saved on request
+        self.assertFalse(any(name.startswith("interpolation") for name in names))
+        mesh.cache_interpolation = True
+        P = mesh.get_interpolation_matrix(locs, "Fx")
+        names = os.listdir(directory)
+        self.assertEqual(sum(name.startswith("interpolation") for name in names), 1)
+
+        other = _tree()
+        other.cache_directory = self.directory
+        other.cache_interpolation = True
+        D2 = other.face_divergence
+        self.assertEqual(abs(D2 - D).max(), 0)
+        self.assertEqual(abs(other.average_edge_to_cell - A).max(), 0)
+        P2 = other.get_interpolation_matrix(locs, "Fx")
+        self.assertEqual(abs(P2 - P).max(), 0)
+        # copy on write, changes stay in memory
+        P2.data *= 2
+        D2.data *= 2
+        third = _tree()
+        third.cache_directory = self.directory
+        self.assertEqual(abs(third.face_divergence - D).max(), 0)
+
+    def test_default_directory(self):
+        self.assertIsNone(get_cache_directory())
+        try:
+            set_cache_directory(self.directory)
+            mesh = discretize.TensorMesh([5, 6])
+            self.assertEqual(mesh.cache_directory, self.directory)
+            mesh.edge_curl
+            self.assertTrue(
+                os.path.isdir(os.path.join(self.directory, mesh.fingerprint, "edge_curl"))
+            )
+        finally:
+            set_cache_directory(None)
+        self.assertIsNone(discretize.TensorMesh([5, 6]).cache_directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,8 @@
 import numpy as np
+import warnings
 import unittest
 from discretize import TensorMesh, CurvilinearMesh
-from discretize.utils import ndgrid
+from discretize.utils import ndgrid, example_curvilinear_grid
 
 
 class BasicCurvTests(unittest.TestCase):
@@ -287,5 +288,66 @@ class BasicCurvTests(unittest.TestCase):
         self.assertTrue(np.all(self.Curv3.gridEz == self.TM3.gridEz))
 
 
+class TestCurvInterpolation(unittest.TestCase):
+    def test_tensor_grid(self):
+        # on a rectilinear grid, the interpolation is the tensor one
+        for dim in [2, 3]:
+            h = [np.r_[1, 2, 1.5], np.r_[1, 0.5], np.r_[2, 1, 1, 3]][:dim]
+            tensor = TensorMesh(h)
+            nodes = [tensor.nodes_x, tensor.nodes_y, tensor.nodes_z][:dim]
+            mesh = CurvilinearMesh(ndgrid(*nodes, vector=False))
+            locs = np.random.rand(200, dim) * tensor.nodes.max(axis=0)
+            for location_type in ["N", "CC"]:
+                P = mesh.get_interpolation_matrix(locs, location_type)
+                Q = tensor.get_interpolation_matrix(locs, location_type)
+                np.testing.assert_allclose(P.toarray(), Q.toarray(), atol=1e-12)
+
+    def test_linear_functions(self):
+        for shape in [[6, 7], [4, 5, 6]]:
+            mesh = CurvilinearMesh(example_curvilinear_grid(shape, "rotate"))
+            dim = mesh.dim
+
+            def f(x):
+                return 1 + x @ np.arange(1, dim + 1)
+
+            # points in the interior of random cells
+            cells = np.random.randint(0, mesh.nC, 100)
+            weights = np.random.rand(100, 2 ** dim)
+            weights /= weights.sum(axis=1, keepdims=True)
+            corners = mesh.aveN2CC[cells].tolil().rows
+            locs = np.stack([w @ mesh.nodes[c] for w, c in zip(weights, corners)])
+            P = mesh.get_interpolation_matrix(locs, "N", n_threads=2, chunk_size=7)
+            np.testing.assert_allclose(P @ f(mesh.nodes), f(locs))
+            P = mesh.get_interpolation_matrix(mesh.cell_centers, "CC")
+            np.testing.assert_allclose(
+                P @ f(mesh.cell_centers), f(mesh.cell_centers)
+            )
+
+    def test_outside(self):
+        mesh = CurvilinearMesh(example_curvilinear_grid([4, 4], "rotate"))
+        locs = np.array([[0.5, 0.5], [5.0, 5.0]])
+        with self.assertRaises(ValueError):
+            mesh.get_interpolation_matrix(locs, "N")
+        P = mesh.get_interpolation_matrix(locs, "CC", zeros_outside=True)
+        self.assertEqual(P.getnnz(axis=1)[1], 0)
+        np.testing.assert_allclose(P.sum(axis=1), [[1], [0]])
+        with self.assertRaises(NotImplementedError):
+            mesh.get_interpolation_matrix(locs, "Fx")
+
+    def test_not_finite(self):
+        mesh = CurvilinearMesh(example_curvilinear_grid([4, 4], "rotate"))
+        locs = np.array([[0.5, 0.5], [np.nan, 0.5], [0.5, np.inf]])
+        for location_type in ["N", "CC"]:
+            with self.assertRaises(ValueError):
+                mesh.get_interpolation_matrix(locs, location_type)
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                P = mesh.get_interpolation_matrix(
+                    locs, location_type, zeros_outside=True
+                )
+            np.testing.assert_equal(P.getnnz(axis=1)[1:], 0)
+            np.testing.assert_allclose(P.sum(axis=1), [[1], [0], [0]])
+
+
 if __name__ == "__main__":
     unittest.main()
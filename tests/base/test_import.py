@@ -0,0 +1,75 @@
+import subprocess
+import sys
+import unittest
+import discretize
+from discretize import mixins
+
+HEAVY_MODULES = ["matplotlib", "vtk", "pyvista", "omf", "discretize.tests"]
+# generous, importing discretize takes well under a second without the mixins
+MAX_IMPORT_TIME = 5.0
+
+
+def _import_discretize(statement="import discretize"):
+    script = (
+        "import sys, time\n"
+        "t = time.perf_counter()\n"
+        + statement
+        + "\nprint(time.perf_counter() - t)\n"
+        "print(' '.join(sys.modules))\n"
+    )
+    output = subprocess.check_output([sys.executable, "-c", script], text=True)
+    elapsed, modules = output.splitlines()
+    return float(elapsed), set(modules.split())
+
+
+class TestImportTime(unittest.TestCase):
+    def test_no_heavy_imports(self):
+        elapsed, modules = _import_discretize()
+        for name in HEAVY_MODULES:
+            self.assertNotIn(name, modules)
+        self.assertLess(elapsed, MAX_IMPORT_TIME)
+
+    def test_mesh_without_heavy_imports(self):
+        _, modules = _import_discretize(
+            "import discretize\n"
+            "mesh = discretize.TensorMesh([4, 4])\n"
+            "mesh.face_divergence"
+        )
+        for name in HEAVY_MODULES:
+            self.assertNotIn(name, modules)
+
+    def test_lazy_access(self):
+        _, modules = _import_discretize("import discretize\ndiscretize.tests")
+        self.assertIn("discretize.tests", modules)
+        with self.assertRaises(AttributeError):
+            discretize.not_a_module
+
+
+class TestLazyMixins(unittest.TestCase):
+    def test_public_attributes(self):
+        # the lazy placeholders must cover the public methods of each mixin
+        for mixin, (_, names) in mixins._MIXINS.items():
+            try:
+                cls = getattr(mixins, mixin)
+            except AttributeError:
+                continue
+            public = [name for name in vars(cls) if not name.startswith("_")]
+            self.assertEqual(sorted(public), sorted(names), msg=mixin)
+
+    def test_methods(self):
+        mesh = discretize.TensorMesh([4, 4])
+        try:
+            from discretize.mixins.mpl_mod import InterfaceMPL
+        except ImportError:
+            self.assertFalse(hasattr(mesh, "plot_grid"))
+        else:
+            self.assertIs(mesh.plot_grid.__func__, InterfaceMPL.plot_grid)
+        try:
+            import vtk  # noqa: F401
+        except ImportError:
+            self.assertFalse(hasattr(mesh, "to_vtk"))
+            self.assertFalse(hasattr(discretize.TensorMesh, "read_vtk"))
+
+
+if __name__ == "__main__":
+    unittest.main()
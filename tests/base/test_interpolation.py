@@ -326,5 +326,69 @@ class TestInterpolation3D(discretize.tests.OrderTest):
         self.orderTest()
 
 
+class TestInterpolationChunks(unittest.TestCase):
+    def test_threads_and_chunks(self):
+        mesh = discretize.TensorMesh([5, 6, 7])
+        locs = np.random.rand(1000, 3)
+        for location_type in ["CC", "N", "Fy", "Ez", "CCVy"]:
+            P = mesh.get_interpolation_matrix(locs, location_type)
+            Q = mesh._getInterpolationMat(
+                locs, location_type, n_threads=3, chunk_size=101
+            )
+            self.assertTrue(Q.has_canonical_format)
+            self.assertEqual(Q.shape, P.shape)
+            self.assertEqual(abs(P - Q).max(), 0)
+            np.testing.assert_allclose(P.sum(axis=1), 1)
+
+    def test_single_node(self):
+        # a dimension with a single node leads to merged columns
+        Q = discretize.utils.interpolation_matrix(
+            np.array([[0.3, 0.5]]), np.r_[0.0, 1.0], np.r_[0.5]
+        )
+        np.testing.assert_allclose(Q.toarray(), [[0.7, 0.3]])
+
+
+class TestEvaluate(unittest.TestCase):
+    def test_tensor(self):
+        mesh = discretize.TensorMesh([5, 6, 7])
+        locs = np.random.rand(500, 3)
+        for location_type in ["CC", "N", "Fy", "Ez", "CCVy", "cell_centers"]:
+            P = mesh.get_interpolation_matrix(locs, location_type)
+            v = np.random.rand(P.shape[1], 2)
+            np.testing.assert_allclose(
+                mesh.evaluate(v, locs, location_type), P @ v
+            )
+            np.testing.assert_allclose(
+                mesh.evaluate(
+                    v[:, 0], locs, location_type, n_threads=2, chunk_size=77
+                ),
+                P @ v[:, 0],
+            )
+
+    def test_zeros_outside(self):
+        mesh = discretize.TensorMesh([5, 6])
+        locs = np.random.rand(100, 2) * 1.4 - 0.2
+        P = mesh.get_interpolation_matrix(locs, "N", zeros_outside=True)
+        v = np.random.rand(mesh.nN)
+        np.testing.assert_allclose(
+            mesh.evaluate(v, locs, "N", zeros_outside=True), P @ v
+        )
+        with self.assertRaises(ValueError):
+            mesh.evaluate(v, locs, "N")
+        with self.assertRaises(ValueError):
+            mesh.evaluate(v, locs[:5], "CC")
+
+    def test_cylindrical(self):
+        for shape in [[5, 1, 7], [5, 4, 7]]:
+            mesh = discretize.CylindricalMesh(shape)
+            locs = np.random.rand(200, 3) * [1, 2 * np.pi, 1] * 0.99
+            for location_type in ["CC", "N", "Fx", "Fz", "CCVx", "CCVz"]:
+                P = mesh.get_interpolation_matrix(locs, location_type)
+                v = np.random.rand(P.shape[1], 3)
+                np.testing.assert_allclose(
+                    mesh.evaluate(v, locs, location_type), P @ v
+                )
+
+
 if __name__ == "__main__":
     unittest.main()
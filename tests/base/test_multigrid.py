@@ -0,0 +1,126 @@
+import numpy as np
+import unittest
+import discretize
+from discretize.utils import (
+    coarsen_mesh,
+    mesh_hierarchy,
+    prolongation_matrix,
+    galerkin_operator,
+)
+
+TOL = 1e-10
+
+
+class TestTensorMultigrid(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(42)
+        self.meshes = [
+            discretize.TensorMesh([8]),
+            discretize.TensorMesh([np.random.rand(8) + 0.5, np.random.rand(7) + 0.5]),
+            discretize.TensorMesh(
+                [
+                    np.random.rand(6) + 0.5,
+                    np.random.rand(5) + 0.5,
+                    np.random.rand(4) + 0.5,
+                ],
+                origin="CCN",
+            ),
+        ]
+
+    def test_coarsen(self):
+        mesh = self.meshes[1]
+        coarse = coarsen_mesh(mesh)
+        self.assertEqual(coarse.shape_cells, (4, 4))
+        np.testing.assert_allclose(coarse.origin, mesh.origin)
+        self.assertAlmostEqual(coarse.cell_volumes.sum(), mesh.cell_volumes.sum())
+        np.testing.assert_allclose(coarse.h[1][-1], mesh.h[1][-1])
+
+    def test_hierarchy(self):
+        meshes = mesh_hierarchy(self.meshes[0])
+        self.assertEqual([m.nC for m in meshes], [8, 4, 2, 1])
+        self.assertEqual(len(mesh_hierarchy(self.meshes[0], n_levels=2)), 2)
+
+    def test_commuting(self):
+        for mesh in self.meshes:
+            coarse = coarsen_mesh(mesh)
+            P_cc = prolongation_matrix(mesh, coarse, "CC")
+            P_n = prolongation_matrix(mesh, coarse, "N")
+            P_f = prolongation_matrix(mesh, coarse, "F")
+            P_e = prolongation_matrix(mesh, coarse, "E")
+            self.assertEqual(P_cc.shape, (mesh.nC, coarse.nC))
+            self.assertEqual(P_n.shape, (mesh.nN, coarse.nN))
+            self.assertEqual(P_f.shape, (mesh.nF, coarse.nF))
+            self.assertEqual(P_e.shape, (mesh.nE, coarse.nE))
+
+            err = mesh.face_divergence @ P_f - P_cc @ coarse.face_divergence
+            self.assertLess(abs(err).max(), TOL)
+            err = mesh.nodal_gradient @ P_n - P_e @ coarse.nodal_gradient
+            self.assertLess(abs(err).max(), TOL)
+            if mesh.dim == 3:
+                err = mesh.edge_curl @ P_e - P_f @ coarse.edge_curl
+                self.assertLess(abs(err).max(), TOL)
+
+    def test_linear_exact(self):
+        mesh = self.meshes[2]
+        coarse = coarsen_mesh(mesh)
+        P_n = prolongation_matrix(mesh, coarse, "nodes")
+        f = lambda xyz: 2 * xyz[:, 0] - xyz[:, 1] + 3 * xyz[:, 2]
+        np.testing.assert_allclose(P_n @ f(coarse.nodes), f(mesh.nodes))
+
+    def test_galerkin(self):
+        mesh = self.meshes[1]
+        coarse = coarsen_mesh(mesh)
+        P = prolongation_matrix(mesh, coarse, "N")
+        A = mesh.nodal_gradient.T @ mesh.nodal_gradient
+        A_c = galerkin_operator(A, P)
+        self.assertEqual(A_c.shape, (coarse.nN, coarse.nN))
+        np.testing.assert_allclose(A_c.toarray(), A_c.toarray().T)
+        np.testing.assert_allclose(A_c @ np.ones(coarse.nN), 0, atol=TOL)
+
+    def test_bad_meshes(self):
+        mesh = self.meshes[1]
+        shifted = discretize.TensorMesh(coarsen_mesh(mesh).h, origin=[0.1, 0.0])
+        with self.assertRaises(ValueError):
+            prolongation_matrix(mesh, shifted)
+        with self.assertRaises(TypeError):
+            prolongation_matrix(mesh, self.meshes[0])
+        with self.assertRaises(ValueError):
+            coarsen_mesh(discretize.TensorMesh([1, 1]))
+
+
+class TestTreeMultigrid(unittest.TestCase):
+    def _mesh(self, dim):
+        mesh = discretize.TreeMesh([16] * dim)
+        mesh.refine(lambda cell: 4 if cell.center[0] < 0.5 else 3)
+        return mesh
+
+    def test_coarsen(self):
+        for dim in [2, 3]:
+            mesh = self._mesh(dim)
+            coarse = coarsen_mesh(mesh)
+            self.assertEqual(coarse.max_used_level, mesh.max_used_level - 1)
+            self.assertAlmostEqual(coarse.cell_volumes.sum(), mesh.cell_volumes.sum())
+            meshes = mesh_hierarchy(mesh)
+            self.assertEqual(meshes[-1].nC, 1)
+
+    def test_prolongation(self):
+        for dim in [2, 3]:
+            mesh = self._mesh(dim)
+            coarse = coarsen_mesh(mesh)
+            for location_type, n_f, n_c in [
+                ("CC", mesh.nC, coarse.nC),
+                ("N", mesh.nN, coarse.nN),
+                ("F", mesh.nF, coarse.nF),
+                ("E", mesh.nE, coarse.nE),
+            ]:
+                P = prolongation_matrix(mesh, coarse, location_type)
+                self.assertEqual(P.shape, (n_f, n_c))
+                np.testing.assert_allclose(P @ np.ones(n_c), 1)
+
+            # restriction of cell volumes conserves the coarse volumes
+            P = prolongation_matrix(mesh, coarse)
+            np.testing.assert_allclose(P.T @ mesh.cell_volumes, coarse.cell_volumes)
+
+
+if __name__ == "__main__":
+    unittest.main()
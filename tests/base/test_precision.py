@@ -0,0 +1,81 @@
+import numpy as np
+import scipy.sparse as sp
+import unittest
+import discretize
+from discretize.utils import cast_to_precision, example_curvilinear_grid
+
+GEOMETRY = ["cell_centers", "nodes", "faces_x", "edges_y", "face_areas", "cell_volumes"]
+OPERATORS = ["face_divergence", "average_face_to_cell", "average_cell_to_face"]
+
+
+def _meshes():
+    tree = discretize.TreeMesh([8, 8, 8])
+    tree.refine(lambda cell: 3 if cell.center[0] < 0.5 else 2)
+    return [
+        discretize.TensorMesh([6, 5, 4]),
+        discretize.CylindricalMesh([4, 1, 5]),
+        discretize.CurvilinearMesh(example_curvilinear_grid([4, 5], "rotate")),
+        tree,
+    ]
+
+
+class TestCastToPrecision(unittest.TestCase):
+    def test_arrays(self):
+        x = np.random.rand(5)
+        self.assertEqual(cast_to_precision(x, "single").dtype, np.float32)
+        self.assertIs(cast_to_precision(x, "double"), x)
+        ints = np.arange(5)
+        self.assertIs(cast_to_precision(ints, "single"), ints)
+        self.assertEqual(cast_to_precision("a", "single"), "a")
+        with self.assertRaises(ValueError):
+            cast_to_precision(x, "half")
+
+    def test_sparse(self):
+        A = sp.random(20, 10, density=0.3, format="coo")
+        A32 = cast_to_precision(A, "single")
+        self.assertEqual(A32.format, "csr")
+        self.assertEqual(A32.dtype, np.float32)
+        self.assertEqual(A32.indices.dtype, np.int32)
+        self.assertEqual(A32.indptr.dtype, np.int32)
+        np.testing.assert_allclose(A32.toarray(), A.toarray(), rtol=1e-6)
+        self.assertIs(cast_to_precision(A32, "single"), A32)
+        self.assertEqual(cast_to_precision(A32, "double").dtype, np.float64)
+
+
+class TestMeshPrecision(unittest.TestCase):
+    def test_single(self):
+        for mesh in _meshes():
+            double = {name: getattr(mesh, name) for name in GEOMETRY + OPERATORS}
+            mesh.precision = "single"
+            for name in GEOMETRY + OPERATORS:
+                value = getattr(mesh, name)
+                self.assertEqual(value.dtype, np.float32, msg=name)
+                if sp.issparse(value):
+                    self.assertEqual(value.indices.dtype, np.int32)
+                    value = value.toarray()
+                    ref = double[name].toarray()
+                else:
+                    ref = double[name]
+                np.testing.assert_allclose(value, ref, rtol=1e-5, atol=1e-6)
+
+    def test_switch_back(self):
+        for mesh in _meshes():
+            mesh.precision = "single"
+            self.assertEqual(mesh.face_divergence.dtype, np.float32)
+            mesh.precision = "double"
+            self.assertEqual(mesh.face_divergence.dtype, np.float64)
+            self.assertEqual(mesh.nodes.dtype, np.float64)
+
+    def test_constructor(self):
+        mesh = discretize.TensorMesh([3, 4], precision="single")
+        self.assertEqual(mesh.precision, "single")
+        self.assertEqual(mesh.cell_volumes.dtype, np.float32)
+        tree = discretize.TreeMesh([4, 4], precision="single")
+        tree.refine(2)
+        self.assertEqual(tree.cell_centers.dtype, np.float32)
+        with self.assertRaises(ValueError):
+            mesh.precision = "float16"
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
 import unittest
+from unittest import mock
 import os
 import numpy as np
 import discretize
+from discretize.base import base_mesh
 
 
 def compare_meshes(test, mesh0, mesh1):
@@ -74,6 +76,60 @@ class TensorTest(unittest.TestCase):
         mesh1 = mesh0.copy()
         compare_meshes(self, mesh0, mesh1)
 
+    def test_copy_shares_cache(self):
+        mesh0 = self.mesh
+        D = mesh0.face_divergence
+        mesh1 = mesh0.copy()
+        self.assertIs(mesh1.face_divergence, D)
+        # the copies are independent afterwards
+        mesh1.origin = mesh0.origin + 1
+        np.testing.assert_allclose(mesh1.cell_centers, mesh0.cell_centers + 1)
+        self.assertEqual(mesh0.origin.tolist(), self.x0)
+
+    def test_copy_in_place_changes(self):
+        mesh0 = self.mesh
+        h = [h_i.copy() for h_i in mesh0.h]
+        V = mesh0.cell_volumes.copy()
+        mesh1 = mesh0.copy()
+        mesh1.h[0][:] = 2
+        mesh1.origin[0] = 5
+        for h_i, h0_i in zip(mesh0.h, h):
+            np.testing.assert_equal(h_i, h0_i)
+        self.assertEqual(mesh0.origin.tolist(), self.x0)
+        np.testing.assert_equal(mesh0.cell_volumes, V)
+        mesh2 = discretize.TensorMesh(h, self.x0)
+        np.testing.assert_equal(mesh0.cell_centers, mesh2.cell_centers)
+
+    def test_from_trusted(self):
+        mesh0 = self.mesh
+        mesh1 = discretize.TensorMesh.from_trusted(mesh0.h, mesh0.origin)
+        compare_meshes(self, mesh0, mesh1)
+        self.assertTrue(mesh1.validate())
+        self.assertEqual(mesh1.serialize(), mesh0.serialize())
+        self.assertEqual((mesh1.face_divergence - mesh0.face_divergence).nnz, 0)
+        # the properties are still validated when they change
+        with self.assertRaises(Exception):
+            mesh1.origin = [0, 0]
+        mesh2 = discretize.TensorMesh.from_trusted([np.ones(4)])
+        self.assertEqual(mesh2.origin.tolist(), [0.0])
+        self.assertEqual(mesh2.axis_u.tolist(), [1.0, 0.0, 0.0])
+
+    def test_from_trusted_fallback(self):
+        # without the private helper of properties the meshes are built
+        # through the validating constructors
+        mesh0 = self.mesh
+        with mock.patch.object(base_mesh, "_set_listener", None):
+            mesh1 = discretize.TensorMesh.from_trusted(mesh0.h, mesh0.origin)
+            mesh2 = mesh0.copy()
+        for mesh in [mesh1, mesh2]:
+            compare_meshes(self, mesh0, mesh)
+            self.assertEqual(mesh.serialize(), mesh0.serialize())
+            with self.assertRaises(Exception):
+                mesh.origin = [0, 0]
+        h0 = mesh0.h[0].copy()
+        mesh2.h[0][:] = 2
+        np.testing.assert_equal(mesh0.h[0], h0)
+
     def test_base_updates(self):
         with self.assertRaises(Exception):
             self.mesh._n = None
@@ -151,6 +207,24 @@ class TreeTest(unittest.TestCase):
 """
 
 
+class TreeCopyTest(unittest.TestCase):
+    def test_copy(self):
+        mesh0 = discretize.TreeMesh([8, 8, 8])
+        mesh0.refine(lambda cell: 3 if cell.center[0] < 0.5 else 2)
+        D = mesh0.face_divergence
+        mesh1 = mesh0.copy()
+        compare_meshes(self, mesh0, mesh1)
+        self.assertIs(mesh1.face_divergence, D)
+        np.testing.assert_array_equal(mesh1.cell_centers, mesh0.cell_centers)
+        # changing the copy in place leaves the original alone
+        C = mesh0.cell_centers.copy()
+        mesh1.h[0][:] = 2
+        mesh1.origin[0] = 5
+        np.testing.assert_equal(mesh0.h[0], np.full(8, 0.125))
+        self.assertEqual(mesh0.origin[0], 0)
+        np.testing.assert_equal(mesh0.cell_centers, C)
+
+
 class CurviTest(unittest.TestCase):
     def setUp(self):
         a = np.array([1, 1, 1])
@@ -176,6 +250,10 @@ class CurviTest(unittest.TestCase):
         mesh0 = self.mesh
         mesh1 = mesh0.copy()
         compare_meshes(self, mesh0, mesh1)
+        mesh1.node_list[0][:] = 5
+        mesh1.nodes[:] = 5
+        self.assertEqual(mesh0.node_list[0][0, 0, 0], 0)
+        self.assertEqual(mesh0.nodes[0, 0], 0)
 
     def test_base_updates(self):
         with self.assertRaises(Exception):
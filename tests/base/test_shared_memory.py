@@ -0,0 +1,64 @@
+import pickle
+import numpy as np
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+import discretize
+from discretize.utils import SharedMesh
+
+
+def _meshes():
+    tree = discretize.TreeMesh([8, 8, 8])
+    tree.refine(lambda cell: 3 if cell.center[0] < 0.5 else 2)
+    return [discretize.TensorMesh([5, 6, 7]), discretize.CylindricalMesh([4, 1, 5]), tree]
+
+
+def _divergence(shared, u):
+    mesh = shared.attach()
+    D = mesh.face_divergence
+    return D @ u, D.data.flags.writeable
+
+
+class TestPickleOutOfBand(unittest.TestCase):
+    def test_roundtrip(self):
+        for mesh in _meshes():
+            D = mesh.face_divergence
+            buffers = []
+            data = pickle.dumps(mesh, protocol=5, buffer_callback=buffers.append)
+            self.assertGreater(len(buffers), 0)
+            other = pickle.loads(data, buffers=buffers)
+            self.assertIn("face_divergence", other.cache_info().entries)
+            self.assertEqual(abs(other.face_divergence - D).max(), 0)
+
+    def test_older_protocols(self):
+        for mesh in _meshes():
+            D = mesh.face_divergence
+            other = pickle.loads(pickle.dumps(mesh, protocol=4))
+            self.assertEqual(other.cache_info().size, 0)
+            self.assertEqual(abs(other.face_divergence - D).max(), 0)
+
+
+class TestSharedMesh(unittest.TestCase):
+    def test_attach(self):
+        for mesh in _meshes():
+            with mesh.to_shared_memory(["face_divergence", "cell_volumes"]) as shared:
+                self.assertIsInstance(shared, SharedMesh)
+                other = pickle.loads(pickle.dumps(shared)).attach()
+                D = other.face_divergence
+                self.assertFalse(D.data.flags.writeable)
+                self.assertEqual(abs(D - mesh.face_divergence).max(), 0)
+                np.testing.assert_array_equal(other.cell_volumes, mesh.cell_volumes)
+
+    def test_pool(self):
+        mesh = discretize.TensorMesh([6, 7, 8])
+        fields = [np.random.rand(mesh.nF) for _ in range(3)]
+        with SharedMesh(mesh, ["face_divergence"]) as shared:
+            with ProcessPoolExecutor(2) as pool:
+                results = list(pool.map(_divergence, [shared] * 3, fields))
+        for (div, writeable), u in zip(results, fields):
+            np.testing.assert_allclose(div, mesh.face_divergence @ u)
+            # the workers view the shared operator instead of rebuilding it
+            self.assertFalse(writeable)
+
+
+if __name__ == "__main__":
+    unittest.main()
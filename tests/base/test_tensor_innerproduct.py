@@ -354,6 +354,48 @@ class TestInnerProducts1D(discretize.tests.OrderTest):
         self.orderTest()
 
 
+class TestPropertyModel(unittest.TestCase):
+    def setUp(self):
+        self.mesh = discretize.TensorMesh([5, 6, 7])
+        nC = self.mesh.nC
+        self.models = [
+            None,
+            2.0,
+            np.random.rand(nC) + 1,
+            np.random.rand(nC, 3) + 1,
+            np.c_[np.random.rand(nC, 3) + 3, np.random.rand(nC, 3)],
+        ]
+
+    def test_same_inner_products(self):
+        mesh = self.mesh
+        for model in self.models:
+            sigma = discretize.utils.PropertyModel(mesh, model)
+            for invert_model in [False, True]:
+                if model is None and invert_model:
+                    continue
+                for method in ["get_face_inner_product", "get_edge_inner_product"]:
+                    get = getattr(mesh, method)
+                    A = get(model, invert_model=invert_model)
+                    B = get(sigma, invert_model=invert_model)
+                    np.testing.assert_allclose(A.toarray(), B.toarray())
+            if model is not None:
+                v = np.random.rand(mesh.nF)
+                dA = mesh.get_face_inner_product_deriv(model)(v)
+                dB = mesh.get_face_inner_product_deriv(sigma)(v)
+                np.testing.assert_allclose(dA.toarray(), dB.toarray())
+
+    def test_inverse_cached(self):
+        sigma = discretize.utils.PropertyModel(self.mesh, self.models[-1])
+        self.assertEqual(sigma.tensor_type, 3)
+        self.assertEqual(sigma.packed.shape, (self.mesh.nC, 6))
+        self.assertIs(sigma.inverse, sigma.inverse)
+        self.assertIs(sigma.inverse.inverse, sigma)
+        np.testing.assert_allclose(
+            sigma.inverse.values,
+            discretize.utils.inverse_property_tensor(self.mesh, self.models[-1]),
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -299,5 +299,69 @@ class TestInnerProductsDerivsTensor(unittest.TestCase):
         self.assertTrue(self.doTestEdge([10, 4, 5], 3, True, "Curv"))
 
 
+class TestInnerProductsDerivsBlock(unittest.TestCase):
+    def doTestBlock(self, h, rep, fast, meshType, projection_type="F", invert=False):
+        if meshType == "Curv":
+            hRect = discretize.utils.exampleLrmGrid(h, "rotate")
+            mesh = discretize.CurvilinearMesh(hRect)
+        elif meshType == "Tensor":
+            mesh = discretize.TensorMesh(h)
+        n = mesh.nF if projection_type == "F" else mesh.nE
+        n_model = 1 if rep == 0 else mesh.nC * rep
+        sig = np.random.rand(1) if rep == 0 else np.random.rand(n_model)
+        if projection_type == "F":
+            Md = mesh.get_face_inner_product_deriv(
+                sig, do_fast=fast, invert_model=invert, invert_matrix=invert
+            )
+        else:
+            Md = mesh.get_edge_inner_product_deriv(
+                sig, do_fast=fast, invert_model=invert, invert_matrix=invert
+            )
+        V = np.random.rand(n, 4)
+        X = np.random.rand(n_model, 4)
+        Y = np.random.rand(n, 4)
+
+        MX = Md.matvec(V, X)
+        MtY = Md.rmatvec(V, Y)
+        self.assertEqual(MX.shape, (n, 4))
+        self.assertEqual(MtY.shape, (n_model, 4))
+        for i in range(4):
+            D = Md(V[:, i])
+            np.testing.assert_allclose(MX[:, i], D * X[:, i])
+            np.testing.assert_allclose(MtY[:, i], D.T * Y[:, i])
+        np.testing.assert_allclose(Md.matvec(V[:, 0], X[:, 0]), MX[:, 0])
+        np.testing.assert_allclose(Md.rmatvec(V[:, 0], Y[:, 0]), MtY[:, 0])
+        # a single model perturbation is applied to every column
+        MX0 = Md.matvec(V, X[:, 0])
+        np.testing.assert_allclose(MX0[:, 1], Md(V[:, 1]) * X[:, 0])
+
+    def test_block_1D_float(self):
+        self.doTestBlock([10], 0, False, "Tensor")
+
+    def test_block_2D_isotropic(self):
+        self.doTestBlock([10, 4], 1, False, "Tensor")
+
+    def test_block_2D_tensor(self):
+        self.doTestBlock([10, 4], 3, False, "Tensor")
+
+    def test_block_3D_anisotropic_edge(self):
+        self.doTestBlock([5, 4, 3], 3, False, "Tensor", "E")
+
+    def test_block_3D_tensor(self):
+        self.doTestBlock([5, 4, 3], 6, False, "Tensor")
+
+    def test_block_3D_tensor_Curv(self):
+        self.doTestBlock([5, 4, 3], 6, False, "Curv", "E")
+
+    def test_block_2D_float_fast(self):
+        self.doTestBlock([10, 4], 0, True, "Tensor")
+
+    def test_block_3D_isotropic_fast(self):
+        self.doTestBlock([5, 4, 3], 1, True, "Tensor", "E")
+
+    def test_block_3D_anisotropic_fast_harmonic(self):
+        self.doTestBlock([5, 4, 3], 3, True, "Tensor", invert=True)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,118 @@
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+import unittest
+import discretize
+
+np.random.seed(42)
+
+
+class TestMatrixFreeOperators(unittest.TestCase):
+    def setUp(self):
+        self.meshes = [
+            discretize.TensorMesh([6]),
+            discretize.TensorMesh([6, 5]),
+            discretize.TensorMesh(
+                [np.random.rand(6) + 0.5, np.random.rand(5) + 0.5, np.random.rand(4) + 0.5]
+            ),
+        ]
+
+    def compare(self, mesh, name):
+        A = getattr(mesh, name)
+        L = mesh.get_matrix_free_operator(name)
+        self.assertEqual(L.shape, A.shape)
+        x = np.random.rand(A.shape[1])
+        y = np.random.rand(A.shape[0])
+        np.testing.assert_allclose(L * x, A * x, atol=1e-12)
+        np.testing.assert_allclose(L.H * y, A.T * y, atol=1e-12)
+        X = np.random.rand(A.shape[1], 3)
+        Y = np.random.rand(A.shape[0], 3)
+        np.testing.assert_allclose(L @ X, A @ X, atol=1e-12)
+        np.testing.assert_allclose(L.H @ Y, A.T @ Y, atol=1e-12)
+
+    def test_face_divergence(self):
+        for mesh in self.meshes:
+            self.compare(mesh, "face_divergence")
+
+    def test_nodal_gradient(self):
+        for mesh in self.meshes:
+            self.compare(mesh, "nodal_gradient")
+
+    def test_edge_curl(self):
+        for mesh in self.meshes[1:]:
+            self.compare(mesh, "edge_curl")
+        with self.assertRaises(NotImplementedError):
+            self.meshes[0].get_matrix_free_operator("edge_curl")
+
+    def test_cell_gradient(self):
+        for mesh in self.meshes:
+            for BC in ["neumann", "dirichlet", [["dirichlet", "neumann"]] * mesh.dim]:
+                mesh.set_cell_gradient_BC(BC)
+                self.compare(mesh, "cell_gradient")
+
+    def test_bad_name(self):
+        with self.assertRaises(ValueError):
+            self.meshes[0].get_matrix_free_operator("average_face_to_cell")
+
+    def test_kronecker_operators(self):
+        for mesh in self.meshes:
+            for name in mesh._kronecker_operators:
+                K = mesh.get_kronecker_operator(name)
+                A = getattr(mesh, name)
+                if A is None:
+                    self.assertIsNone(K)
+                    continue
+                self.assertEqual(len(K.factors), mesh.dim)
+                x = np.random.rand(A.shape[1])
+                np.testing.assert_allclose(K * x, A * x, atol=1e-12)
+                self.assertLess(abs(K.tocsr() - A).max(), 1e-12)
+
+    def test_separable_solver_cell_centers(self):
+        for mesh in self.meshes:
+            for BC in ["dirichlet", [["dirichlet", "neumann"]] * mesh.dim]:
+                mesh.set_cell_gradient_BC(BC)
+                for shift in [0.0, -3.0]:
+                    A = mesh.face_divergence * mesh.cell_gradient
+                    A = A + shift * sp.identity(mesh.nC)
+                    Ainv = mesh.get_separable_solver(shift=shift)
+                    b = np.random.rand(mesh.nC)
+                    np.testing.assert_allclose(A * (Ainv * b), b, atol=1e-10)
+                    np.testing.assert_allclose(A.T * (Ainv.H * b), b, atol=1e-10)
+
+    def test_separable_solver_neumann(self):
+        for mesh in self.meshes:
+            mesh.set_cell_gradient_BC("neumann")
+            A = mesh.face_divergence * mesh.cell_gradient
+            Ainv = mesh.get_separable_solver()
+            b = np.random.rand(mesh.nC, 2)
+            # remove the component outside the range of A
+            V = mesh.cell_volumes
+            b -= V.dot(b) / V.sum()
+            np.testing.assert_allclose(A * (Ainv * b), b, atol=1e-10)
+
+    def test_separable_solver_nodes(self):
+        for mesh in self.meshes:
+            G = mesh.nodal_gradient
+            W = 1.0
+            for h in mesh.h[::-1]:
+                W = np.kron(W, discretize.utils.av(len(h)).T * h)
+            A = G.T * mesh.get_edge_inner_product() * G + 2.0 * sp.diags(W)
+            Ainv = mesh.get_separable_solver("nodes", shift=2.0)
+            b = np.random.rand(mesh.nN)
+            np.testing.assert_allclose(A * (Ainv * b), b, atol=1e-10)
+
+    def test_separable_solver_preconditioner(self):
+        mesh = self.meshes[2]
+        mesh.set_cell_gradient_BC("dirichlet")
+        sigma = np.exp(0.5 * np.random.rand(mesh.nC))
+        A = -mesh.face_divergence * sp.diags(mesh.aveCC2F * sigma) * mesh.cell_gradient
+        Minv = mesh.get_separable_solver()
+        b = np.random.rand(mesh.nC)
+        x, info = spla.gmres(A, b, M=-Minv, atol=1e-10)
+        self.assertEqual(info, 0)
+        with self.assertRaises(ValueError):
+            mesh.get_separable_solver("faces")
+
+
+if __name__ == "__main__":
+    unittest.main()
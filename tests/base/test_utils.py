@@ -11,18 +11,32 @@ from discretize.utils import (
     inv3X3BlockDiagonal,
     invPropertyTensor,
     makePropertyTensor,
+    inverse_packed_tensor,
     indexCube,
     ind2sub,
     asArray_N_x_Dim,
     TensorType,
     Zero,
     Identity,
+    KroneckerProduct,
+    DiagonalOperator,
+    ComposedOperator,
+    BlockOperator,
+    kron3,
+    av_extrap,
+    ddx,
+    av,
+    speye,
     ExtractCoreMesh,
+    closest_points_index,
+    example_curvilinear_grid,
     active_from_xyz,
     mesh_builder_xyz,
     refine_tree_xyz,
     meshTensor,
+    random_model,
 )
+import scipy.ndimage as ndi
 from discretize.tests import checkDerivative
 import discretize
 import matplotlib.pyplot as plt
@@ -429,6 +443,199 @@ class TestZero(unittest.TestCase):
         assert o - z == 1
 
 
+class TestSparseHelpers(unittest.TestCase):
+    def test_formats(self):
+        n = 5
+        ref = {
+            "sdiag": sp.diags(np.arange(1.0, n + 1)),
+            "speye": sp.identity(n),
+            "ddx": sp.diags([-1.0, 1.0], [0, 1], shape=(n, n + 1)),
+            "av": sp.diags([0.5, 0.5], [0, 1], shape=(n, n + 1)),
+            "av_extrap": sp.diags(
+                [np.r_[1.0, 0.5 * np.ones(n - 1)], np.r_[0.5 * np.ones(n - 1), 1.0]],
+                [0, -1],
+                shape=(n + 1, n),
+            ),
+        }
+        for format in ["csr", "csc", "coo"]:
+            mats = {
+                "sdiag": sdiag(np.arange(1.0, n + 1), format=format),
+                "speye": speye(n, format=format),
+                "ddx": ddx(n, format=format),
+                "av": av(n, format=format),
+                "av_extrap": av_extrap(n, format=format),
+            }
+            for name, A in mats.items():
+                self.assertEqual(A.format, format)
+                np.testing.assert_array_equal(A.toarray(), ref[name].toarray())
+
+    def test_kron3(self):
+        factors = [
+            (speye(3), av_extrap(4), speye(2)),
+            (ddx(3), speye(2), speye(4)),
+            (sp.random(3, 4, density=0.4), np.random.rand(2, 3), av_extrap(3).T),
+            (sp.csr_matrix((2, 2)), ddx(2), speye(0)),
+        ]
+        for A, B, C in factors:
+            expected = sp.kron(sp.kron(A, B), C).toarray()
+            for format in ["csr", "csc"]:
+                K = kron3(A, B, C, format=format)
+                self.assertEqual(K.format, format)
+                self.assertTrue(K.has_canonical_format)
+                np.testing.assert_array_equal(K.toarray(), expected)
+
+
+class TestKroneckerProduct(unittest.TestCase):
+    def setUp(self):
+        self.A = sp.random(3, 4, density=0.5, format="csr")
+        self.B = np.random.rand(2, 5)
+        self.C = ddx(4)
+        self.K = KroneckerProduct(self.A, self.B, self.C)
+        self.M = kron3(self.A, sp.csr_matrix(self.B), self.C)
+
+    def test_materialize(self):
+        self.assertEqual(self.K.shape, self.M.shape)
+        self.assertLess(abs(self.K.tocsr() - self.M).max(), TOL)
+
+    def test_matvec(self):
+        x = np.random.rand(self.M.shape[1])
+        X = np.random.rand(self.M.shape[1], 3)
+        y = np.random.rand(self.M.shape[0])
+        np.testing.assert_allclose(self.K * x, self.M * x)
+        np.testing.assert_allclose(self.K @ X, self.M @ X)
+        np.testing.assert_allclose(self.K.T * y, self.M.T * y)
+        np.testing.assert_allclose((-2 * self.K) * x, -2 * (self.M * x))
+
+    def test_factored_product(self):
+        L = KroneckerProduct(sdiag(np.random.rand(3)), np.random.rand(2, 2), av(3))
+        LK = L * self.K
+        self.assertIsInstance(LK, KroneckerProduct)
+        self.assertLess(abs(LK.tocsr() - L.tocsr() * self.M).max(), TOL)
+        # mismatched factors are materialized
+        R = KroneckerProduct(np.random.rand(20, 20), self.C.T)
+        self.assertTrue(sp.issparse(self.K * R))
+        self.assertLess(abs(self.K * R - self.M * R.tocsr()).max(), TOL)
+
+    def test_diagonal(self):
+        K = KroneckerProduct(sdiag(np.r_[1.0, 2.0]), speye(3), coefficient=2.0)
+        np.testing.assert_allclose(K.diagonal(), K.tocsr().diagonal())
+
+
+class TestLazyOperators(unittest.TestCase):
+    def setUp(self):
+        self.mesh = discretize.TensorMesh([4, 5, 6])
+        mesh = self.mesh
+        self.A = (
+            DiagonalOperator(1.0 / mesh.cell_volumes)
+            * mesh.face_divergence
+            * DiagonalOperator(mesh.face_areas)
+        )
+        self.M = (
+            sdiag(1.0 / mesh.cell_volumes)
+            * mesh.face_divergence
+            * sdiag(mesh.face_areas)
+        )
+
+    def test_composed(self):
+        A, M = self.A, self.M
+        self.assertIsInstance(A, ComposedOperator)
+        self.assertLess(abs(A.tocsr() - M).max(), TOL)
+        x = np.random.rand(M.shape[1])
+        X = np.random.rand(M.shape[1], 3)
+        y = np.random.rand(M.shape[0])
+        np.testing.assert_allclose(A * x, M * x)
+        np.testing.assert_allclose(A @ X, M @ X)
+        np.testing.assert_allclose(A.T * y, M.T * y)
+        np.testing.assert_allclose((-2 * A) * x, -2 * (M * x))
+        # sparse matrices multiplying from the left stay lazy too
+        B = sdiag(y) * A
+        self.assertIsInstance(B, ComposedOperator)
+        np.testing.assert_allclose(B * x, y * (M * x))
+
+    def test_diagonal(self):
+        d1, d2 = np.random.rand(5), np.random.rand(5)
+        D = DiagonalOperator(d1) * DiagonalOperator(d2)
+        self.assertIsInstance(D, DiagonalOperator)
+        np.testing.assert_allclose(D.diagonal(), d1 * d2)
+        # adjacent diagonals of a product are merged
+        C = ComposedOperator(ddx(4), DiagonalOperator(d1), DiagonalOperator(d2))
+        self.assertEqual(len(C.operators), 2)
+
+    def test_block(self):
+        A, M = self.A, self.M
+        d = np.random.rand(M.shape[1])
+        R = sp.random(M.shape[1], 7, density=0.3)
+        B = BlockOperator([[A, None], [DiagonalOperator(d), R]])
+        B_csr = sp.bmat([[M, None], [sdiag(d), R]])
+        self.assertEqual(B.shape, B_csr.shape)
+        self.assertLess(abs(B.tocsr() - B_csr).max(), TOL)
+        x = np.random.rand(B.shape[1])
+        y = np.random.rand(B.shape[0])
+        np.testing.assert_allclose(B * x, B_csr * x)
+        np.testing.assert_allclose(B.T * y, B_csr.T * y)
+        with self.assertRaises(ValueError):
+            BlockOperator([[A, None], [None, None]])
+
+    def test_zero_identity(self):
+        self.assertIs(Identity() * self.A, self.A)
+        self.assertIsInstance(Zero() * self.A, Zero)
+        with self.assertRaises(ValueError):
+            self.A * DiagonalOperator(np.ones(3))
+
+
+class TestInversePackedTensor(unittest.TestCase):
+    def _full(self, packed):
+        blocks = {3: [[0, 2], [2, 1]], 6: [[0, 3, 4], [3, 1, 5], [4, 5, 2]]}
+        return packed[:, blocks[packed.shape[1]]]
+
+    def _random_tensor(self, n, n_packed):
+        dim = 2 if n_packed == 3 else 3
+        A = np.random.rand(n, dim, dim)
+        A = A @ A.transpose(0, 2, 1) + dim * np.eye(dim)
+        if dim == 2:
+            return np.c_[A[:, 0, 0], A[:, 1, 1], A[:, 0, 1]]
+        return np.c_[
+            A[:, 0, 0], A[:, 1, 1], A[:, 2, 2], A[:, 0, 1], A[:, 0, 2], A[:, 1, 2]
+        ]
+
+    def test_inverse(self):
+        for n_packed in [3, 6]:
+            T = self._random_tensor(100, n_packed)
+            inv = inverse_packed_tensor(T)
+            np.testing.assert_allclose(
+                self._full(inv), np.linalg.inv(self._full(T))
+            )
+            np.testing.assert_allclose(
+                inverse_packed_tensor(T.astype(np.float32)), inv, rtol=1e-4
+            )
+
+    def test_out_and_chunks(self):
+        T = self._random_tensor(1000, 6)
+        expected = inverse_packed_tensor(T)
+        out = np.empty_like(T)
+        self.assertIs(inverse_packed_tensor(T, out=out, chunk_size=77), out)
+        np.testing.assert_allclose(out, expected)
+        threaded = inverse_packed_tensor(T, n_threads=4, chunk_size=100)
+        np.testing.assert_allclose(threaded, expected)
+        inverse_packed_tensor(T, out=T, chunk_size=300)
+        np.testing.assert_allclose(T, expected)
+        with self.assertRaises(ValueError):
+            inverse_packed_tensor(np.ones((4, 4)))
+        with self.assertRaises(ValueError):
+            inverse_packed_tensor(T, out=np.empty((3, 6)))
+
+    def test_property_tensor(self):
+        for dim, n_packed in [(2, 3), (3, 6)]:
+            M = discretize.TensorMesh([4] * dim)
+            T = mkvc(self._random_tensor(M.nC, n_packed))
+            Sigma = makePropertyTensor(M, T)
+            self.assertTrue(sp.isspmatrix_csr(Sigma))
+            Sinv = invPropertyTensor(M, T, return_matrix=True)
+            np.testing.assert_allclose(
+                (Sigma @ Sinv).toarray(), np.eye(dim * M.nC), atol=1e-12
+            )
+
+
 class TestMeshUtils(unittest.TestCase):
     def test_ExtractCoreMesh(self):
 
@@ -468,6 +675,60 @@ class TestMeshUtils(unittest.TestCase):
         self.assertGreater(meshCore3d.vectorCCz.min(), xzlim3d[2, :].min())
         self.assertLess(meshCore3d.vectorCCz.max(), xzlim3d[2, :].max())
 
+    def test_closest_points_index(self):
+        tree = discretize.TreeMesh([16, 16, 16])
+        tree.insert_cells([[0.5, 0.5, 0.5]], [4])
+        meshes = [
+            discretize.TensorMesh([6]),
+            discretize.TensorMesh([np.random.rand(5), np.random.rand(7)]),
+            discretize.TensorMesh([4, 5, 6], "CCN"),
+            discretize.CylindricalMesh([3, 1, 4]),
+            discretize.CylindricalMesh([3, 4, 4]),
+            tree,
+            discretize.CurvilinearMesh(example_curvilinear_grid([5, 6], "rotate")),
+        ]
+        for mesh in meshes:
+            lower = mesh.gridN.min(axis=0) - 0.2
+            upper = mesh.gridN.max(axis=0) + 0.2
+            pts = lower + np.random.rand(100, mesh.dim) * (upper - lower)
+            for grid_loc in ["CC", "N", "Fx", "Ey"]:
+                grid = getattr(mesh, "grid" + grid_loc)
+                if grid is None:
+                    continue
+                grid = grid.reshape(grid.shape[0], -1)
+                # brute force distances to all of the grid points
+                distances = ((pts[:, None, :] - grid) ** 2).sum(axis=2)
+                inds = closest_points_index(mesh, pts, grid_loc=grid_loc)
+                np.testing.assert_allclose(
+                    distances[np.arange(len(pts)), inds], distances.min(axis=1)
+                )
+
+    def test_random_model(self):
+        kernels = [
+            None,
+            np.array([[1.0, 7, 1], [2, 10, 2], [1, 7, 1]]),
+            np.array([[1.0, 2, 1], [2, 10, 2], [0, 7, 1]]),  # not symmetric
+        ]
+        for kernel in kernels:
+            model = random_model((9, 7), seed=4, anisotropy=kernel, its=20)
+
+            # same as convolving the uniform model its times
+            np.random.seed(4)
+            expected = np.random.rand(9, 7)
+            if kernel is None:
+                kernel = np.array([[1.0, 7, 1], [2, 10, 2], [1, 7, 1]])
+            for i in range(20):
+                expected = ndi.convolve(expected, kernel / kernel.sum())
+            expected = (expected - expected.min()) / (expected.max() - expected.min())
+            np.testing.assert_allclose(model, expected, atol=1e-12)
+
+        tree = discretize.TreeMesh([16, 16])
+        tree.insert_cells([[0.5, 0.5]], [4])
+        for mesh in [discretize.TensorMesh([5, 6, 7]), tree]:
+            model = random_model(mesh, seed=2, bounds=[-1, 1])
+            self.assertEqual(model.shape, (mesh.n_cells,))
+            self.assertTrue(np.all((model >= -1) & (model <= 1)))
+
     def test_active_from_xyz(self):
 
         # Create 3D topo
@@ -593,6 +854,23 @@ class TestMeshUtils(unittest.TestCase):
         self.assertIn(indtopoCC.sum(), [6292, 6299])
         self.assertIn(indtopoN.sum(), [4632, 4639])
 
+        # chunks of columns interpolated by threads give the same result
+        for grid_reference in ["CC", "N"]:
+            for method in ["linear", "nearest"]:
+                np.testing.assert_array_equal(
+                    active_from_xyz(
+                        mesh_tree,
+                        topo3D,
+                        grid_reference=grid_reference,
+                        method=method,
+                        n_threads=2,
+                        chunk_size=100,
+                    ),
+                    active_from_xyz(
+                        mesh_tree, topo3D, grid_reference=grid_reference, method=method
+                    ),
+                )
+
         # Test 3D CYL Mesh
         ncr = 10  # number of mesh cells in r
         ncz = 15  # number of mesh cells in z
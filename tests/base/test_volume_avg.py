@@ -1,7 +1,7 @@
 import numpy as np
 import unittest
 import discretize
-from discretize.utils import volume_average
+from discretize.utils import volume_average, VolumeAveragingPlan
 from numpy.testing import assert_array_equal, assert_allclose
 
 
@@ -440,5 +440,36 @@ class TestVolumeAverage(unittest.TestCase):
             self.assertAlmostEqual(vol1, vol2)
 
 
+class TestVolumeAveragingPlan(unittest.TestCase):
+    def test_plan(self):
+        h1 = np.ones(16)
+        h2 = np.full(8, 2.0)
+        tensor = discretize.TensorMesh([h1, h1, h1])
+        tree = discretize.TreeMesh([h2, h2, h2])
+        tree.insert_cells([[4, 4, 4]], [3])
+        for mesh_in, mesh_out in [(tensor, tree), (tree, tensor)]:
+            plan = VolumeAveragingPlan(mesh_in, mesh_out)
+            Av = volume_average(mesh_in, mesh_out)
+            self.assertEqual(plan.shape, (mesh_out.nC, mesh_in.nC))
+            assert_allclose((plan.matrix - Av).toarray(), 0)
+            assert_allclose((plan.adjoint_matrix - Av.T).toarray(), 0)
+
+            models = np.random.rand(mesh_in.nC, 3)
+            out = plan.apply(models, n_threads=2, chunk_size=100)
+            assert_allclose(out, Av @ models)
+            for model, column in zip(models.T, out.T):
+                assert_allclose(volume_average(mesh_in, mesh_out, model.copy()), column)
+
+            output = np.empty(mesh_out.nC)
+            self.assertIs(plan(models[:, 0], output=output), output)
+            assert_allclose(output, out[:, 0])
+
+            adjoint = plan.apply_adjoint(out, n_threads=2, chunk_size=100)
+            assert_allclose(adjoint, Av.T @ out)
+
+            with self.assertRaises(ValueError):
+                plan.apply(np.ones(mesh_out.nC + 1))
+
+
 if __name__ == "__main__":
     unittest.main()
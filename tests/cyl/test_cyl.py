@@ -1,5 +1,6 @@
 import unittest
 import numpy as np
+import scipy.sparse as sp
 
 import discretize
 from discretize import tests, utils
@@ -308,6 +309,59 @@ class TestCyl2DMesh(unittest.TestCase):
         assert np.abs(mag[dist > 0.1].max() - 1) < TOL
         assert np.abs(mag[dist > 0.1].min() - 1) < TOL
 
+    def test_cartesian_transfer_plan(self):
+        Mr = discretize.TensorMesh([20, 20, 2], x0="CC0")
+        Mc = discretize.CylindricalMesh(
+            [np.ones(10) / 5, 1, 10], x0="0C0", cartesian_origin=[-0.2, -0.2, 0]
+        )
+
+        def reference(grid, interp_type, rotation=None):
+            # interpolate at the cylindrical coordinates of the cartesian
+            # locations, then turn the radial/azimuthal component onto them
+            x, y = (grid[:, :2] - Mc.cartesian_origin[:2]).T
+            theta = np.mod(np.arctan2(y, x), 2 * np.pi)
+            G = np.c_[np.sqrt(x ** 2 + y ** 2), theta, grid[:, 2]]
+            P = Mc.get_interpolation_matrix(G, interp_type)
+            if rotation is None:
+                return P
+            return utils.sdiag(rotation(theta)) @ P
+
+        references = {
+            ("CC", "N"): reference(Mr.nodes, "CC"),
+            ("F", "E"): sp.vstack(
+                [
+                    reference(Mr.edges_x, "Fx", np.cos),
+                    reference(Mr.edges_y, "Fx", np.sin),
+                    reference(Mr.edges_z, "Fz"),
+                ]
+            ),
+            ("E", None): sp.vstack(
+                [
+                    reference(Mr.edges_x, "Ey", lambda t: -np.sin(t)),
+                    reference(Mr.edges_y, "Ey", np.cos),
+                    sp.csr_matrix((Mr.nEz, Mc.nE)),
+                ]
+            ),
+        }
+        for (location_type, location_type_to), R in references.items():
+            plan = Mc.cartesian_transfer_plan(Mr, location_type, location_type_to)
+            P = Mc.get_interpolation_matrix_cartesian_mesh(
+                Mr, location_type, location_type_to
+            )
+            self.assertEqual(plan.shape, R.shape)
+            np.testing.assert_allclose(plan.matrix.toarray(), R.toarray(), atol=1e-12)
+            np.testing.assert_allclose(P.toarray(), R.toarray(), atol=1e-12)
+
+            fields = np.random.rand(R.shape[1], 4)
+            np.testing.assert_allclose(
+                plan.apply(fields, n_threads=2, chunk_size=100),
+                R @ fields,
+                atol=1e-12,
+            )
+            np.testing.assert_allclose(
+                plan(fields[:, 0]), R @ fields[:, 0], atol=1e-12
+            )
+
     def test_serialization(self):
         mesh = discretize.CylMesh.deserialize(self.mesh.serialize())
         self.assertTrue(np.all(self.mesh.x0 == mesh.x0))
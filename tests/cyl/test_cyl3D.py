@@ -343,6 +343,31 @@ class Deflation(unittest.TestCase):
         )
         self.assertTrue(np.all(mesh._edge_lengths_full[~hangingE] == mesh.edge))
 
+    def test_deflated_operators(self):
+        mesh = discretize.CylindricalMesh([2, 5, 3])
+
+        # the operators are assembled directly on the deflated index sets
+        curl = (
+            utils.sdiag(1 / mesh.face_areas)
+            * mesh._deflation_matrix("F")
+            * mesh._edge_curl_stencil
+            * utils.sdiag(mesh._edge_lengths_full)
+            * mesh._deflation_matrix("E", as_ones=True).T
+        )
+        self.assertLess(abs(mesh.edge_curl - curl).max(), 1e-14)
+        average = utils.kron3(
+            utils.speye(3), utils.av(5), utils.av(2)
+        ) * mesh._deflation_matrix("Ez", as_ones=True).T
+        self.assertLess(abs(mesh.average_edge_z_to_cell - average).max(), 1e-14)
+
+        # and kept, as are the deflation matrices and cartesian grids
+        self.assertIs(mesh.average_edge_z_to_cell, mesh.average_edge_z_to_cell)
+        self.assertIs(mesh._deflation_matrix("F"), mesh._deflation_matrix("F"))
+        self.assertIs(mesh.cartesian_grid("N"), mesh.cartesian_grid("N"))
+        np.testing.assert_allclose(
+            mesh.cartesian_grid("N", theta_shift=0.0), mesh.cartesian_grid("N")
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -305,6 +305,76 @@ class TestOcTree(unittest.TestCase):
 
         self.assertTrue(test_hx and test_hy and test_hz)
 
+    def test_boundary_indices(self):
+        M = discretize.TreeMesh([8, 8, np.r_[1.0, 2.0, 3.0, 4.0]], origin=[0, -1, 0])
+        M.refine(1, finalize=False)
+        M.insert_cells([[0.1, -0.9, 0.1], [0.5, 0.5, 5.0]], [3, 2])
+        lower = M.origin
+        upper = M.origin + np.r_[1.0, 1.0, 10.0]
+
+        def on_boundary(grid, axes):
+            return np.any(
+                [
+                    np.isclose(grid[:, i], lower[i]) | np.isclose(grid[:, i], upper[i])
+                    for i in axes
+                ],
+                axis=0,
+            )
+
+        faces = [M.faces_x, M.faces_y, M.faces_z]
+        normals = M.boundary_face_outward_normals
+        i_start = 0
+        for i, inds in enumerate(M.face_boundary_indices):
+            face = faces[i // 2][inds]
+            side = lower if i % 2 == 0 else upper
+            np.testing.assert_allclose(face[:, i // 2], side[i // 2])
+            expected = np.zeros(3)
+            expected[i // 2] = -1 if i % 2 == 0 else 1
+            np.testing.assert_equal(
+                normals[i_start : i_start + len(inds)],
+                np.broadcast_to(expected, (len(inds), 3)),
+            )
+            i_start += len(inds)
+        self.assertEqual(
+            len(M.boundary_face_indices),
+            sum(on_boundary(f, [i]).sum() for i, f in enumerate(faces)),
+        )
+
+        edges = [M.edges_x, M.edges_y, M.edges_z]
+        expected = np.nonzero(
+            np.concatenate(
+                [
+                    on_boundary(e, [j for j in range(3) if j != i])
+                    for i, e in enumerate(edges)
+                ]
+            )
+        )[0]
+        np.testing.assert_equal(M.boundary_edge_indices, expected)
+        expected = np.nonzero(on_boundary(M.nodes, range(3)))[0]
+        np.testing.assert_equal(M.boundary_node_indices, expected)
+
+        # kept until the mesh changes
+        self.assertIs(M.boundary_node_indices, M.boundary_node_indices)
+
+    def test_boundary_indices_evicted(self):
+        # the boundary indices are cached under several names, evicting one
+        # while storing another must not break them
+        M = discretize.TreeMesh([8, 8, 8])
+        M.refine(lambda cell: 3 if cell.center[0] < 0.5 else 2)
+        expected = [inds.copy() for inds in M.face_boundary_indices]
+        cells = [inds.copy() for inds in M.cell_boundary_indices]
+        G = M.cell_gradient
+        M.clear_cache()
+        try:
+            discretize.utils.set_cache_limit(1)
+            for inds, ref in zip(M.face_boundary_indices, expected):
+                np.testing.assert_equal(inds, ref)
+            for inds, ref in zip(M.cell_boundary_indices, cells):
+                np.testing.assert_equal(inds, ref)
+            self.assertEqual((M.cell_gradient - G).nnz, 0)
+        finally:
+            discretize.utils.set_cache_limit(None)
+
 
 class Test2DInterpolation(unittest.TestCase):
     def setUp(self):
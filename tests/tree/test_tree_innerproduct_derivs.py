@@ -147,5 +147,36 @@ class TestInnerProductsDerivsTensor(unittest.TestCase):
         self.assertTrue(doTestEdge([8, 8, 8], 3, True, "Tree"))
 
 
+class TestInnerProductsDerivsBlockTree(unittest.TestCase):
+    def doTestBlock(self, h, rep, fast, projection_type):
+        mesh = discretize.TreeMesh(h, levels=3)
+        mesh.refine(lambda xc: 3)
+        n = mesh.nF if projection_type == "F" else mesh.nE
+        n_model = 1 if rep == 0 else mesh.nC * rep
+        sig = np.random.rand(n_model)
+        if projection_type == "F":
+            Md = mesh.get_face_inner_product_deriv(sig, do_fast=fast)
+        else:
+            Md = mesh.get_edge_inner_product_deriv(sig, do_fast=fast)
+        V = np.random.rand(n, 3)
+        X = np.random.rand(n_model, 3)
+        Y = np.random.rand(n, 3)
+        MX = Md.matvec(V, X)
+        MtY = Md.rmatvec(V, Y)
+        for i in range(3):
+            D = Md(V[:, i])
+            np.testing.assert_allclose(MX[:, i], D * X[:, i])
+            np.testing.assert_allclose(MtY[:, i], D.T * Y[:, i])
+
+    def test_block_2D_anisotropic_Tree(self):
+        self.doTestBlock([8, 8], 2, False, "F")
+
+    def test_block_3D_tensor_Tree(self):
+        self.doTestBlock([8, 8, 8], 6, False, "E")
+
+    def test_block_3D_isotropic_fast_Tree(self):
+        self.doTestBlock([8, 8, 8], 1, True, "E")
+
+
 if __name__ == "__main__":
     unittest.main()
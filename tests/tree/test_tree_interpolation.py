@@ -217,5 +217,36 @@ class TestInterpolation3D(discretize.tests.OrderTest):
         self.orderTest()
 
 
+class TestEvaluate(unittest.TestCase):
+    def test_matches_matrix(self):
+        for dim in [2, 3]:
+            mesh = discretize.TreeMesh([16] * dim)
+
+            def refine(cell):
+                center = np.asarray(cell.center)
+                return 4 if np.linalg.norm(center - 0.5) < 0.25 else 2
+
+            mesh.refine(refine)
+            locs = np.random.rand(300, dim) * 1.2 - 0.1
+            location_types = ["CC", "N", "Ex", "Ey", "Fx", "Fy"]
+            if dim == 3:
+                location_types += ["Ez", "Fz"]
+            for location_type in location_types:
+                P = mesh.get_interpolation_matrix(
+                    locs, location_type, zeros_outside=True
+                )
+                v = np.random.rand(P.shape[1], 2)
+                np.testing.assert_allclose(
+                    mesh.evaluate(v, locs, location_type, zeros_outside=True),
+                    P @ v,
+                    atol=1e-12,
+                )
+            P = mesh.get_interpolation_matrix(locs, "N", zeros_outside=True)
+            v = np.random.rand(mesh.n_nodes)
+            np.testing.assert_allclose(
+                mesh.evaluate(v, locs, "nodes", zeros_outside=True), P @ v
+            )
+
+
 if __name__ == "__main__":
     unittest.main()